@@ -0,0 +1,93 @@
+r"""
+Benchmark of the JSON decoders of :mod:`hubblepy.decoders` on the response bodies recorded in the test cassettes.
+
+Each recorded body is decoded to 'json' and 'record' results by every installed decoder, and the time per decoded
+megabyte is reported. Run from the root of the repository:
+
+    python benchmarks/decode.py --repeat 200
+
+"""
+import argparse
+import glob
+import os
+import sys
+import timeit
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from hubblepy.api import _endpoint_name  # noqa: E402
+from hubblepy.decoders import Decoder, available  # noqa: E402
+from hubblepy.records import from_json  # noqa: E402
+
+
+def recorded_bodies(directory):
+    r"""
+    Returns :code:`(endpoint, url, body)` tuples of the JSON responses recorded in the cassettes.
+
+    """
+    bodies = []
+
+    for path in sorted(glob.glob(os.path.join(directory, '*.yml'))):
+        with open(path) as f:
+            cassette = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+        for interaction in cassette['interactions']:
+            url = interaction['request']['uri']
+            body = interaction['response']['body']['string'].encode('utf-8')
+
+            if interaction['response']['status']['code'] == 200 and _endpoint_name(url) is not None:
+                bodies.append((_endpoint_name(url), url, body))
+
+    return bodies
+
+
+def run(bodies, repeat):
+    size = sum(len(body) for _, _, body in bodies) / 1e6
+    results = []
+
+    for name in available():
+        decoder = Decoder(name)
+
+        def decode_json():
+            for _, _, body in bodies:
+                decoder.loads(body)
+
+        def decode_records():
+            for endpoint, url, body in bodies:
+                decoder.records(body, endpoint, url)
+
+        results.append(('json', name, min(timeit.repeat(decode_json, number=repeat, repeat=3)) / repeat / size))
+        results.append(('record', name, min(timeit.repeat(decode_records, number=repeat, repeat=3)) / repeat / size))
+
+        # With msgspec, compare schema decoding with building the records from decoded dicts.
+        if decoder.schema:
+            def decode_records_from_dicts():
+                for endpoint, url, body in bodies:
+                    from_json(decoder.loads(body), endpoint, url)
+
+            results.append(('record (dicts)', name,
+                            min(timeit.repeat(decode_records_from_dicts, number=repeat, repeat=3)) / repeat / size))
+
+    return size, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--cassettes', default=os.path.join(os.path.dirname(__file__), '..', 'tests', 'cassettes'))
+    parser.add_argument('--repeat', type=int, default=100)
+    args = parser.parse_args()
+
+    bodies = recorded_bodies(args.cassettes)
+    size, results = run(bodies, args.repeat)
+
+    print('{} bodies, {:.2f} MB'.format(len(bodies), size))
+    print('{:<16}{:<10}{:>12}'.format('return type', 'decoder', 'ms per MB'))
+
+    for return_type, name, seconds in results:
+        print('{:<16}{:<10}{:>12.2f}'.format(return_type, name, seconds * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,268 @@
+r"""
+Benchmark of the API functions against a local stub server replaying the recorded cassettes (see
+:code:`benchmarks/server.py`), or serving the generated data of :class:`hubblepy.testing.StubServer` with
+:code:`--synthetic`.
+
+Every endpoint is called sequentially, from a thread pool and from asyncio tasks. For each endpoint and mode, calls
+per second, median and 99th percentile latency, CPU time per call and peak memory are reported, and the results are
+written as JSON so runs can be compared. Run from the root of the repository:
+
+    python benchmarks/endpoints.py --calls 500 --output results.json
+    python benchmarks/endpoints.py --compare results.json
+    python benchmarks/endpoints.py --synthetic --payload-size 5000
+
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import hubblepy  # noqa: E402
+import server  # noqa: E402
+
+try:
+    import httpx
+    from hubblepy import aio
+except ImportError:  # pragma: no cover
+    httpx = aio = None
+
+
+# The name of each scenario, and the function of the call number making its call with a module of the API
+# functions (hubblepy or hubblepy.aio).
+scenarios = [
+    ('news', lambda api, i, c: api.news(1, client=c)),
+    ('news_release', lambda api, i, c: api.news_release('first' if i % 2 else 'last', client=c)),
+    ('image_collections', lambda api, i, c: api.image_collections(1, 'news', client=c)),
+    ('images', lambda api, i, c: api.images(4000 + i, client=c)),
+    ('video_collections', lambda api, i, c: api.video_collections(1, 'science', client=c)),
+    ('videos', lambda api, i, c: api.videos(i, client=c)),
+    ('glossary', lambda api, i, c: api.glossary(1, client=c)),
+    ('glossary_term', lambda api, i, c: api.glossary_term('term-{}'.format(i), client=c)),
+    ('rss', lambda api, i, c: api.rss('esa_feed', 1, sort='asc', client=c)),
+    ('rss_posts', lambda api, i, c: api.rss_posts('esa_feed', '2018-09-13T11:00:00.000-04:00', client=c)),
+]
+
+# Walking every page of a listing, to catch regressions in pagination and prefetching.
+page_scenarios = [
+    ('news (all pages)', lambda c: list(hubblepy.news(page='all', client=c))),
+    ('video_collections (all pages)', lambda c: list(hubblepy.video_collections('all', 'science', client=c))),
+]
+
+
+def sync_client(proxy, workers, **kwargs):
+    session = requests.Session()
+    session.trust_env = False
+    session.proxies = {'http': proxy}
+
+    return hubblepy.Client(session=session, pool_maxsize=workers, **kwargs)
+
+
+def async_client(proxy, workers):
+    return aio.AsyncClient(client=httpx.AsyncClient(proxy=proxy, trust_env=False,
+                                                    limits=httpx.Limits(max_connections=workers)),
+                           max_concurrency=workers)
+
+
+def percentile(latencies, q):
+    ordered = sorted(latencies)
+
+    return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
+
+
+def measure(run, calls):
+    r"""
+    Runs :code:`run(calls)`, which returns the latency of every call, and returns the statistics of the run. Peak
+    memory is measured on a separate, shorter run, as tracing allocations slows the calls down.
+
+    """
+    cpu, wall = time.process_time(), time.perf_counter()
+    latencies = run(calls)
+    cpu, wall = time.process_time() - cpu, time.perf_counter() - wall
+
+    tracemalloc.start()
+    run(min(calls, 50))
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'calls': calls,
+        'calls_per_sec': calls / wall,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'cpu_ms_per_call': cpu / calls * 1000,
+        'peak_memory_kb': peak / 1024,
+    }
+
+
+def timed(call):
+    start = time.perf_counter()
+    call()
+
+    return time.perf_counter() - start
+
+
+def sequential(proxy, scenario):
+    def run(calls):
+        with sync_client(proxy, 1) as client:
+            return [timed(lambda: scenario(hubblepy, i, client)) for i in range(calls)]
+
+    return run
+
+
+def threaded(proxy, scenario, workers):
+    def run(calls):
+        with sync_client(proxy, workers) as client, ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(lambda i: timed(lambda: scenario(hubblepy, i, client)), range(calls)))
+
+    return run
+
+
+def asynchronous(proxy, scenario, workers):
+    async def main(calls):
+        async with async_client(proxy, workers) as client:
+            semaphore = asyncio.Semaphore(workers)
+
+            async def call(i):
+                async with semaphore:
+                    start = time.perf_counter()
+                    await scenario(aio, i, client)
+
+                    return time.perf_counter() - start
+
+            return await asyncio.gather(*[call(i) for i in range(calls)])
+
+    def run(calls):
+        return asyncio.run(main(calls))
+
+    return run
+
+
+def pages(proxy, scenario):
+    def run(calls):
+        with sync_client(proxy, 2) as client:
+            return [timed(lambda: scenario(client)) for _ in range(calls)]
+
+    return run
+
+
+def metadata(args):
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL,
+                                         cwd=os.path.dirname(os.path.abspath(__file__))).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'date': datetime.now(timezone.utc).isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'decoder': hubblepy.Decoder().name,
+        'calls': args.calls,
+        'workers': args.workers,
+        'latency_ms': args.latency,
+        'synthetic': args.synthetic,
+        'payload_size': args.payload_size if args.synthetic else None,
+    }
+
+
+def run(args, proxy):
+    results = []
+    modes = [('sequential', lambda s: sequential(proxy, s)), ('threaded', lambda s: threaded(proxy, s, args.workers))]
+
+    if aio is not None:
+        modes.append(('async', lambda s: asynchronous(proxy, s, args.workers)))
+
+    for name, scenario in scenarios:
+        if args.endpoints and name not in args.endpoints:
+            continue
+
+        for mode, make in modes:
+            results.append(dict(measure(make(scenario), args.calls), endpoint=name, mode=mode))
+            report(results[-1])
+
+    for name, scenario in page_scenarios:
+        if args.endpoints and name.split()[0] not in args.endpoints:
+            continue
+
+        results.append(dict(measure(pages(proxy, scenario), max(1, args.calls // 25)), endpoint=name,
+                            mode='sequential'))
+        report(results[-1])
+
+    return results
+
+
+def report(result, baseline=None):
+    line = '{:<32}{:<12}{:>10.0f}{:>10.2f}{:>10.2f}{:>10.3f}{:>12.0f}'.format(
+        result['endpoint'], result['mode'], result['calls_per_sec'], result['p50_ms'], result['p99_ms'],
+        result['cpu_ms_per_call'], result['peak_memory_kb'])
+
+    if baseline is not None:
+        line += '{:>+10.1%}{:>+10.1%}'.format(result['calls_per_sec'] / baseline['calls_per_sec'] - 1,
+                                             result['p99_ms'] / baseline['p99_ms'] - 1)
+
+    print(line)
+
+
+def compare(results, path):
+    r"""
+    Prints the results next to the change in calls per second and p99 latency from a previous run.
+
+    """
+    with open(path) as f:
+        baseline = {(r['endpoint'], r['mode']): r for r in json.load(f)['results']}
+
+    print('\nCompared with {}:'.format(path))
+    print(header + '{:>10}{:>10}'.format('d calls/s', 'd p99'))
+
+    for result in results:
+        report(result, baseline.get((result['endpoint'], result['mode'])))
+
+
+header = '{:<32}{:<12}{:>10}{:>10}{:>10}{:>10}{:>12}'.format('endpoint', 'mode', 'calls/s', 'p50 ms', 'p99 ms',
+                                                             'cpu ms', 'peak KiB')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--calls', type=int, default=200, help='calls per endpoint and mode')
+    parser.add_argument('--workers', type=int, default=8, help='threads or concurrent tasks')
+    parser.add_argument('--latency', type=float, default=0, help='milliseconds added to every response')
+    parser.add_argument('--endpoints', nargs='*', help='only benchmark these endpoints')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    parser.add_argument('--compare', help='JSON file of a previous run to compare with')
+    parser.add_argument('--cassettes', default=server.default_cassettes)
+    parser.add_argument('--synthetic', action='store_true', help='serve generated data instead of the cassettes')
+    parser.add_argument('--payload-size', type=int, default=500, help='characters of the generated text fields')
+    args = parser.parse_args()
+
+    synthetic = {'payload_size': args.payload_size} if args.synthetic else None
+    process, proxy = server.start(args.latency / 1000, args.cassettes, synthetic)
+
+    try:
+        print(header)
+        results = run(args, proxy)
+    finally:
+        process.terminate()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': metadata(args), 'results': results}, f, indent=2)
+
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
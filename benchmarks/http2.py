@@ -0,0 +1,195 @@
+r"""
+Benchmark of the HTTP/2 transport (:mod:`hubblepy.transport`) against HTTP/1.1, on the batch calls of the item
+endpoints. Each protocol has its own local stub server serving the same generated data
+(:class:`hubblepy.testing.StubServer` and :class:`hubblepy.testing.HTTP2StubServer`), in a separate process.
+
+Both clients are given the same budget of connections: over HTTP/1.1, no more than :code:`--connections` requests
+are in flight at once and further workers wait for a connection, while over HTTP/2 the requests of every worker are
+multiplexed over one connection. For each endpoint, number of workers and protocol, calls per second and the median
+and 99th percentile latency of the requests are reported. Run from the root of the repository:
+
+    python benchmarks/http2.py --latency 50 --workers 8 32 64 --output results.json
+
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import socket
+import sys
+import time
+from datetime import datetime, timezone
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+import hubblepy  # noqa: E402
+from hubblepy.instrumentation import Instrumentation  # noqa: E402
+from hubblepy.testing import HTTP2StubServer, StubServer  # noqa: E402
+from hubblepy.transport import HTTP2Adapter  # noqa: E402
+
+
+# The name of each scenario, and the function of the number of ids making its batch call.
+scenarios = [
+    ('images', lambda n, c: hubblepy.images(list(range(4000, 4000 + n)), client=c)),
+    ('videos', lambda n, c: hubblepy.videos(list(range(n)), client=c)),
+    ('news_release', lambda n, c: hubblepy.news_release(['STScI-{:04d}'.format(i) for i in range(n)], client=c)),
+    ('glossary_term', lambda n, c: hubblepy.glossary_term(['term-{}'.format(i) for i in range(n)], client=c)),
+    ('rss_posts', lambda n, c: hubblepy.rss_posts('esa_feed', ['2018-09-{:02d}T11:00:00.000-04:00'.format(i % 28 + 1)
+                                                               for i in range(n)], client=c)),
+]
+
+
+def _serve(http2, port, latency, payload_size):
+    server = (HTTP2StubServer if http2 else StubServer)(latency=latency, payload_size=payload_size, port=port)
+    server.serve_forever()
+
+
+def start(http2, latency=0, payload_size=500):
+    r"""
+    Starts a stub server in a separate process, so that its work is not counted in the benchmarks. Returns the
+    process and the address of the server.
+
+    """
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+
+    process = multiprocessing.Process(target=_serve, args=(http2, port, latency, payload_size))
+    process.daemon = True
+    process.start()
+
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+
+    return process, ('127.0.0.1', port)
+
+
+def http1_client(address, workers, connections):
+    session = requests.Session()
+    session.trust_env = False
+    session.proxies = {'http': 'http://{}:{}'.format(*address)}
+
+    return hubblepy.Client(session=session, max_workers=workers, pool_maxsize=connections, pool_block=True,
+                           instrumentation=Instrumentation())
+
+
+def http2_client(address, workers, connections):
+    session = requests.Session()
+    session.trust_env = False
+    adapter = HTTP2Adapter(max_connections=connections, prior_knowledge=True, connect_to=address)
+
+    return hubblepy.Client(session=session, max_workers=workers, http2=adapter, instrumentation=Instrumentation())
+
+
+def percentile(latencies, q):
+    ordered = sorted(latencies)
+
+    return ordered[min(len(ordered) - 1, int(q / 100.0 * len(ordered)))]
+
+
+def measure(make_client, scenario, calls):
+    r"""
+    Makes the batch call of :code:`calls` ids on a new client, after warming up its connections, and returns the
+    statistics of the run. The latency of every request is collected with an instrumentation hook.
+
+    """
+    with make_client() as client:
+        scenario(client.max_workers, client)
+
+        latencies = []
+        client.instrumentation.on_response(lambda endpoint, url, params, response, seconds, error:
+                                           latencies.append(seconds))
+
+        wall = time.perf_counter()
+        scenario(calls, client)
+        wall = time.perf_counter() - wall
+
+        protocols = dict(client.http2.protocols) if client.http2 is not None else {'HTTP/1.1': None}
+
+    return {
+        'calls': calls,
+        'calls_per_sec': calls / wall,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+        'protocol': max(protocols, key=lambda name: protocols[name] or 0),
+    }
+
+
+def metadata(args):
+    return {
+        'date': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'calls': args.calls,
+        'workers': args.workers,
+        'connections': args.connections,
+        'latency_ms': args.latency,
+        'payload_size': args.payload_size,
+    }
+
+
+def report(result, baseline=None):
+    line = '{:<16}{:>8}{:<2}{:<10}{:>10.0f}{:>10.2f}{:>10.2f}'.format(
+        result['endpoint'], result['workers'], '', result['protocol'], result['calls_per_sec'], result['p50_ms'],
+        result['p99_ms'])
+
+    if baseline is not None:
+        line += '{:>+10.1%}{:>+10.1%}'.format(result['calls_per_sec'] / baseline['calls_per_sec'] - 1,
+                                             result['p99_ms'] / baseline['p99_ms'] - 1)
+
+    print(line)
+
+
+header = '{:<16}{:>8}{:<2}{:<10}{:>10}{:>10}{:>10}{:>10}{:>10}'.format('endpoint', 'workers', '', 'protocol',
+                                                                      'calls/s', 'p50 ms', 'p99 ms', 'd calls/s',
+                                                                      'd p99')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--calls', type=int, default=500, help='ids per batch call')
+    parser.add_argument('--workers', type=int, nargs='*', default=[8, 32, 64], help='numbers of workers to compare')
+    parser.add_argument('--connections', type=int, default=10, help='connections per client (default: 10)')
+    parser.add_argument('--latency', type=float, default=50, help='milliseconds added to every response')
+    parser.add_argument('--payload-size', type=int, default=500, help='characters of the generated text fields')
+    parser.add_argument('--endpoints', nargs='*', help='only benchmark these endpoints')
+    parser.add_argument('--output', help='write the results to this JSON file')
+    args = parser.parse_args()
+
+    http1, http1_address = start(False, args.latency / 1000, args.payload_size)
+    http2, http2_address = start(True, args.latency / 1000, args.payload_size)
+    results = []
+
+    try:
+        print(header)
+
+        for name, scenario in scenarios:
+            if args.endpoints and name not in args.endpoints:
+                continue
+
+            for workers in args.workers:
+                baseline = dict(measure(lambda: http1_client(http1_address, workers, args.connections), scenario,
+                                        args.calls), endpoint=name, workers=workers)
+                result = dict(measure(lambda: http2_client(http2_address, workers, args.connections), scenario,
+                                      args.calls), endpoint=name, workers=workers)
+                results += [baseline, result]
+                report(baseline)
+                report(result, baseline)
+    finally:
+        http1.terminate()
+        http2.terminate()
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'meta': metadata(args), 'results': results}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,163 @@
+r"""
+Local stub of the HubbleSite API for the benchmarks, replaying the response bodies recorded in the test cassettes.
+
+Requests for recorded URLs get their recorded body. Requests for other ids of an item endpoint (such as
+:code:`image/1234`) get a recorded body of the same endpoint, so any number of distinct ids can be requested; pages
+past the recorded ones are empty. The server is reached as an HTTP proxy, so the clients keep requesting
+:code:`http://hubblesite.org/api/v3/...` URLs and no hubblepy code is changed to benchmark it:
+
+    python benchmarks/server.py --port 8765 --latency 20
+
+"""
+import argparse
+import glob
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from hubblepy.api import _endpoint_name  # noqa: E402
+from hubblepy.testing import StubServer  # noqa: E402
+
+
+default_cassettes = os.path.join(os.path.dirname(__file__), '..', 'tests', 'cassettes')
+
+item_endpoints = ('news_release', 'images', 'videos', 'glossary_term', 'rss_posts')
+
+
+def _normalize(url):
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query)))
+
+    return parts.path + ('?' + query if query else '')
+
+
+def recorded_bodies(directory=default_cassettes):
+    r"""
+    Returns a dict mapping the path and sorted query string of every successful recorded request to its body.
+
+    """
+    bodies = {}
+
+    for path in sorted(glob.glob(os.path.join(directory, '*.yml'))):
+        with open(path) as f:
+            cassette = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+        for interaction in cassette['interactions']:
+            if interaction['response']['status']['code'] == 200:
+                bodies.setdefault(_normalize(interaction['request']['uri']),
+                                  interaction['response']['body']['string'].encode('utf-8'))
+
+    return bodies
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    # Set on the subclass created by make_server.
+    bodies = {}
+    fallbacks = {}
+    latency = 0
+
+    def do_GET(self):
+        # Proxied requests carry the absolute URL; direct requests only its path.
+        url = self.path if self.path.startswith('http') else 'http://hubblesite.org' + self.path
+        body = self.bodies.get(_normalize(url))
+
+        if body is None:
+            endpoint = _endpoint_name(url)
+            body = self.fallbacks.get(endpoint, b'[]' if endpoint is not None else None)
+
+        if self.latency:
+            time.sleep(self.latency)
+
+        if body is None:
+            self.send_response(404)
+            body = b'{"error": "not found"}'
+        else:
+            self.send_response(200)
+
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(port=0, latency=0, cassettes=default_cassettes):
+    r"""
+    Returns a :code:`ThreadingHTTPServer` replaying the cassettes on the given port (0 for any free port), answering
+    each request after :code:`latency` seconds.
+
+    """
+    bodies = recorded_bodies(cassettes)
+    fallbacks = {}
+
+    for path, body in sorted(bodies.items()):
+        endpoint = _endpoint_name('http://hubblesite.org' + path)
+
+        if endpoint in item_endpoints:
+            fallbacks.setdefault(endpoint, body)
+
+    handler = type('Handler', (ReplayHandler,), {'bodies': bodies, 'fallbacks': fallbacks, 'latency': latency})
+    server = ThreadingHTTPServer(('127.0.0.1', port), handler)
+    server.daemon_threads = True
+
+    return server
+
+
+def _serve(port, latency, cassettes, synthetic):
+    if synthetic is not None:
+        StubServer(port=port, latency=latency, **synthetic).serve_forever()
+    else:
+        make_server(port, latency, cassettes).serve_forever()
+
+
+def start(latency=0, cassettes=default_cassettes, synthetic=None):
+    r"""
+    Starts the server in a separate process, so that its work is not counted in the benchmarks. Returns the process
+    and the proxy URL to send the requests to. If :code:`synthetic` is a dict, the generated data of a
+    :class:`hubblepy.testing.StubServer` created with it as keyword arguments is served instead of the cassettes.
+
+    """
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        port = s.getsockname()[1]
+
+    process = multiprocessing.Process(target=_serve, args=(port, latency, cassettes, synthetic))
+    process.daemon = True
+    process.start()
+
+    for _ in range(100):
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            break
+        except OSError:
+            time.sleep(0.05)
+
+    return process, 'http://127.0.0.1:{}'.format(port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0, help='milliseconds added to every response')
+    parser.add_argument('--cassettes', default=default_cassettes)
+    args = parser.parse_args()
+
+    print('Serving on http://127.0.0.1:{}'.format(args.port))
+    make_server(args.port, args.latency / 1000, args.cassettes).serve_forever()
+
+
+if __name__ == '__main__':
+    main()
@@ -1,2 +1,22 @@
 from .api import news, news_release, glossary, glossary_term, image_collections, images, video_collections, \
     videos, rss, rss_posts
+from .client import Client, get_default_client, set_default_client
+from .exceptions import HubblepyError, BatchError, DownloadError, DeadlineExceeded
+from .cache import MemoryCache, SQLiteCache
+from .memo import Memo
+from .download import download_file
+from .selection import select_file, select_files, select_assets
+from .sync import SyncState, sync_news, sync_rss
+from .mirror import Mirror
+from .search import SearchIndex
+from .export import to_arrow, to_pandas, to_columns
+from .records import NewsItem, NewsRelease, Image, ImageFile, Video, VideoFile, GlossaryTerm, FeedPost
+from .decoders import Decoder
+from .ratelimit import TokenBucket, Retry
+from .timeouts import deadline, Hedge
+from .singleflight import SingleFlight, AsyncSingleFlight
+from .instrumentation import Instrumentation, PrometheusExporter, OpenTelemetryExporter
+from .thumbnails import ThumbnailCache, thumbnail_urls
+from .crawl import crawl, ReleaseGraph
+from .streaming import Stream, ItemParser, iter_items
+from .transport import HTTP2Adapter
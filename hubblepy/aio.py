@@ -0,0 +1,621 @@
+r"""
+Asynchronous versions of the :mod:`hubblepy.api` functions for use inside an :mod:`asyncio` event loop. Requests are
+sent with :code:`httpx`, which must be installed separately (:code:`pip install hubblepy[async]`).
+
+>>> from hubblepy import aio
+>>> async def main():
+...     async with aio.AsyncClient(max_concurrency=20) as client:
+...         return await aio.images([4229, 4230], client=client)
+
+Functions called with :code:`page='all'` return an asynchronous generator of the items of every page:
+
+>>> async def main():
+...     return [term async for term in await aio.glossary(page='all')]
+
+"""
+import asyncio
+import json
+import time
+import weakref
+from urllib.parse import urljoin
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+from .api import api_url, page_size, _endpoint_name, _return_types
+from .decoders import Decoder
+from .exceptions import BatchError, DeadlineExceeded
+from .instrumentation import Instrumentation
+from .ratelimit import Retry, TokenBucket, retry_after
+from .singleflight import AsyncSingleFlight
+from .timeouts import past_deadline, remaining, request_timeout
+
+
+class AsyncClient(object):
+    r"""
+    Pooled asynchronous HTTP client used to send requests to the HubbleSite API. All requests share one
+    :code:`httpx.AsyncClient`, and so one pool of keep-alive connections.
+
+    Parameters
+    ----------
+    max_connections : int
+        The maximum number of connections opened at once. Defaults to 10.
+    max_keepalive_connections : int
+        The maximum number of idle connections kept alive. Defaults to 10.
+    max_concurrency : int
+        The maximum number of requests of a list or tuple argument (several ids or pages) that are in flight at once.
+        Defaults to 10.
+    headers : dict or None
+        Additional headers sent with every request.
+    client : httpx.AsyncClient or None
+        An existing :code:`httpx.AsyncClient` to use. If None, a new one is created.
+    decoder : str, Decoder or None
+        The JSON library used to decode responses, as for :class:`hubblepy.client.Client`.
+    rate_limit : TokenBucket, float or None
+        The :class:`~hubblepy.ratelimit.TokenBucket` pacing the requests, as for :class:`hubblepy.client.Client`.
+        Giving the same bucket to a :class:`~hubblepy.client.Client` paces the threaded and asynchronous requests
+        together.
+    retry : Retry, int or None
+        The :class:`~hubblepy.ratelimit.Retry` policy of failed requests, as for :class:`hubblepy.client.Client`.
+    timeout : float, tuple or None
+        The timeout of each request, as a number or a :code:`(connect, read)` tuple. Defaults to :code:`(5, 30)`.
+        Within a :func:`~hubblepy.timeouts.deadline`, timeouts are shortened to the time left.
+    hedge : Hedge or None
+        A :class:`~hubblepy.timeouts.Hedge` policy, as for :class:`hubblepy.client.Client`. The slower of the two
+        requests is cancelled.
+    single_flight : AsyncSingleFlight, bool or None
+        If True or an :class:`~hubblepy.singleflight.AsyncSingleFlight`, identical requests made concurrently by
+        several tasks share one request and its result. Defaults to None.
+    instrumentation : Instrumentation, bool or None
+        An :class:`~hubblepy.instrumentation.Instrumentation` measuring the requests, as for
+        :class:`hubblepy.client.Client`. It can be shared with a :class:`~hubblepy.client.Client`.
+    prefetch : bool
+        If True (the default), functions called with :code:`page='all'` request the next page as a separate task
+        while the items of the current page are being consumed, as for :class:`hubblepy.client.Client`.
+
+    """
+    def __init__(self, max_connections=10, max_keepalive_connections=10, max_concurrency=10, headers=None,
+                 client=None, decoder=None, rate_limit=None, retry=None, timeout=(5, 30), hedge=None,
+                 single_flight=None, instrumentation=None, prefetch=True):
+        if httpx is None:
+            raise ImportError('hubblepy.aio requires httpx. Install it with: pip install hubblepy[async]')
+
+        self.max_concurrency = max_concurrency
+        self.decoder = decoder if isinstance(decoder, Decoder) else Decoder(decoder)
+        self.rate_limit = rate_limit if isinstance(rate_limit, TokenBucket) or rate_limit is None \
+            else TokenBucket(rate_limit)
+        self.retry = retry if isinstance(retry, Retry) or retry is None else Retry(total=retry)
+        self.timeout = timeout
+        self.hedge = hedge
+        self.single_flight = AsyncSingleFlight() if single_flight is True else single_flight or None
+        self.instrumentation = Instrumentation() if instrumentation is True else instrumentation or None
+        self.prefetch = prefetch
+
+        if client is None:
+            client = httpx.AsyncClient(limits=httpx.Limits(max_connections=max_connections,
+                                                           max_keepalive_connections=max_keepalive_connections),
+                                       headers=headers)
+
+        self.client = client
+
+        self._semaphore = None
+
+    @property
+    def semaphore(self):
+        r"""
+        The semaphore bounding the number of concurrent requests of a batch. It is created on first use so that it
+        belongs to the running event loop.
+
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        return self._semaphore
+
+    async def get(self, url, params=None):
+        r"""
+        Sends a GET request over the pooled connection, pacing it with the rate limiter and retrying it according to
+        the retry policy.
+
+        Parameters
+        ----------
+        url : str
+            The URL to request.
+        params : dict or None
+            Query string parameters of the request. Parameters set to None are left out, as :code:`requests` does.
+
+        Returns
+        -------
+        httpx.Response
+            The response of the request.
+
+        """
+        if params is not None:
+            params = {k: v for k, v in params.items() if v is not None}
+
+        attempt = 0
+        errors = (httpx.TransportError,) if self.retry is not None and self.retry.connection_errors else ()
+
+        while True:
+            if self.rate_limit is not None:
+                await self.rate_limit.acquire_async()
+
+            try:
+                r = await self._attempt(url, params)
+            except errors:
+                if attempt >= self.retry.total:
+                    raise
+
+                delay = self.retry.delay(attempt)
+
+                if past_deadline(delay):
+                    raise
+            else:
+                wait = retry_after(r.headers) if r.status_code in (429, 503) else None
+
+                if self.rate_limit is not None:
+                    self.rate_limit.observe(r.status_code, wait)
+
+                if self.retry is None or r.status_code not in self.retry.statuses or attempt >= self.retry.total:
+                    return r
+
+                delay = self.retry.delay(attempt, wait)
+
+                if past_deadline(delay):
+                    return r
+
+            if self.instrumentation is not None:
+                self.instrumentation.count('retries', _endpoint_name(url))
+
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    async def _attempt(self, url, params):
+        timeout = request_timeout(self.timeout)
+
+        if isinstance(timeout, tuple):
+            timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+        else:
+            timeout = httpx.Timeout(timeout)
+
+        endpoint = _endpoint_name(url)
+        delay = self.hedge.delay(endpoint) if self.hedge is not None else None
+
+        if delay is not None:
+            request = self._hedged(url, params, endpoint, timeout, delay)
+        else:
+            request = self._timed(url, params, endpoint, timeout)
+
+        left = remaining()
+
+        try:
+            # Unlike the connect and read timeouts, waiting with a timeout bounds the total time of the request.
+            if left is not None:
+                return await asyncio.wait_for(request, left)
+
+            return await request
+
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded('The request did not complete before the deadline.')
+        except httpx.TimeoutException as e:
+            if past_deadline(0):
+                raise DeadlineExceeded('The request did not complete before the deadline: {}'.format(e))
+
+            raise
+
+    async def _timed(self, url, params, endpoint, timeout):
+        instrumentation = self.instrumentation
+
+        if instrumentation is not None:
+            instrumentation.request_started(endpoint, url, params)
+
+        start = time.monotonic()
+
+        try:
+            r = await self.client.get(url, params=params, timeout=timeout)
+        except Exception as e:
+            if instrumentation is not None:
+                instrumentation.request_finished(endpoint, url, params, None, time.monotonic() - start, e)
+
+            raise
+
+        seconds = time.monotonic() - start
+
+        if self.hedge is not None and self.hedge.applies(endpoint):
+            self.hedge.record(endpoint, seconds)
+        if instrumentation is not None:
+            instrumentation.request_finished(endpoint, url, params, r, seconds)
+
+        return r
+
+    async def _hedged(self, url, params, endpoint, timeout, delay):
+        tasks = [asyncio.ensure_future(self._timed(url, params, endpoint, timeout))]
+
+        try:
+            done, pending = await asyncio.wait(tasks, timeout=delay)
+
+            if not done:
+                if self.rate_limit is not None:
+                    await self.rate_limit.acquire_async()
+
+                self.hedge.sent()
+                tasks.append(asyncio.ensure_future(self._timed(url, params, endpoint, timeout)))
+                done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+
+                # Use the other request if the first to complete failed.
+                if all(t.exception() is not None for t in done) and pending:
+                    done, pending = await asyncio.wait(pending)
+
+            winner = next((t for t in done if t.exception() is None), next(iter(done)))
+
+            return winner.result()
+
+        finally:
+            # The slower request is cancelled, as are both if the caller is cancelled or times out.
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def aclose(self):
+        r"""
+        Closes the underlying client and its pooled connections.
+
+        """
+        await self.client.aclose()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        await self.aclose()
+
+
+_default_clients = weakref.WeakKeyDictionary()
+
+
+def get_default_client():
+    r"""
+    Returns the client used by the :mod:`hubblepy.aio` functions when no :code:`client` is given. One client is
+    created per event loop, on first use, and closed when the loop shuts down its asynchronous generators
+    (:code:`loop.shutdown_asyncgens()`, which :func:`asyncio.run` calls before closing the loop). A loop closed without
+    it leaves the connections of its client to the garbage collector; pass a :class:`AsyncClient` used as an
+    :code:`async with` block to close them explicitly.
+
+    Returns
+    -------
+    AsyncClient
+        The default client of the running event loop.
+
+    """
+    loop = asyncio.get_event_loop()
+
+    if loop not in _default_clients:
+        client = AsyncClient()
+        closer = None
+
+        if loop.is_running():
+            # Starting the generator registers it with the loop, so the loop closes it (and the client) at shutdown.
+            closer = _close_at_shutdown(client)
+            asyncio.ensure_future(closer.asend(None))
+
+        _default_clients[loop] = (client, closer)
+
+    return _default_clients[loop][0]
+
+
+async def _close_at_shutdown(client):
+    try:
+        yield
+    finally:
+        await client.aclose()
+
+
+async def news(page=None, return_type='json', client=None):
+    r"""
+    Asynchronous version of :func:`hubblepy.api.news`.
+
+    """
+    endpoint = urljoin(api_url, 'news')
+
+    if page == 'all':
+        res = _paginate(endpoint, return_type=return_type, client=client)
+
+    elif page is None or not isinstance(page, (tuple, list)):
+        res = await _request(endpoint, params={'page': page}, return_type=return_type, client=client)
+
+    else:
+        res = await _request_many([(i, endpoint, {'page': i}) for i in page], return_type=return_type, client=client)
+
+    return res
+
+
+async def news_release(which, return_type='json', client=None):
+    r"""
+    Asynchronous version of :func:`hubblepy.api.news_release`.
+
+    """
+    endpoint = urljoin(api_url, 'news_release/')
+
+    if which is None or not isinstance(which, (tuple, list)):
+        res = await _request(urljoin(endpoint, which), return_type=return_type, client=client)
+
+    else:
+        res = await _request_many([(i, urljoin(endpoint, i), None) for i in which],
+                                  return_type=return_type, client=client)
+
+    return res
+
+
+async def image_collections(page=None, collection_name=None, return_type='json', client=None):
+    r"""
+    Asynchronous version of :func:`hubblepy.api.image_collections`.
+
+    """
+    endpoint = urljoin(api_url, 'images/')
+
+    if page == 'all':
+        res = _paginate(urljoin(endpoint, collection_name), return_type=return_type, client=client)
+
+    elif not isinstance(page, (list, tuple)):
+        res = await _request(urljoin(endpoint, collection_name), params={'page': page}, return_type=return_type,
+                             client=client)
+
+    else:
+        res = await _request_many([(i, urljoin(endpoint, collection_name), {'page': i}) for i in page],
+                                  return_type=return_type, client=client)
+
+    return res
+
+
+async def images(image_id, return_type='json', client=None):
+    r"""
+    Asynchronous version of :func:`hubblepy.api.images`.
+
+    """
+    endpoint = urljoin(api_url, 'image/')
+
+    if not isinstance(image_id, (list, tuple)):
+        res = await _request(urljoin(endpoint, str(image_id)), return_type=return_type, client=client)
+
+    else:
+        res = await _request_many([(i, urljoin(endpoint, str(i)), None) for i in image_id],
+                                  return_type=return_type, client=client)
+
+    return res
+
+
+async def video_collections(page=None, collection_name=None, return_type='json', client=None):
+    r"""
+    Asynchronous version of :func:`hubblepy.api.video_collections`.
+
+    """
+    endpoint = urljoin(api_url, 'videos/')
+
+    if page == 'all':
+        res = _paginate(urljoin(endpoint, collection_name), return_type=return_type, client=client)
+
+    elif not isinstance(page, (list, tuple)):
+        res = await _request(urljoin(endpoint, collection_name), params={'page': page}, return_type=return_type,
+                             client=client)
+
+    else:
+        res = await _request_many([(i, urljoin(endpoint, collection_name), {'page': i}) for i in page],
+                                  return_type=return_type, client=client)
+
+    return res
+
+
+async def videos(video_id, return_type='json', client=None):
+    r"""
+    Asynchronous version of :func:`hubblepy.api.videos`.
+
+    """
+    endpoint = urljoin(api_url, 'video/')
+
+    if not isinstance(video_id, (list, tuple)):
+        res = await _request(urljoin(endpoint, str(video_id)), return_type=return_type, client=client)
+
+    else:
+        res = await _request_many([(i, urljoin(endpoint, str(i)), None) for i in video_id],
+                                  return_type=return_type, client=client)
+
+    return res
+
+
+async def glossary(page=None, return_type='json', client=None):
+    r"""
+    Asynchronous version of :func:`hubblepy.api.glossary`.
+
+    """
+    endpoint = urljoin(api_url, 'glossary')
+
+    if page == 'all':
+        res = _paginate(endpoint, return_type=return_type, client=client)
+
+    elif not isinstance(page, (list, tuple)):
+        res = await _request(endpoint, params={'page': page}, return_type=return_type, client=client)
+
+    else:
+        res = await _request_many([(i, endpoint, {'page': i}) for i in page], return_type=return_type, client=client)
+
+    return res
+
+
+async def glossary_term(term, return_type='json', client=None):
+    r"""
+    Asynchronous version of :func:`hubblepy.api.glossary_term`.
+
+    """
+    endpoint = urljoin(api_url, 'glossary/')
+
+    if not isinstance(term, (list, tuple)):
+        res = await _request(urljoin(endpoint, term), return_type=return_type, client=client)
+
+    else:
+        res = await _request_many([(i, urljoin(endpoint, i), None) for i in term],
+                                  return_type=return_type, client=client)
+
+    return res
+
+
+async def rss(feed_name, page=None, sort='desc', return_type='json', client=None):
+    r"""
+    Asynchronous version of :func:`hubblepy.api.rss`.
+
+    """
+    endpoint = urljoin(api_url, 'external_feed/')
+
+    if sort == 'desc':
+        sort = '-pub_date'
+    else:
+        sort = 'pub_date'
+
+    if page == 'all':
+        res = _paginate(urljoin(endpoint, feed_name), params={'sort': sort}, return_type=return_type, client=client)
+
+    elif not isinstance(page, (list, tuple)):
+        res = await _request(urljoin(endpoint, feed_name), params={'page': page,
+                                                                   'sort': sort}, return_type=return_type,
+                             client=client)
+
+    else:
+        res = await _request_many([(i, urljoin(endpoint, feed_name), {'page': i, 'sort': sort}) for i in page],
+                                  return_type=return_type, client=client)
+
+    return res
+
+
+async def rss_posts(feed_name, pub_date, return_type='json', client=None):
+    r"""
+    Asynchronous version of :func:`hubblepy.api.rss_posts`.
+
+    """
+    endpoint = urljoin(api_url, 'external_feed/')
+
+    if not isinstance(pub_date, (list, tuple)):
+        res = await _request(urljoin(endpoint, feed_name) + '/' + pub_date, return_type=return_type, client=client)
+
+    else:
+        res = await _request_many([(i, urljoin(endpoint, feed_name) + '/' + i, None) for i in pub_date],
+                                  return_type=return_type, client=client)
+
+    return res
+
+
+async def _request(url, params=None, return_type='json', client=None):
+    r"""
+    Internal function for sending a request through the given (or default) client and coercing the result.
+
+    """
+    if client is None:
+        client = get_default_client()
+
+    if return_type == 'stream':
+        raise ValueError("'stream' is not supported by hubblepy.aio, whose responses are read whole.")
+
+    if client.single_flight is not None:
+        key = (url, tuple(sorted(params.items())) if params else (), return_type)
+
+        return await client.single_flight.do(key, _fetch, url, params, return_type, client)
+
+    return await _fetch(url, params, return_type, client)
+
+
+async def _fetch(url, params, return_type, client):
+    r = await client.get(url, params=params)
+    endpoint = _endpoint_name(url)
+
+    if client.instrumentation is not None:
+        start = time.monotonic()
+        res = _return_types(r, return_type, endpoint, client.decoder)
+        client.instrumentation.observe('decode_seconds', endpoint, time.monotonic() - start)
+
+        return res
+
+    return _return_types(r, return_type, endpoint, client.decoder)
+
+
+async def _paginate(url, params=None, return_type='json', client=None):
+    r"""
+    Internal asynchronous generator for walking every page of a paginated endpoint. Works like
+    :func:`hubblepy.api._paginate`: iteration stops after the first short page, and unless the :code:`prefetch`
+    setting of the client is off, the next page is requested as a separate task while the items of the current page
+    are being consumed.
+
+    """
+    if client is None:
+        client = get_default_client()
+
+    params = params or {}
+
+    def fetch(page):
+        return _request(url, params=dict({'page': page}, **params), return_type=return_type, client=client)
+
+    page = 1
+    res = await fetch(page)
+    next_res = None
+
+    try:
+        while True:
+            items = res if return_type in ('json', 'record') else json.loads(res)
+            more = len(items) >= page_size
+
+            if more:
+                page += 1
+
+                if client.prefetch:
+                    next_res = asyncio.ensure_future(fetch(page))
+
+            if return_type in ('json', 'record'):
+                for item in items:
+                    yield item
+            else:
+                yield res
+
+            if not more:
+                break
+
+            res = await (next_res if next_res is not None else fetch(page))
+            next_res = None
+
+    finally:
+        if next_res is not None:
+            next_res.cancel()
+
+
+async def _request_many(items, return_type='json', client=None):
+    r"""
+    Internal function for sending a batch of :code:`(key, url, params)` requests concurrently, with at most
+    :code:`client.max_concurrency` in flight at once. Results are returned in the same order as :code:`items`, and
+    failures are raised together as a :class:`~hubblepy.exceptions.BatchError` once every request has finished.
+
+    """
+    if client is None:
+        client = get_default_client()
+
+    async def bounded(url, params):
+        async with client.semaphore:
+            return await _request(url, params, return_type=return_type, client=client)
+
+    results = await asyncio.gather(*[bounded(url, params) for _, url, params in items], return_exceptions=True)
+
+    # Only errors of the requests are collected; the cancellation of a request and the like are raised as they are.
+    for result in results:
+        if isinstance(result, BaseException) and not isinstance(result, Exception):
+            raise result
+
+    res, errors = [], {}
+
+    for (key, _, _), result in zip(items, results):
+        if isinstance(result, Exception):
+            res.append(None)
+            errors[key] = result
+        else:
+            res.append(result)
+
+    if errors:
+        raise BatchError(errors, res)
+
+    return res
@@ -1,14 +1,25 @@
-import requests
+import contextvars
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
 from urllib.parse import urljoin
 
+from .client import get_default_client
+from .exceptions import BatchError
+from .memo import missing
+from .records import from_json
+from .streaming import Stream
+
 
 base_url = 'http://hubblesite.org/api/'
 api_version = 'v3/'
 
 api_url = urljoin(base_url, api_version)
 
+page_size = 25
+
 
-def news(page=None, return_type='json'):
+def news(page=None, return_type='json', client=None):
     r"""
     Returns metadata including the id, name and url of published releases produced by the Office of Public Outreach
     of the Space Telescope Science Institute. Each result set (page) contains 25 items (if available).
@@ -17,13 +28,19 @@ def news(page=None, return_type='json'):
     ----------
     page : list, tuple, str, int, or None
         The page number of the published releases to return. Can be a list or tuple of ints, a str or int, or None.
-        'all' returns all pages.
-    return_type : str, {'json', 'content', 'text'}
-        Specifies the return type of the results. Defaults to JSON.
+        'all' returns a generator that yields the results of every page as the pages arrive, stopping at the first
+        empty or short page. The next page is prefetched while the current one is being consumed.
+    return_type : str, {'json', 'content', 'text', 'record', 'stream'}
+        Specifies the return type of the results. Defaults to JSON. 'record' returns the compact record objects of
+        :mod:`hubblepy.records`. 'stream' returns a :class:`~hubblepy.streaming.Stream` reading the response body as
+        it is consumed.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the request(s). If None, the shared client returned by
+        :func:`~hubblepy.client.get_default_client` is used.
 
     Returns
     -------
-    list
+    list or generator
         List of results.
 
     Examples
@@ -63,23 +80,19 @@ def news(page=None, return_type='json'):
     """
     endpoint = urljoin(api_url, 'news')
 
-    if page is None or not isinstance(page, (tuple, list)):
-        r = requests.get(endpoint, params={'page': page})
-        res = _return_types(r, return_type)
-
-    else:
-        res = []
+    if page == 'all':
+        res = _paginate(endpoint, return_type=return_type, client=client)
 
-        for i in page:
-            r = requests.get(endpoint, params={'page': i})
-            r = _return_types(r, return_type)
+    elif page is None or not isinstance(page, (tuple, list)):
+        res = _request(endpoint, params={'page': page}, return_type=return_type, client=client)
 
-            res.append(r)
+    else:
+        res = _request_many([(i, endpoint, {'page': i}) for i in page], return_type=return_type, client=client)
 
     return res
 
 
-def news_release(which, return_type='json'):
+def news_release(which, return_type='json', client=None):
     r"""
     Returns more detailed metadata including the abstract, image thumbnails, and more, of a published release.
 
@@ -89,8 +102,13 @@ def news_release(which, return_type='json'):
         Specifies which news release content to return. Possible values include 'last' for the last news release
         published, 'first', which returns the first published release, and the release identifier in the format
         YYYY-NN.
-    return_type : str, {'json', 'content', 'text'}
-        Specifies the return type of the results. Defaults to JSON.
+    return_type : str, {'json', 'content', 'text', 'record', 'stream'}
+        Specifies the return type of the results. Defaults to JSON. 'record' returns the compact record objects of
+        :mod:`hubblepy.records`. 'stream' returns a :class:`~hubblepy.streaming.Stream` reading the response body as
+        it is consumed.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the request(s). If None, the shared client returned by
+        :func:`~hubblepy.client.get_default_client` is used.
 
     Returns
     -------
@@ -200,22 +218,16 @@ def news_release(which, return_type='json'):
     endpoint = urljoin(api_url, 'news_release/')
 
     if which is None or not isinstance(which, (tuple, list)):
-        r = requests.get(urljoin(endpoint, which))
-        res = _return_types(r, return_type)
+        res = _request(urljoin(endpoint, which), return_type=return_type, client=client)
 
     else:
-        res = []
-
-        for i in which:
-            r = requests.get(urljoin(endpoint, i))
-            r = _return_types(r, return_type)
-
-            res.append(r)
+        res = _request_many([(i, urljoin(endpoint, i), None) for i in which],
+                            return_type=return_type, client=client)
 
     return res
 
 
-def image_collections(page=None, collection_name=None, return_type='json'):
+def image_collections(page=None, collection_name=None, return_type='json', client=None):
     r"""
     Returns metadata including the id, name, name of the associated news release, collection and mission of images
     from different collections available on the HubbleSite.
@@ -224,16 +236,22 @@ def image_collections(page=None, collection_name=None, return_type='json'):
     ----------
     page : list, tuple, str, int, or None
         The page number of the published images to return. Can be a list or tuple of ints, a str or int, or None.
-        'all' returns all pages.
+        'all' returns a generator that yields the results of every page as the pages arrive, stopping at the first
+        empty or short page. The next page is prefetched while the current one is being consumed.
     collection_name : list, str, or None
         The name of the collection to return images. Collections are sets of images such as 'news', 'spacecraft',
         etc. If 'all', returns all images from all collections.
-    return_type : str, {'json', 'content', 'text'}
-        Specifies the return type of the results. Defaults to JSON.
+    return_type : str, {'json', 'content', 'text', 'record', 'stream'}
+        Specifies the return type of the results. Defaults to JSON. 'record' returns the compact record objects of
+        :mod:`hubblepy.records`. 'stream' returns a :class:`~hubblepy.streaming.Stream` reading the response body as
+        it is consumed.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the request(s). If None, the shared client returned by
+        :func:`~hubblepy.client.get_default_client` is used.
 
     Returns
     -------
-    list
+    list or generator
         List of results
 
     Examples
@@ -273,23 +291,21 @@ def image_collections(page=None, collection_name=None, return_type='json'):
     """
     endpoint = urljoin(api_url, 'images/')
 
-    if not isinstance(page, (list, tuple)):
-        r = requests.get(urljoin(endpoint, collection_name), params={'page': page})
-        res = _return_types(r, return_type)
-
-    else:
-        res = []
+    if page == 'all':
+        res = _paginate(urljoin(endpoint, collection_name), return_type=return_type, client=client)
 
-        for i in page:
-            r = requests.get(urljoin(endpoint, collection_name), params={'page': i})
-            r = _return_types(r, return_type)
+    elif not isinstance(page, (list, tuple)):
+        res = _request(urljoin(endpoint, collection_name), params={'page': page}, return_type=return_type,
+                       client=client)
 
-            res.append(r)
+    else:
+        res = _request_many([(i, urljoin(endpoint, collection_name), {'page': i}) for i in page],
+                            return_type=return_type, client=client)
 
     return res
 
 
-def images(image_id, return_type='json'):
+def images(image_id, return_type='json', client=None):
     r"""
     Returns more specific metadata of available images including the description, credits, the location of the image
     files and more.
@@ -298,8 +314,13 @@ def images(image_id, return_type='json'):
     ----------
     image_id : list, tuple, str, int
         A list or tuple of str or int representing the image ids to return.
-    return_type : str, {'json', 'content', 'text'}
-        Specifies the return type of the results. Defaults to JSON.
+    return_type : str, {'json', 'content', 'text', 'record', 'stream'}
+        Specifies the return type of the results. Defaults to JSON. 'record' returns the compact record objects of
+        :mod:`hubblepy.records`. 'stream' returns a :class:`~hubblepy.streaming.Stream` reading the response body as
+        it is consumed.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the request(s). If None, the shared client returned by
+        :func:`~hubblepy.client.get_default_client` is used.
 
     Returns
     -------
@@ -391,22 +412,16 @@ def images(image_id, return_type='json'):
     endpoint = urljoin(api_url, 'image/')
 
     if not isinstance(image_id, (list, tuple)):
-        r = requests.get(urljoin(endpoint, str(image_id)))
-        res = _return_types(r, return_type)
+        res = _request(urljoin(endpoint, str(image_id)), return_type=return_type, client=client)
 
     else:
-        res = []
-
-        for i in image_id:
-            r = requests.get(urljoin(endpoint, str(i)))
-            r = _return_types(r, return_type)
-
-            res.append(r)
+        res = _request_many([(i, urljoin(endpoint, str(i)), None) for i in image_id],
+                            return_type=return_type, client=client)
 
     return res
 
 
-def video_collections(page=None, collection_name=None, return_type='json'):
+def video_collections(page=None, collection_name=None, return_type='json', client=None):
     r"""
     Returns metadata of published videos available on the HubbleSite including the video id, name, image,
     and the associated collection and mission.
@@ -415,16 +430,22 @@ def video_collections(page=None, collection_name=None, return_type='json'):
     ----------
     page : list, tuple, str, int, or None
         The page number of the published videos to return. Can be a list or tuple of ints, a str or int, or None.
-        'all' returns all pages.
+        'all' returns a generator that yields the results of every page as the pages arrive, stopping at the first
+        empty or short page. The next page is prefetched while the current one is being consumed.
     collection_name : list, str, or None
         The name of the collection to return. Collections are sets of videos such as 'news', 'spacecraft',
         etc. If 'all', returns all images from all collections.
-    return_type : str, {'json', 'content', 'text'}
-        Specifies the return type of the results. Defaults to JSON.
+    return_type : str, {'json', 'content', 'text', 'record', 'stream'}
+        Specifies the return type of the results. Defaults to JSON. 'record' returns the compact record objects of
+        :mod:`hubblepy.records`. 'stream' returns a :class:`~hubblepy.streaming.Stream` reading the response body as
+        it is consumed.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the request(s). If None, the shared client returned by
+        :func:`~hubblepy.client.get_default_client` is used.
 
     Returns
     -------
-    list
+    list or generator
         List of results.
 
     Examples
@@ -443,23 +464,21 @@ def video_collections(page=None, collection_name=None, return_type='json'):
     """
     endpoint = urljoin(api_url, 'videos/')
 
-    if not isinstance(page, (list, tuple)):
-        r = requests.get(urljoin(endpoint, collection_name))
-        res = _return_types(r, return_type)
+    if page == 'all':
+        res = _paginate(urljoin(endpoint, collection_name), return_type=return_type, client=client)
 
-    else:
-        res = []
-
-        for i in page:
-            r = requests.get(urljoin(endpoint, collection_name), params={'page': i})
-            r = _return_types(r, return_type)
+    elif not isinstance(page, (list, tuple)):
+        res = _request(urljoin(endpoint, collection_name), params={'page': page}, return_type=return_type,
+                       client=client)
 
-            res.append(r)
+    else:
+        res = _request_many([(i, urljoin(endpoint, collection_name), {'page': i}) for i in page],
+                            return_type=return_type, client=client)
 
     return res
 
 
-def videos(video_id, return_type='json'):
+def videos(video_id, return_type='json', client=None):
     r"""
     Returns more specific metadata and information on published videos available on the HubbleSite.
 
@@ -467,8 +486,13 @@ def videos(video_id, return_type='json'):
     ----------
     video_id : list, tuple, int or str
         The ID of the video to return. Can be a list or tuple of ints or strings, or just a single int or str.
-    return_type : str, {'json', 'content', 'text'}
-        Specifies the return type of the results. Defaults to JSON.
+    return_type : str, {'json', 'content', 'text', 'record', 'stream'}
+        Specifies the return type of the results. Defaults to JSON. 'record' returns the compact record objects of
+        :mod:`hubblepy.records`. 'stream' returns a :class:`~hubblepy.streaming.Stream` reading the response body as
+        it is consumed.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the request(s). If None, the shared client returned by
+        :func:`~hubblepy.client.get_default_client` is used.
 
     Returns
     -------
@@ -507,22 +531,16 @@ def videos(video_id, return_type='json'):
     endpoint = urljoin(api_url, 'video/')
 
     if not isinstance(video_id, (list, tuple)):
-        r = requests.get(urljoin(endpoint, str(video_id)))
-        res = _return_types(r, return_type)
+        res = _request(urljoin(endpoint, str(video_id)), return_type=return_type, client=client)
 
     else:
-        res = []
-
-        for i in video_id:
-            r = requests.get(urljoin(endpoint, str(i)))
-            r = _return_types(r, return_type)
-
-            res.append(r)
+        res = _request_many([(i, urljoin(endpoint, str(i)), None) for i in video_id],
+                            return_type=return_type, client=client)
 
     return res
 
 
-def glossary(page=None, return_type='json'):
+def glossary(page=None, return_type='json', client=None):
     r"""
     Returns glossary terms and definitions related to astronomical objects and phenomena.
 
@@ -530,13 +548,19 @@ def glossary(page=None, return_type='json'):
     ----------
     page : list, tuple, str, int, or None
         The page number of the glossary to return. Can be a list or tuple of ints, a str or int, or None.
-        'all' returns all pages.
-    return_type : str, {'json', 'content', 'text'}
-        Specifies the return type of the results. Defaults to JSON.
+        'all' returns a generator that yields the results of every page as the pages arrive, stopping at the first
+        empty or short page. The next page is prefetched while the current one is being consumed.
+    return_type : str, {'json', 'content', 'text', 'record', 'stream'}
+        Specifies the return type of the results. Defaults to JSON. 'record' returns the compact record objects of
+        :mod:`hubblepy.records`. 'stream' returns a :class:`~hubblepy.streaming.Stream` reading the response body as
+        it is consumed.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the request(s). If None, the shared client returned by
+        :func:`~hubblepy.client.get_default_client` is used.
 
     Returns
     -------
-    list
+    list or generator
         list of dicionaries containing the glossary terms and definitions.
 
     Examples
@@ -555,23 +579,19 @@ def glossary(page=None, return_type='json'):
     """
     endpoint = urljoin(api_url, 'glossary')
 
-    if not isinstance(page, (list, tuple)):
-        r = requests.get(endpoint, params={'page': page})
-        res = _return_types(r, return_type)
-
-    else:
-        res = []
+    if page == 'all':
+        res = _paginate(endpoint, return_type=return_type, client=client)
 
-        for i in page:
-            r = requests.get(endpoint, params={'page': i})
-            r = _return_types(r, return_type)
+    elif not isinstance(page, (list, tuple)):
+        res = _request(endpoint, params={'page': page}, return_type=return_type, client=client)
 
-            res.append(r)
+    else:
+        res = _request_many([(i, endpoint, {'page': i}) for i in page], return_type=return_type, client=client)
 
     return res
 
 
-def glossary_term(term, return_type='json'):
+def glossary_term(term, return_type='json', client=None):
     r"""
     Returns a specific glossary term and its definition.
 
@@ -579,8 +599,13 @@ def glossary_term(term, return_type='json'):
     ----------
     term : list, tuple, or str
         List or tuple of str or str representing the glossary term(s) to return.
-    return_type : str, {'json', 'content', 'text'}
-        Specifies the return type of the results. Defaults to JSON.
+    return_type : str, {'json', 'content', 'text', 'record', 'stream'}
+        Specifies the return type of the results. Defaults to JSON. 'record' returns the compact record objects of
+        :mod:`hubblepy.records`. 'stream' returns a :class:`~hubblepy.streaming.Stream` reading the response body as
+        it is consumed.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the request(s). If None, the shared client returned by
+        :func:`~hubblepy.client.get_default_client` is used.
 
     Returns
     -------
@@ -607,22 +632,16 @@ def glossary_term(term, return_type='json'):
     endpoint = urljoin(api_url, 'glossary/')
 
     if not isinstance(term, (list, tuple)):
-        r = requests.get(urljoin(endpoint, term))
-        res = _return_types(r, return_type)
+        res = _request(urljoin(endpoint, term), return_type=return_type, client=client)
 
     else:
-        res = []
-
-        for i in term:
-            r = requests.get(urljoin(endpoint, i))
-            r = _return_types(r, return_type)
-
-            res.append(r)
+        res = _request_many([(i, urljoin(endpoint, i), None) for i in term],
+                            return_type=return_type, client=client)
 
     return res
 
 
-def rss(feed_name, page=None, sort='desc', return_type='json'):
+def rss(feed_name, page=None, sort='desc', return_type='json', client=None):
     r"""
     Returns metadata and other information on published RSS news feeds produced by various international space
     agencies.
@@ -633,16 +652,22 @@ def rss(feed_name, page=None, sort='desc', return_type='json'):
         The name of the RSS feed to search
     page : list, tuple, str, int, or None
         The page number of the glossary to return. Can be a list or tuple of ints, a str or int, or None.
-        'all' returns all pages.
-    return_type : str, {'json', 'content', 'text'}
-        Specifies the return type of the results. Defaults to JSON.
+        'all' returns a generator that yields the results of every page as the pages arrive, stopping at the first
+        empty or short page. The next page is prefetched while the current one is being consumed.
+    return_type : str, {'json', 'content', 'text', 'record', 'stream'}
+        Specifies the return type of the results. Defaults to JSON. 'record' returns the compact record objects of
+        :mod:`hubblepy.records`. 'stream' returns a :class:`~hubblepy.streaming.Stream` reading the response body as
+        it is consumed.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the request(s). If None, the shared client returned by
+        :func:`~hubblepy.client.get_default_client` is used.
     sort : str, {'desc', 'asc'}
         Determines the sorting order by publication date of the returned news feed posts. 'desc' sorts newer to older,
         and 'asc' sorts older to newer.
 
     Returns
     -------
-    list
+    list or generator
         List of news posts metadata including the description, images, link, publication date and more.
 
     Examples
@@ -669,27 +694,21 @@ def rss(feed_name, page=None, sort='desc', return_type='json'):
     else:
         sort = 'pub_date'
 
-    if not isinstance(page, (list, tuple)):
-        r = requests.get(urljoin(endpoint, feed_name), params={'page': page,
-                                                               'sort': sort})
+    if page == 'all':
+        res = _paginate(urljoin(endpoint, feed_name), params={'sort': sort}, return_type=return_type, client=client)
 
-        res = _return_types(r, return_type)
+    elif not isinstance(page, (list, tuple)):
+        res = _request(urljoin(endpoint, feed_name), params={'page': page,
+                                                             'sort': sort}, return_type=return_type, client=client)
 
     else:
-        res = []
-
-        for i in page:
-            r = requests.get(urljoin(endpoint, feed_name), params={'page': i,
-                                                                   'sort': sort})
-
-            res = _return_types(r, return_type)
-
-            res.append(r)
+        res = _request_many([(i, urljoin(endpoint, feed_name), {'page': i, 'sort': sort}) for i in page],
+                            return_type=return_type, client=client)
 
     return res
 
 
-def rss_posts(feed_name, pub_date, return_type='json'):
+def rss_posts(feed_name, pub_date, return_type='json', client=None):
     r"""
     Returns individual RSS news feed posts for various international space agencies and organizations.
 
@@ -700,8 +719,13 @@ def rss_posts(feed_name, pub_date, return_type='json'):
     pub_date : list, tuple, or str
         The publication date of the news feed post formatted as YYYY-MM-DDTHH:MM-SS.NNNN±HH:MM. Can be a list or
         tuple of strings.
-    return_type : str, {'json', 'content', 'text'}
-        Specifies the return type of the results. Defaults to JSON.
+    return_type : str, {'json', 'content', 'text', 'record', 'stream'}
+        Specifies the return type of the results. Defaults to JSON. 'record' returns the compact record objects of
+        :mod:`hubblepy.records`. 'stream' returns a :class:`~hubblepy.streaming.Stream` reading the response body as
+        it is consumed.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the request(s). If None, the shared client returned by
+        :func:`~hubblepy.client.get_default_client` is used.
 
     Returns
     -------
@@ -755,33 +779,234 @@ def rss_posts(feed_name, pub_date, return_type='json'):
     endpoint = urljoin(api_url, 'external_feed/')
 
     if not isinstance(pub_date, (list, tuple)):
-        r = requests.get(urljoin(endpoint, feed_name) + '/' + pub_date)
-        res = _return_types(r, return_type)
+        res = _request(urljoin(endpoint, feed_name) + '/' + pub_date, return_type=return_type, client=client)
+
+    else:
+        res = _request_many([(i, urljoin(endpoint, feed_name) + '/' + i, None) for i in pub_date],
+                            return_type=return_type, client=client)
+
+    return res
+
+
+def _request(url, params=None, return_type='json', client=None):
+    r"""
+    Internal function for sending a request through the given (or default) client and coercing the result.
+
+    """
+    if client is None:
+        client = get_default_client()
+
+    endpoint = _endpoint_name(url)
+
+    # A stream is read once, by its caller, so it is neither memoized nor shared.
+    if return_type == 'stream':
+        return _fetch(url, params, return_type, endpoint, None, client)
+
+    key = (endpoint, url, tuple(sorted(params.items())) if params else (), return_type)
+
+    if client.memo is not None:
+        res = client.memo.get(key)
+
+        if client.instrumentation is not None:
+            client.instrumentation.count('memo_hits' if res is not missing else 'memo_misses', endpoint)
+        if res is not missing:
+            return res
+
+    if client.single_flight is not None:
+        return client.single_flight.do(key, _fetch, url, params, return_type, endpoint, key, client)
+
+    return _fetch(url, params, return_type, endpoint, key, client)
+
+
+def _fetch(url, params, return_type, endpoint, key, client):
+    r"""
+    Internal function sending a request and decoding its response, storing the result in the client's memo if it
+    has one.
+
+    """
+    if return_type == 'stream':
+        r = client.get(url, params=params, endpoint=endpoint, stream=True)
+    else:
+        r = client.get(url, params=params, endpoint=endpoint)
 
+    if client.instrumentation is not None:
+        start = time.monotonic()
+        res = _return_types(r, return_type, endpoint, client.decoder)
+        client.instrumentation.observe('decode_seconds', endpoint, time.monotonic() - start)
     else:
-        res = []
+        res = _return_types(r, return_type, endpoint, client.decoder)
+
+    if client.memo is not None and key is not None and r.status_code == 200:
+        res = client.memo.set(key, res)
+
+    return res
+
+
+def _endpoint_name(url):
+    r"""
+    Internal function returning the name of the API function that requests the given URL, e.g. 'images' for
+    'http://hubblesite.org/api/v3/image/4229'. Returns None for URLs outside of the API.
+
+    """
+    if not url.startswith(api_url):
+        return None
+
+    route = url[len(api_url):].split('?')[0].strip('/').split('/')
+
+    return _endpoint_names.get((route[0], len(route)))
+
+
+_endpoint_names = {
+    ('news', 1): 'news',
+    ('news_release', 2): 'news_release',
+    ('images', 2): 'image_collections',
+    ('image', 2): 'images',
+    ('videos', 2): 'video_collections',
+    ('video', 2): 'videos',
+    ('glossary', 1): 'glossary',
+    ('glossary', 2): 'glossary_term',
+    ('external_feed', 2): 'rss',
+    ('external_feed', 3): 'rss_posts'
+}
+
+
+def _paginate(url, params=None, return_type='json', client=None):
+    r"""
+    Internal generator for walking every page of a paginated endpoint. Pages are requested in order starting from the
+    first, and iteration stops after the first page holding fewer than :code:`page_size` items. For the 'json',
+    'record' and 'stream' return types the items of each page are yielded one by one; otherwise each page is yielded
+    whole. With 'stream', the items are decoded as they arrive, before the rest of their page.
+
+    Once a full page has arrived, the request for the next page is sent on a background thread (if the client's
+    :code:`prefetch` setting is on) while the items of the current page are being yielded, so only about two pages are
+    held in memory at any time.
+
+    """
+    if client is None:
+        client = get_default_client()
+
+    params = params or {}
+
+    def fetch(page):
+        return _request(url, params=dict({'page': page}, **params), return_type=return_type, client=client)
+
+    executor = ThreadPoolExecutor(max_workers=1) if client.prefetch else None
+    next_res = None
+
+    def prefetch(page):
+        return executor.submit(contextvars.copy_context().run, fetch, page) if executor is not None else None
+
+    try:
+        page = 1
+        res = fetch(page)
+
+        while True:
+            next_res = None
+
+            if return_type == 'stream':
+                count = 0
+
+                with res:
+                    for item in res.items():
+                        count += 1
+
+                        if count == page_size:
+                            next_res = prefetch(page + 1)
+
+                        yield item
+
+                more = count >= page_size
+
+            else:
+                items = res if return_type in ('json', 'record') else json.loads(res)
+                more = len(items) >= page_size
+
+                if more:
+                    next_res = prefetch(page + 1)
+
+                if return_type in ('json', 'record'):
+                    for item in items:
+                        yield item
+                else:
+                    yield res
+
+            if not more:
+                break
+
+            page += 1
+            res = next_res.result() if next_res is not None else fetch(page)
+
+    finally:
+        if executor is not None:
+            # A prefetched stream left unread would hold its connection until collected.
+            if next_res is not None and return_type == 'stream':
+                next_res.add_done_callback(_close_stream)
+
+            executor.shutdown(wait=False)
+
+
+def _close_stream(future):
+    if future.exception() is None:
+        future.result().close()
+
+
+def _request_many(items, return_type='json', client=None):
+    r"""
+    Internal function for sending a batch of requests. :code:`items` is a list of :code:`(key, url, params)` tuples,
+    where the key is the page or id the request belongs to. Results are returned in the same order as :code:`items`.
+
+    If the client was created with :code:`max_workers`, the requests are sent concurrently on the client's thread
+    pool, and any failures are collected and raised together as a :class:`~hubblepy.exceptions.BatchError` once every
+    request has finished. Otherwise, the requests are sent one at a time.
+
+    """
+    if client is None:
+        client = get_default_client()
+
+    if not client.max_workers:
+        return [_request(url, params, return_type=return_type, client=client) for _, url, params in items]
+
+    # Each request runs in a copy of the caller's context, so it keeps the caller's deadline.
+    futures = [client.executor.submit(contextvars.copy_context().run, _request, url, params, return_type, client)
+               for _, url, params in items]
+
+    res, errors = [], {}
 
-        for i in pub_date:
-            r = requests.get(urljoin(endpoint, feed_name) + '/' + i)
-            r = _return_types(r, return_type)
+    for (key, _, _), future in zip(items, futures):
+        try:
+            res.append(future.result())
+        except Exception as e:
+            res.append(None)
+            errors[key] = e
 
-            res.append(r)
+    if errors:
+        raise BatchError(errors, res)
 
     return res
 
 
-def _return_types(r, return_type):
+def _return_types(r, return_type, endpoint=None, decoder=None):
     r"""
-    Internal function for coercing the content types of the returned request data.
+    Internal function for coercing the content types of the returned request data. :code:`endpoint` is the name of the
+    API function the response belongs to, used to pick the record class for the 'record' return type. JSON is decoded
+    with :code:`decoder` (a :class:`~hubblepy.decoders.Decoder`) if given, and with the response's own :code:`json`
+    method otherwise.
 
     """
     if return_type == 'json':
-        r = r.json()
+        r = decoder.loads(r.content) if decoder is not None else r.json()
     elif return_type == 'text':
         r = r.text
     elif return_type == 'content':
         r = r.content
+    elif return_type == 'record':
+        if decoder is not None:
+            r = decoder.records(r.content, endpoint, str(r.url))
+        else:
+            r = from_json(r.json(), endpoint, str(r.url))
+    elif return_type == 'stream':
+        r = Stream(r, decoder)
     else:
-        raise ValueError("'return_type' must be one of 'json', 'text', 'content'.")
+        raise ValueError("'return_type' must be one of 'json', 'text', 'content', 'record', 'stream'.")
 
     return r
@@ -0,0 +1,242 @@
+r"""
+Response caches used by :class:`~hubblepy.client.Client`. A cache stores the raw body and headers of successful
+responses, keyed by the full request URL, together with the time after which the entry is stale. Stale entries are
+revalidated with the server using their :code:`ETag` and :code:`Last-Modified` headers.
+
+>>> client = hubblepy.Client(cache=SQLiteCache('hubblepy.sqlite'), cache_ttl={'news': 60})
+
+"""
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+
+default_ttls = {
+    'news': 300,
+    'news_release': 3600,
+    'image_collections': 3600,
+    'images': 86400 * 7,
+    'video_collections': 3600,
+    'videos': 86400 * 7,
+    'glossary': 86400,
+    'glossary_term': 86400 * 7,
+    'rss': 300,
+    'rss_posts': 86400 * 7
+}
+
+
+class CacheEntry(object):
+    r"""
+    A cached response.
+
+    Parameters
+    ----------
+    url : str
+        The URL of the response.
+    status_code : int
+        The HTTP status code of the response.
+    headers : dict
+        The headers of the response.
+    content : bytes
+        The raw body of the response.
+    expires : float or None
+        The time (in seconds since the epoch) after which the entry is stale, or None if it never is.
+
+    """
+    def __init__(self, url, status_code, headers, content, expires):
+        self.url = url
+        self.status_code = status_code
+        self.headers = dict(headers)
+        self.content = content
+        self.expires = expires
+
+    @classmethod
+    def from_response(cls, r, ttl):
+        r"""
+        Creates an entry from a :code:`requests.Response` that stays fresh for :code:`ttl` seconds, or indefinitely if
+        :code:`ttl` is None.
+
+        """
+        return cls(r.url, r.status_code, r.headers, r.content, time.time() + ttl if ttl is not None else None)
+
+    @property
+    def etag(self):
+        return CaseInsensitiveDict(self.headers).get('ETag')
+
+    @property
+    def last_modified(self):
+        return CaseInsensitiveDict(self.headers).get('Last-Modified')
+
+    def is_fresh(self, now=None):
+        r"""
+        Returns True if the entry has not yet expired.
+
+        """
+        if self.expires is None:
+            return True
+        if now is None:
+            now = time.time()
+
+        return now < self.expires
+
+    def to_response(self):
+        r"""
+        Rebuilds a :code:`requests.Response` from the entry without touching the network.
+
+        """
+        r = requests.Response()
+        r.url = self.url
+        r.status_code = self.status_code
+        r.headers = CaseInsensitiveDict(self.headers)
+        r.encoding = get_encoding_from_headers(r.headers)
+        r._content = self.content
+
+        return r
+
+
+class BaseCache(object):
+    r"""
+    Interface of the response caches. Subclasses must be safe to use from several threads at once.
+
+    """
+    def get(self, key):
+        r"""
+        Returns the :class:`CacheEntry` stored under :code:`key`, or None.
+
+        """
+        raise NotImplementedError
+
+    def set(self, key, entry):
+        r"""
+        Stores a :class:`CacheEntry` under :code:`key`.
+
+        """
+        raise NotImplementedError
+
+    def delete(self, key):
+        r"""
+        Removes the entry stored under :code:`key`, if any.
+
+        """
+        raise NotImplementedError
+
+    def clear(self):
+        r"""
+        Removes every entry.
+
+        """
+        raise NotImplementedError
+
+
+class MemoryCache(BaseCache):
+    r"""
+    In-memory cache that evicts the least recently used entry once :code:`maxsize` entries are stored.
+
+    Parameters
+    ----------
+    maxsize : int
+        The maximum number of entries. Defaults to 1024.
+
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None:
+                self._entries.move_to_end(key)
+
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class SQLiteCache(BaseCache):
+    r"""
+    On-disk cache backed by a sqlite database, so cached responses survive between runs and can be shared by several
+    processes.
+
+    Parameters
+    ----------
+    path : str
+        The path of the database file. It is created if it does not exist. ':memory:' keeps the database in memory.
+
+    """
+    def __init__(self, path):
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS responses '
+                           '(key TEXT PRIMARY KEY, url TEXT, status_code INTEGER, headers TEXT, content BLOB, '
+                           'expires REAL)')
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute('SELECT url, status_code, headers, content, expires FROM responses '
+                                     'WHERE key = ?', (key,)).fetchone()
+
+        if row is None:
+            return None
+
+        url, status_code, headers, content, expires = row
+
+        return CacheEntry(url, status_code, json.loads(headers), bytes(content), expires)
+
+    def set(self, key, entry):
+        with self._lock:
+            self._conn.execute('INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)',
+                               (key, entry.url, entry.status_code, json.dumps(entry.headers),
+                                sqlite3.Binary(entry.content), entry.expires))
+            self._conn.commit()
+
+    def delete(self, key):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses WHERE key = ?', (key,))
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute('DELETE FROM responses')
+            self._conn.commit()
+
+    def close(self):
+        r"""
+        Closes the database connection.
+
+        """
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM responses').fetchone()[0]
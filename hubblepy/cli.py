@@ -0,0 +1,378 @@
+r"""
+Command line interface, installed as the :code:`hubblepy` command (also run with :code:`python -m hubblepy`).
+
+:code:`hubblepy snapshot` exports the whole public catalogue: the news listing and every news release, the image and
+video collections and every image and video, the glossary and the posts of the external feeds (every known feed:
+esa_feed, jwst_feed and hubble_feed, unless :code:`--feeds` names others). Records are written as newline-delimited
+JSON or Parquet, one file per shard.
+
+    hubblepy snapshot catalogue/ --processes 4 --workers 8 --format parquet
+
+The listings are walked first. Their ids are then split into shards of :code:`--shard-size` ids, which a pool of
+processes fetches concurrently, each with its own client. Every completed listing and shard is recorded in a checkpoint
+file (:code:`catalogue/checkpoint.json` by default), so an interrupted or partly failed snapshot resumes where it
+stopped when the same command is run again. Progress and throughput are reported on standard error.
+
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+import requests
+
+from . import api
+from .client import Client
+from .export import to_arrow
+from .ratelimit import Retry
+from .sync import SyncState
+
+
+#: The listing functions walked by a snapshot, mapped to the function fetching the details of their items and the
+#: field holding the id of an item.
+listings = {
+    'news': ('news_release', 'news_id'),
+    'image_collections': ('images', 'id'),
+    'video_collections': ('videos', 'id'),
+    'glossary': (None, None),
+    'rss': (None, None),
+}
+
+#: The external feeds whose posts are exported by default.
+feeds = ('esa_feed', 'jwst_feed', 'hubble_feed')
+
+
+def main(args=None):
+    r"""
+    Runs the command line interface with the given arguments (by default, those of the command line). Returns the
+    exit status.
+
+    """
+    parser = argparse.ArgumentParser(prog='hubblepy', description='Command line interface of hubblepy.')
+    commands = parser.add_subparsers(dest='command')
+    commands.required = True
+
+    snapshot = commands.add_parser('snapshot', help='export the whole catalogue',
+                                   description='Exports the whole public catalogue of the HubbleSite API.')
+    snapshot.add_argument('directory', help='the output directory')
+    snapshot.add_argument('--format', choices=('ndjson', 'parquet'), default='ndjson')
+    snapshot.add_argument('--processes', type=int, default=os.cpu_count() or 1,
+                          help='processes fetching the shards (default: the number of CPUs)')
+    snapshot.add_argument('--workers', type=int, default=8, help='concurrent requests per process (default: 8)')
+    snapshot.add_argument('--shard-size', type=int, default=250, help='ids per shard (default: 250)')
+    snapshot.add_argument('--checkpoint', help='the checkpoint file (default: DIRECTORY/checkpoint.json)')
+    snapshot.add_argument('--image-collections', nargs='*', default=['all'], metavar='NAME')
+    snapshot.add_argument('--video-collections', nargs='*', default=['all'], metavar='NAME')
+    snapshot.add_argument('--feeds', nargs='*', default=list(feeds), metavar='NAME',
+                          help='the external feeds to export (default: {})'.format(' '.join(feeds)))
+    snapshot.add_argument('--rate-limit', type=float,
+                          help='maximum requests per second, shared by the processes fetching (default: none)')
+    snapshot.add_argument('--retry', type=int, default=5, help='retries of failed requests (default: 5)')
+    snapshot.add_argument('--proxy', help='send the requests through this HTTP proxy, e.g. a hubblepy.testing '
+                                          'stub server')
+    snapshot.add_argument('--quiet', action='store_true', help='do not report progress')
+
+    args = parser.parse_args(args)
+
+    return snapshot_command(args)
+
+
+def snapshot_command(args):
+    r"""
+    Runs :code:`hubblepy snapshot`. Returns the exit status: 0 if the snapshot is complete, 1 if any listing or shard
+    failed (running the command again retries them).
+
+    """
+    if args.format == 'parquet':
+        # Fail before any request is sent rather than in the workers.
+        to_arrow([])
+
+    os.makedirs(args.directory, exist_ok=True)
+
+    state = SyncState(args.checkpoint or os.path.join(args.directory, 'checkpoint.json'))
+    options = {
+        'workers': args.workers,
+        'rate_limit': args.rate_limit,
+        'retry': args.retry,
+        'proxy': args.proxy,
+    }
+    progress = Progress(quiet=args.quiet)
+    failed = 0
+
+    # The listings are walked first, concurrently, to collect the ids of the details.
+    sources = [('news', None), ('glossary', None)]
+    sources += [('image_collections', name) for name in args.image_collections]
+    sources += [('video_collections', name) for name in args.video_collections]
+    sources += [('rss', name) for name in args.feeds]
+
+    # The listings share one client, and so the whole rate limit.
+    ids = {}
+    client = _client(options)
+
+    with ThreadPoolExecutor(max_workers=len(sources)) as executor:
+        futures = {}
+
+        for kind, name in sources:
+            key = 'listing/{}'.format(kind if name is None else kind + '/' + name)
+
+            if state.get(key) is None:
+                futures[executor.submit(_fetch_listing, kind, name, args.directory, args.format, client)] = key
+            else:
+                progress.skip(kind, state.get(key)['count'])
+                ids[key] = state.get(key)['ids']
+
+        for future in as_completed(futures):
+            key = futures[future]
+            kind = key.split('/')[1]
+
+            try:
+                count, size, ids[key] = future.result()
+            except Exception as e:
+                progress.error(key, e)
+                failed += 1
+                continue
+
+            state.set(key, {'count': count, 'ids': ids[key]})
+            state.save()
+            progress.done(kind, count, size)
+
+    client.close()
+
+    # The shards depend on the ids of every listing, so they are only formed once all listings are complete.
+    if failed:
+        progress.summary(failed)
+
+        return 1
+
+    # The details are fetched in shards on a pool of processes.
+    tasks = _shards(ids, args.shard_size)
+    pending = {key: task for key, task in sorted(tasks.items()) if state.get(key) is None}
+
+    for key in set(tasks) - set(pending):
+        progress.skip(tasks[key][0], len(tasks[key][1]))
+
+    if pending:
+        processes = min(args.processes, len(pending))
+
+        # The rate limit is shared by the processes actually started.
+        if args.rate_limit:
+            options = dict(options, rate_limit=args.rate_limit / processes)
+
+        with ProcessPoolExecutor(max_workers=processes, initializer=_init_worker, initargs=(options,)) as executor:
+            futures = {executor.submit(_fetch_shard, kind, shard_ids, _shard_path(args.directory, kind, key),
+                                       args.format): key
+                       for key, (kind, shard_ids) in pending.items()}
+
+            for future in as_completed(futures):
+                key = futures[future]
+
+                try:
+                    count, size = future.result()
+                except Exception as e:
+                    progress.error(key, e)
+                    failed += 1
+                    continue
+
+                state.set(key, {'count': count})
+                state.save()
+                progress.done(pending[key][0], count, size)
+
+    progress.summary(failed)
+
+    return 1 if failed else 0
+
+
+def _shards(ids, shard_size):
+    r"""
+    Splits the ids of the listings into shards. Returns a dict mapping the checkpoint key of each shard to the name of
+    the function fetching it and its ids. Ids found in several listings (e.g. an image in several collections) are
+    fetched once.
+
+    """
+    details = {}
+
+    for key, listing_ids in ids.items():
+        detail = listings[key.split('/')[1]][0]
+
+        if detail is not None:
+            details.setdefault(detail, set()).update(listing_ids)
+
+    tasks = {}
+
+    for detail, detail_ids in details.items():
+        detail_ids = sorted(detail_ids)
+
+        for start in range(0, len(detail_ids), shard_size):
+            shard = detail_ids[start:start + shard_size]
+            tasks['shard/{}/{}'.format(detail, shard[0])] = (detail, shard)
+
+    return tasks
+
+
+def _shard_path(directory, kind, key):
+    return os.path.join(directory, kind, 'part-{}'.format(key.split('/', 2)[2]))
+
+
+class _SnapshotClient(Client):
+    r"""
+    Client raising for error responses (once retries are exhausted), so that they fail their listing or shard instead
+    of being exported as records.
+
+    """
+    def get(self, url, params=None, endpoint=None, stream=False):
+        r = super(_SnapshotClient, self).get(url, params=params, endpoint=endpoint, stream=stream)
+        r.raise_for_status()
+
+        return r
+
+
+def _client(options):
+    session = requests.Session()
+
+    if options['proxy'] is not None:
+        session.trust_env = False
+        session.proxies = {'http': options['proxy'], 'https': options['proxy']}
+
+    return _SnapshotClient(session=session, max_workers=options['workers'], pool_maxsize=options['workers'],
+                           rate_limit=options['rate_limit'],
+                           retry=Retry(total=options['retry']) if options['retry'] else None)
+
+
+def _fetch_listing(kind, name, directory, output_format, client):
+    r"""
+    Walks every page of a listing and writes its items. Returns the number of items, the size of the written files
+    and the ids of the details to fetch.
+
+    """
+    if kind in ('news', 'glossary'):
+        items = getattr(api, kind)(page='all', client=client)
+    elif kind == 'rss':
+        items = api.rss(name, page='all', client=client)
+    else:
+        items = getattr(api, kind)(page='all', collection_name=name, client=client)
+
+    records = []
+
+    for item in items:
+        if name is not None:
+            item = dict(item, **{'feed' if kind == 'rss' else 'collection_name': name})
+
+        records.append(item)
+
+    field = listings[kind][1]
+    ids = [record[field] for record in records if record.get(field) is not None] if field is not None else []
+    path = os.path.join(directory, kind, 'part-{}'.format(name or kind))
+    size = _write(records, path, output_format)
+
+    return len(records), size, ids
+
+
+_worker_client = None
+
+
+def _init_worker(options):
+    global _worker_client
+
+    _worker_client = _client(options)
+
+
+def _fetch_shard(kind, ids, path, output_format):
+    r"""
+    Fetches the details of a shard of ids in a worker process and writes them. Returns the number of records and the
+    size of the written files.
+
+    """
+    records = getattr(api, kind)(list(ids), client=_worker_client)
+
+    if kind != 'news_release':
+        records = [dict(record, id=i) for i, record in zip(ids, records)]
+
+    return len(records), _write(records, path, output_format)
+
+
+def _write(records, path, output_format):
+    r"""
+    Writes records to :code:`path` plus the extension of the format, atomically. Parquet output writes one file per
+    table of :func:`~hubblepy.export.to_arrow` under :code:`<table>/` next to it. Returns the number of bytes
+    written.
+
+    """
+    directory, name = os.path.split(path)
+    os.makedirs(directory, exist_ok=True)
+
+    if output_format == 'ndjson':
+        outputs = [(path + '.ndjson', None)]
+    else:
+        outputs = [(os.path.join(directory, table, name + '.parquet'), data)
+                   for table, data in to_arrow(records).items()]
+
+    size = 0
+
+    for output, data in outputs:
+        os.makedirs(os.path.dirname(output), exist_ok=True)
+        tmp = output + '.tmp'
+
+        if data is None:
+            with open(tmp, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, ensure_ascii=False))
+                    f.write('\n')
+        else:
+            import pyarrow.parquet
+
+            pyarrow.parquet.write_table(data, tmp)
+
+        os.replace(tmp, output)
+        size += os.path.getsize(output)
+
+    return size
+
+
+class Progress(object):
+    r"""
+    Reports the progress and throughput of a snapshot on standard error.
+
+    """
+    def __init__(self, quiet=False, stream=None):
+        self.quiet = quiet
+        self.stream = stream if stream is not None else sys.stderr
+        self.start = time.monotonic()
+        self.records = 0
+        self.bytes = 0
+        self.skipped = 0
+        self.counts = {}
+
+    def done(self, kind, count, size):
+        self.records += count
+        self.bytes += size
+        self.counts[kind] = self.counts.get(kind, 0) + count
+        self._report('{:<18} {:>7} records ({:>7} total)'.format(kind, count, self.counts[kind]))
+
+    def skip(self, kind, count):
+        self.skipped += count
+        self.counts[kind] = self.counts.get(kind, 0) + count
+
+    def error(self, key, error):
+        self._report('{} failed: {}'.format(key, error))
+
+    def _report(self, message):
+        if self.quiet:
+            return
+
+        elapsed = max(time.monotonic() - self.start, 1e-9)
+        self.stream.write('[{:7.1f}s] {} | {:.0f} records/s, {:.2f} MB/s\n'.format(
+            elapsed, message, self.records / elapsed, self.bytes / elapsed / 1e6))
+        self.stream.flush()
+
+    def summary(self, failed):
+        if self.quiet:
+            return
+
+        elapsed = time.monotonic() - self.start
+        self.stream.write('{} records ({:.1f} MB) in {:.1f}s{}{}\n'.format(
+            self.records, self.bytes / 1e6, elapsed,
+            ', {} already in the checkpoint'.format(self.skipped) if self.skipped else '',
+            '; {} failed, run again to resume'.format(failed) if failed else ''))
+        self.stream.flush()
@@ -0,0 +1,478 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cache import CacheEntry, default_ttls
+from .decoders import Decoder
+from .exceptions import DeadlineExceeded
+from .instrumentation import Instrumentation
+from .ratelimit import Retry, TokenBucket, retry_after
+from .singleflight import SingleFlight
+from .timeouts import past_deadline, request_timeout
+from .transport import HTTP2Adapter
+
+
+class Client(object):
+    r"""
+    Pooled HTTP client used to send requests to the HubbleSite API. A single :code:`requests.Session` is shared by
+    every request made through the client, so connections (and TLS handshakes) are reused across calls rather than
+    being set up again for each request.
+
+    Parameters
+    ----------
+    pool_connections : int
+        The number of per-host connection pools to keep cached. Defaults to 10.
+    pool_maxsize : int
+        The maximum number of keep-alive connections kept open to a single host. Defaults to 10.
+    pool_block : bool
+        If True, no more than :code:`pool_maxsize` connections are opened to a host at once and further requests wait
+        for a free connection. Otherwise, extra connections are opened when needed and discarded afterwards. Defaults
+        to False.
+    headers : dict or None
+        Additional headers sent with every request.
+    session : requests.Session or None
+        An existing session to use. If None, a new session is created.
+    max_workers : int or None
+        If set, the requests of list or tuple arguments (several ids or pages) are sent concurrently on a thread pool
+        of at most :code:`max_workers` threads. Results are returned in the same order as the input. If None (the
+        default), the requests are sent one at a time. Setting :code:`pool_maxsize` to at least :code:`max_workers`
+        lets every worker keep its own connection alive.
+    prefetch : bool
+        If True (the default), functions called with :code:`page='all'` request the next page on a background thread
+        while the items of the current page are being consumed.
+    cache : BaseCache or None
+        A response cache such as :class:`~hubblepy.cache.MemoryCache` or :class:`~hubblepy.cache.SQLiteCache`. Fresh
+        cached responses are returned without sending a request; stale ones are revalidated with the server using
+        their :code:`ETag` and :code:`Last-Modified` headers. If None (the default), responses are not cached.
+    cache_ttl : int, float, dict or None
+        How long, in seconds, a cached response stays fresh. A number applies to every endpoint; a dict maps endpoint
+        (function) names such as 'news_release' or 'images' to their time-to-live and is merged over
+        :code:`hubblepy.cache.default_ttls`. A time-to-live of None keeps the responses fresh indefinitely, and 0
+        disables caching. Defaults to :code:`default_ttls`.
+    stale_while_revalidate : bool
+        If True, a stale cached response is returned immediately and revalidated on a background thread. Defaults to
+        False.
+    memo : Memo or None
+        A :class:`~hubblepy.memo.Memo` holding decoded results, so repeated calls with the same arguments and
+        :code:`return_type` skip both the request and the decoding. If None (the default), results are not memoized.
+    mirror : Mirror or None
+        A :class:`~hubblepy.mirror.Mirror` the requests are answered from. Requests for data the mirror does not hold
+        are sent to the API as usual. If None (the default), every request is sent to the API.
+    decoder : str, Decoder or None
+        The JSON library used to decode responses: 'orjson', 'msgspec' or 'json', or a
+        :class:`~hubblepy.decoders.Decoder`. If None (the default), the fastest installed library is used.
+    rate_limit : TokenBucket, float or None
+        A :class:`~hubblepy.ratelimit.TokenBucket` pacing the requests sent to the API, or a number of requests per
+        second to create one with. The bucket adapts to 429 responses and can be shared with other clients. Requests
+        answered from the mirror or a fresh cache entry are not counted. If None (the default), requests are not
+        paced.
+    retry : Retry, int or None
+        A :class:`~hubblepy.ratelimit.Retry` policy, or the maximum number of retries to create one with. Requests
+        failing with a 429 or 5xx status or a connection error are then resent with jittered exponential backoff,
+        honouring :code:`Retry-After`. If None (the default), failed requests are not retried.
+    timeout : float, tuple or None
+        The timeout of each request, in seconds, as a number or a :code:`(connect, read)` tuple. Defaults to
+        :code:`(5, 30)`. None waits forever. Within a :func:`~hubblepy.timeouts.deadline`, timeouts are shortened to
+        the time left.
+    hedge : Hedge or None
+        A :class:`~hubblepy.timeouts.Hedge` policy. A duplicate of a slow request is then sent once the first has
+        taken longer than a high percentile of recent response times, and the first response to arrive is used. If
+        None (the default), requests are not hedged.
+    single_flight : SingleFlight, bool or None
+        If True or a :class:`~hubblepy.singleflight.SingleFlight`, identical requests (same endpoint, parameters and
+        :code:`return_type`) made concurrently by several threads share one request and its decoded result. Defaults
+        to None.
+    instrumentation : Instrumentation, bool or None
+        If True or an :class:`~hubblepy.instrumentation.Instrumentation`, the latency, response size, decoding time,
+        retries and cache hits of the requests are measured per endpoint, and its hooks are run around every request.
+        Defaults to None.
+    http2 : HTTP2Adapter, bool or None
+        If True or an :class:`~hubblepy.transport.HTTP2Adapter`, requests are sent over HTTP/2 where the server
+        supports it, multiplexing the concurrent requests of :code:`max_workers` over one connection, and over
+        HTTP/1.1 otherwise. True creates an adapter of at most :code:`pool_maxsize` connections with
+        :code:`prior_knowledge` set, as the API is requested over plain :code:`http://`: its requests are sent over
+        HTTP/2 without negotiation (h2c), and a host that turns out not to speak it is sent HTTP/1.1 requests from
+        its first failed request on. Multiplexing pays off when :code:`max_workers` is larger than the number of
+        connections; below that, HTTP/1.1 is usually faster. Requires :code:`httpx` and :code:`h2`. Defaults to
+        None.
+
+    Examples
+    --------
+    >>> client = hubblepy.Client(pool_maxsize=20, pool_block=True)
+    >>> hubblepy.images([4229, 4230], client=client)
+    >>> hubblepy.set_default_client(client)
+    >>> hubblepy.images(list(range(4000, 4500)), client=hubblepy.Client(max_workers=16, pool_maxsize=16))
+
+    """
+    def __init__(self, pool_connections=10, pool_maxsize=10, pool_block=False, headers=None, session=None,
+                 max_workers=None, prefetch=True, cache=None, cache_ttl=None, stale_while_revalidate=False,
+                 memo=None, mirror=None, decoder=None, rate_limit=None, retry=None, timeout=(5, 30), hedge=None,
+                 single_flight=None, instrumentation=None, http2=None):
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.max_workers = max_workers
+        self.prefetch = prefetch
+        self.cache = cache
+        self.stale_while_revalidate = stale_while_revalidate
+        self.memo = memo
+        self.mirror = mirror
+        self.decoder = decoder if isinstance(decoder, Decoder) else Decoder(decoder)
+        self.rate_limit = rate_limit if isinstance(rate_limit, TokenBucket) or rate_limit is None \
+            else TokenBucket(rate_limit)
+        self.retry = retry if isinstance(retry, Retry) or retry is None else Retry(total=retry)
+        self.timeout = timeout
+        self.hedge = hedge
+        self.single_flight = SingleFlight() if single_flight is True else single_flight or None
+        self.instrumentation = Instrumentation() if instrumentation is True else instrumentation or None
+
+        if isinstance(cache_ttl, dict):
+            self.cache_ttl = dict(default_ttls, **cache_ttl)
+        elif cache_ttl is not None:
+            self.cache_ttl = {endpoint: cache_ttl for endpoint in default_ttls}
+            self.cache_ttl[None] = cache_ttl
+        else:
+            self.cache_ttl = dict(default_ttls)
+
+        self._executor = None
+        self._hedge_executor = None
+        self._executor_lock = threading.Lock()
+        self._revalidating = set()
+        self._revalidating_lock = threading.Lock()
+
+        if session is None:
+            session = requests.Session()
+
+        if http2:
+            adapter = http2 if isinstance(http2, HTTP2Adapter) else HTTP2Adapter(max_connections=pool_maxsize,
+                                                                                   prior_knowledge=True)
+        else:
+            adapter = HTTPAdapter(pool_connections=pool_connections,
+                                  pool_maxsize=pool_maxsize,
+                                  pool_block=pool_block)
+
+        self.http2 = adapter if http2 else None
+
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        session.headers['Connection'] = 'keep-alive'
+
+        if headers is not None:
+            session.headers.update(headers)
+
+        self.session = session
+
+    def get(self, url, params=None, endpoint=None, stream=False):
+        r"""
+        Sends a GET request over the pooled session, or answers it from the mirror or the cache if one is set.
+
+        Parameters
+        ----------
+        url : str
+            The URL to request.
+        params : dict or None
+            Query string parameters of the request.
+        endpoint : str or None
+            The name of the API function making the request, used to look up its cache time-to-live.
+        stream : bool
+            If True, the body of the response is not read until it is consumed, and the response bypasses the cache.
+            Defaults to False.
+
+        Returns
+        -------
+        requests.Response
+            The response of the request.
+
+        """
+        if self.mirror is not None:
+            r = self.mirror.response(url, params)
+            self._count('mirror_hits' if r is not None else 'mirror_misses', endpoint)
+
+            if r is not None:
+                return r
+
+        if self.cache is None or stream:
+            return self._send(url, params=params, endpoint=endpoint, stream=stream)
+
+        key = requests.Request('GET', url, params=params).prepare().url
+        entry = self.cache.get(key)
+
+        if entry is None:
+            self._count('cache_misses', endpoint)
+            r = self._send(url, params=params, endpoint=endpoint)
+            self._store(key, r, endpoint)
+
+            return r
+
+        if entry.is_fresh():
+            self._count('cache_hits', endpoint)
+
+            return entry.to_response()
+
+        if self.stale_while_revalidate:
+            with self._revalidating_lock:
+                start = key not in self._revalidating
+                self._revalidating.add(key)
+
+            if start:
+                thread = threading.Thread(target=self._revalidate_in_background, args=(key, entry, endpoint))
+                thread.daemon = True
+                thread.start()
+
+            self._count('cache_hits', endpoint)
+
+            return entry.to_response()
+
+        return self._revalidate(key, entry, endpoint)
+
+    def _send(self, url, params=None, headers=None, endpoint=None, stream=False):
+        r"""
+        Sends a request over the session, pacing it with the rate limiter and retrying it according to the retry
+        policy. Retries are not attempted if their delay would run past the current deadline.
+
+        """
+        attempt = 0
+        errors = (requests.ConnectionError, requests.Timeout) \
+            if self.retry is not None and self.retry.connection_errors else ()
+
+        while True:
+            if self.rate_limit is not None:
+                self.rate_limit.acquire()
+
+            try:
+                r = self._attempt(url, params, headers, endpoint, stream)
+            except errors:
+                if attempt >= self.retry.total:
+                    raise
+
+                delay = self.retry.delay(attempt)
+
+                if past_deadline(delay):
+                    raise
+            else:
+                wait = retry_after(r.headers) if r.status_code in (429, 503) else None
+
+                if self.rate_limit is not None:
+                    self.rate_limit.observe(r.status_code, wait)
+
+                if self.retry is None or r.status_code not in self.retry.statuses or attempt >= self.retry.total:
+                    return r
+
+                delay = self.retry.delay(attempt, wait)
+
+                if past_deadline(delay):
+                    return r
+
+                r.close()
+
+            self._count('retries', endpoint)
+            time.sleep(delay)
+            attempt += 1
+
+    def _attempt(self, url, params, headers, endpoint, stream=False):
+        r"""
+        Sends a single request with the client's timeout, shortened to the current deadline. A request that times
+        out because of the deadline raises :class:`~hubblepy.exceptions.DeadlineExceeded`.
+
+        """
+        timeout = request_timeout(self.timeout)
+        delay = self.hedge.delay(endpoint) if self.hedge is not None else None
+
+        try:
+            if delay is not None:
+                return self._hedged(url, params, headers, endpoint, timeout, delay, stream)
+
+            return self._timed(url, params, headers, endpoint, timeout, stream)
+
+        except requests.Timeout as e:
+            if past_deadline(0):
+                raise DeadlineExceeded('The request did not complete before the deadline: {}'.format(e))
+
+            raise
+
+    def _timed(self, url, params, headers, endpoint, timeout, stream=False):
+        instrumentation = self.instrumentation
+
+        if instrumentation is not None:
+            instrumentation.request_started(endpoint, url, params)
+
+        start = time.monotonic()
+
+        try:
+            r = self.session.get(url, params=params, headers=headers, timeout=timeout, stream=stream)
+        except Exception as e:
+            if instrumentation is not None:
+                instrumentation.request_finished(endpoint, url, params, None, time.monotonic() - start, e)
+
+            raise
+
+        seconds = time.monotonic() - start
+
+        if self.hedge is not None and self.hedge.applies(endpoint):
+            self.hedge.record(endpoint, seconds)
+        if instrumentation is not None:
+            instrumentation.request_finished(endpoint, url, params, r, seconds)
+
+        return r
+
+    def _count(self, name, endpoint):
+        if self.instrumentation is not None:
+            self.instrumentation.count(name, endpoint)
+
+    def _hedged(self, url, params, headers, endpoint, timeout, delay, stream=False):
+        r"""
+        Sends a request and, if it has not answered within :code:`delay` seconds, a duplicate of it. Returns the
+        first successful response; the other is closed once it arrives.
+
+        """
+        executor = self.hedge_executor
+        futures = [executor.submit(self._timed, url, params, headers, endpoint, timeout, stream)]
+        done, pending = wait(futures, timeout=delay)
+
+        if not done:
+            if self.rate_limit is not None:
+                self.rate_limit.acquire()
+
+            self.hedge.sent()
+            futures.append(executor.submit(self._timed, url, params, headers, endpoint, timeout, stream))
+            done, pending = wait(futures, return_when=FIRST_COMPLETED)
+
+            # Use the other request if the first to complete failed.
+            if all(f.exception() is not None for f in done) and pending:
+                done, pending = wait(pending)
+
+        winner = next((f for f in done if f.exception() is None), next(iter(done)))
+
+        for future in futures:
+            if future is not winner:
+                future.add_done_callback(_close_response)
+
+        return winner.result()
+
+    def _store(self, key, r, endpoint):
+        ttl = self.cache_ttl.get(endpoint, self.cache_ttl.get(None, 0))
+
+        if r.status_code == 200 and (ttl is None or ttl > 0):
+            self.cache.set(key, CacheEntry.from_response(r, ttl))
+
+    def _revalidate(self, key, entry, endpoint):
+        headers = {}
+
+        if entry.etag is not None:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified is not None:
+            headers['If-Modified-Since'] = entry.last_modified
+
+        r = self._send(key, headers=headers, endpoint=endpoint)
+        self._count('cache_hits' if r.status_code == 304 else 'cache_misses', endpoint)
+
+        if r.status_code == 304:
+            r = entry.to_response()
+
+        self._store(key, r, endpoint)
+
+        return r
+
+    def _revalidate_in_background(self, key, entry, endpoint):
+        try:
+            self._revalidate(key, entry, endpoint)
+        finally:
+            with self._revalidating_lock:
+                self._revalidating.discard(key)
+
+    @property
+    def executor(self):
+        r"""
+        The thread pool used to send concurrent requests. It is created on first use with :code:`max_workers`
+        threads.
+
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        return self._executor
+
+    @property
+    def hedge_executor(self):
+        r"""
+        The thread pool used to send hedged requests, kept apart from :attr:`executor` so that batch workers waiting
+        on hedged requests never wait for a thread of their own pool. It is created on first use.
+
+        """
+        if self._hedge_executor is None:
+            with self._executor_lock:
+                if self._hedge_executor is None:
+                    self._hedge_executor = ThreadPoolExecutor(max_workers=2 * (self.max_workers or 1) + 2)
+
+        return self._hedge_executor
+
+    def close(self):
+        r"""
+        Closes the session and all pooled connections, and shuts down the thread pools if they were started.
+
+        """
+        for executor in (self._executor, self._hedge_executor):
+            if executor is not None:
+                executor.shutdown()
+
+        self._executor = None
+        self._hedge_executor = None
+
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+def _close_response(future):
+    if future.exception() is None:
+        future.result().close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client():
+    r"""
+    Returns the client used by the :mod:`hubblepy.api` functions when no :code:`client` is given. The client is
+    created on first use.
+
+    Returns
+    -------
+    Client
+        The default client.
+
+    """
+    global _default_client
+
+    if _default_client is None:
+        with _default_client_lock:
+            if _default_client is None:
+                _default_client = Client()
+
+    return _default_client
+
+
+def set_default_client(client):
+    r"""
+    Replaces the client used by the :mod:`hubblepy.api` functions when no :code:`client` is given.
+
+    Parameters
+    ----------
+    client : Client or None
+        The new default client. If None, a new client with the default settings is created on next use.
+
+    """
+    global _default_client
+
+    with _default_client_lock:
+        _default_client = client
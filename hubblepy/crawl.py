@@ -0,0 +1,199 @@
+r"""
+Crawling of news releases together with the images and videos they reference. Instead of requesting each release and
+then its images and videos one after the other, :func:`crawl` sends the requests for the images and videos of a
+release as soon as the release arrives, while the other releases are still being requested, with a bounded number of
+requests in flight. Images and videos shared by several releases are only requested once.
+
+>>> graph = crawl(['2016-24', '2016-25', 'last'], max_workers=16)
+>>> graph.images_of('2016-24')
+[{'name': 'Hubble Spots ...', ...}, ...]
+>>> graph.releases_of_image(3831)
+['2016-24']
+
+"""
+import contextvars
+from collections.abc import Mapping
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from . import api
+from .client import get_default_client
+
+
+class ReleaseGraph(object):
+    r"""
+    News releases linked to their images and videos, as returned by :func:`crawl`.
+
+    Attributes
+    ----------
+    releases : dict
+        Maps the :code:`news_id` of each release to the release.
+    images : dict
+        Maps the id of each image referenced by the releases to the image.
+    videos : dict
+        Maps the id of each video referenced by the releases to the video.
+    aliases : dict
+        Maps the ids the releases were requested with (such as 'last') to their :code:`news_id`.
+    errors : dict
+        Maps a :code:`(function name, id)` tuple, such as :code:`('images', 3831)`, to the exception raised by each
+        request that failed. The rest of the graph is still crawled.
+    requests : int
+        The number of API calls made by the crawl.
+
+    """
+    def __init__(self):
+        self.releases = {}
+        self.images = {}
+        self.videos = {}
+        self.aliases = {}
+        self.errors = {}
+        self.requests = 0
+
+    def images_of(self, news_id):
+        r"""
+        Returns the images of a release, in the order of its :code:`release_images`. Images that failed to download
+        are left out.
+
+        """
+        release = self.releases[self.aliases.get(news_id, news_id)]
+
+        return [self.images[i] for i in _ids(release, 'release_images') if i in self.images]
+
+    def videos_of(self, news_id):
+        r"""
+        Returns the videos of a release, in the order of its :code:`release_videos`. Videos that failed to download
+        are left out.
+
+        """
+        release = self.releases[self.aliases.get(news_id, news_id)]
+
+        return [self.videos[i] for i in _ids(release, 'release_videos') if i in self.videos]
+
+    def releases_of_image(self, image_id):
+        r"""
+        Returns the :code:`news_id` of every crawled release referencing an image.
+
+        """
+        return [news_id for news_id, release in self.releases.items() if image_id in _ids(release, 'release_images')]
+
+    def releases_of_video(self, video_id):
+        r"""
+        Returns the :code:`news_id` of every crawled release referencing a video.
+
+        """
+        return [news_id for news_id, release in self.releases.items() if video_id in _ids(release, 'release_videos')]
+
+    def expand(self, news_id):
+        r"""
+        Returns a release as a dict whose :code:`release_images` and :code:`release_videos` hold the images and
+        videos themselves instead of their ids.
+
+        """
+        release = self.releases[self.aliases.get(news_id, news_id)]
+        release = release.to_dict() if hasattr(release, 'to_dict') else dict(release)
+
+        release['release_images'] = self.images_of(news_id)
+        release['release_videos'] = self.videos_of(news_id)
+
+        return release
+
+    def __repr__(self):
+        return 'ReleaseGraph({} releases, {} images, {} videos, {} errors)'.format(
+            len(self.releases), len(self.images), len(self.videos), len(self.errors))
+
+
+def crawl(releases, images=True, videos=True, max_workers=8, return_type='json', client=None):
+    r"""
+    Requests news releases and every image and video they reference, as a pipeline of concurrent requests.
+
+    Parameters
+    ----------
+    releases : str, int, list or tuple
+        The ids of the releases to crawl, as accepted by :func:`~hubblepy.api.news_release` (including 'first' and
+        'last').
+    images : bool
+        If True (the default), the images listed in :code:`release_images` are requested.
+    videos : bool
+        If True (the default), the videos listed in :code:`release_videos` are requested.
+    max_workers : int
+        The maximum number of requests in flight at once. Defaults to 8. Setting the client's :code:`pool_maxsize` to
+        at least this lets every request keep its connection alive.
+    return_type : str, {'json', 'record'}
+        The return type of the releases, images and videos. Defaults to JSON.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to send the requests, so its cache, memo, rate limit and retry
+        policy apply. If None, the default client is used.
+
+    Returns
+    -------
+    ReleaseGraph
+        The releases, images and videos, linked by their ids.
+
+    """
+    if return_type not in ('json', 'record'):
+        raise ValueError("'return_type' must be one of 'json', 'record'.")
+    if client is None:
+        client = get_default_client()
+    if not isinstance(releases, (list, tuple)):
+        releases = [releases]
+
+    graph = ReleaseGraph()
+    functions = {'news_release': api.news_release, 'images': api.images, 'videos': api.videos}
+    seen = {name: set() for name in functions}
+    pending = {}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        def submit(name, key):
+            if key in seen[name]:
+                return
+
+            seen[name].add(key)
+            graph.requests += 1
+
+            # Each request runs in a copy of the caller's context, so it keeps the caller's deadline.
+            future = executor.submit(contextvars.copy_context().run, functions[name], key, return_type=return_type,
+                                     client=client)
+            pending[future] = (name, key)
+
+        for release in releases:
+            submit('news_release', str(release))
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                name, key = pending.pop(future)
+
+                try:
+                    res = future.result()
+                except Exception as e:
+                    graph.errors[name, key] = e
+                    continue
+
+                if name == 'images':
+                    graph.images[key] = res
+                elif name == 'videos':
+                    graph.videos[key] = res
+                else:
+                    news_id = _field(res, 'news_id') or key
+                    graph.releases.setdefault(news_id, res)
+
+                    if news_id != key:
+                        graph.aliases[key] = news_id
+
+                    for image_id in (_ids(res, 'release_images') if images else ()):
+                        submit('images', image_id)
+                    for video_id in (_ids(res, 'release_videos') if videos else ()):
+                        submit('videos', video_id)
+
+    return graph
+
+
+def _field(result, name):
+    if isinstance(result, Mapping):
+        return result.get(name)
+
+    return getattr(result, name, None)
+
+
+def _ids(release, name):
+    return tuple(_field(release, name) or ())
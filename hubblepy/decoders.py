@@ -0,0 +1,152 @@
+r"""
+JSON decoders used to turn response bodies into results. :code:`orjson` and :code:`msgspec` are used when installed,
+and the standard library :mod:`json` module otherwise. Neither is required; install one with
+:code:`pip install hubblepy[fast]`.
+
+>>> client = hubblepy.Client(decoder='orjson')
+>>> hubblepy.images(list(range(4000, 4100)), client=client)
+
+With :code:`msgspec`, the 'record' return type decodes response bodies against the schema of the record classes, so
+no intermediate dict is built for each record.
+
+"""
+import json
+import sys
+from typing import Any, List, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:  # pragma: no cover
+    msgspec = None
+
+from . import records
+
+
+def available():
+    r"""
+    Returns the names of the decoders that can be used, fastest first.
+
+    """
+    return [name for name, module in (('orjson', orjson), ('msgspec', msgspec), ('json', json)) if module is not None]
+
+
+class Decoder(object):
+    r"""
+    Decodes response bodies with the chosen JSON library.
+
+    Parameters
+    ----------
+    name : str or None
+        The JSON library to use: 'orjson', 'msgspec' or 'json'. If None (the default), the fastest installed library
+        is used for JSON results, and :code:`msgspec` (if installed) for records.
+
+    Attributes
+    ----------
+    name : str
+        The library used for JSON results.
+    schema : bool
+        Whether records are decoded against their schema with :code:`msgspec`. Bodies holding fields unknown to the
+        record classes are decoded without it, so that those fields are kept in the :code:`extra` dict of the records
+        whichever decoder is used.
+
+    """
+    def __init__(self, name=None):
+        if name is not None and name not in ('orjson', 'msgspec', 'json'):
+            raise ValueError("'decoder' must be one of 'orjson', 'msgspec', 'json'.")
+        if name is not None and name not in available():
+            raise ImportError('The {} decoder is not installed. Install it with: pip install {}'.format(name, name))
+
+        self.name = name if name is not None else available()[0]
+        self.schema = msgspec is not None and name in (None, 'msgspec')
+
+        if self.name == 'orjson':
+            self.loads = orjson.loads
+        elif self.name == 'msgspec':
+            self.loads = msgspec.json.decode
+        else:
+            self.loads = json.loads
+
+    def records(self, content, endpoint, url=None):
+        r"""
+        Decodes a response body of an endpoint to records, as :func:`hubblepy.records.from_json` does for decoded
+        JSON.
+
+        """
+        if self.schema and endpoint in records._endpoint_records:
+            try:
+                return _decode_structs(content, endpoint, url)
+            except msgspec.ValidationError:
+                # Unknown fields (or unexpected types) are left to the generic path, which keeps them in extra.
+                pass
+
+        return records.from_json(self.loads(content), endpoint, url)
+
+    def __repr__(self):
+        return 'Decoder({!r})'.format(self.name)
+
+
+_struct_types = {}
+_struct_decoders = {}
+
+
+def _struct_type(cls):
+    r"""
+    Returns the :code:`msgspec.Struct` type mirroring the fields of a record class. Decoding an object with other
+    fields raises a :code:`msgspec.ValidationError`.
+
+    """
+    if cls not in _struct_types:
+        fields = []
+
+        for name in cls.fields:
+            item_cls = cls.nested.get(name)
+            field_type = Optional[List[_struct_type(item_cls)]] if item_cls is not None else Any
+            fields.append((name, field_type, None))
+
+        _struct_types[cls] = msgspec.defstruct(cls.__name__ + 'Struct', fields, forbid_unknown_fields=True)
+
+    return _struct_types[cls]
+
+
+def _struct_decoder(cls, many):
+    if (cls, many) not in _struct_decoders:
+        struct = _struct_type(cls)
+        _struct_decoders[cls, many] = msgspec.json.Decoder(List[struct] if many else struct)
+
+    return _struct_decoders[cls, many]
+
+
+def _decode_structs(content, endpoint, url):
+    cls = records._endpoint_records[endpoint]
+    many = endpoint in ('news', 'image_collections', 'video_collections', 'glossary', 'rss')
+
+    if many:
+        return [_from_struct(cls, s) for s in _struct_decoder(cls, True).decode(content)]
+
+    return _from_struct(cls, _struct_decoder(cls, False).decode(content), **records._url_defaults(endpoint, url))
+
+
+def _from_struct(cls, struct, **defaults):
+    record = cls.__new__(cls)
+
+    for name in cls.fields:
+        value = getattr(struct, name)
+
+        if value is None:
+            value = defaults.get(name)
+        elif isinstance(value, list):
+            item_cls = cls.nested.get(name)
+            value = tuple(_from_struct(item_cls, v) if item_cls is not None else v for v in value)
+        elif name in cls.interned and isinstance(value, str):
+            value = sys.intern(value)
+
+        setattr(record, name, value)
+
+    record.extra = None
+
+    return record
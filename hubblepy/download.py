@@ -0,0 +1,193 @@
+r"""
+Downloading of the image and video files listed in the :code:`image_files` and :code:`video_files` entries returned
+by :func:`~hubblepy.api.images` and :func:`~hubblepy.api.videos`.
+
+Files are streamed to disk in chunks, so memory use does not depend on the size of the file. Each file is first
+written to a :code:`.part` file next to its destination; if a download is interrupted, the next attempt asks the server
+for the remaining bytes only (with an HTTP :code:`Range` request) and appends them.
+
+>>> image = hubblepy.images(4229)
+>>> download(image, 'hubble/')
+['hubble/STSCI-H-p1839a-z-878x1000.png', ...]
+
+"""
+import contextvars
+import os
+from collections.abc import Mapping
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from .client import get_default_client
+from .exceptions import BatchError, DownloadError
+from .timeouts import request_timeout
+
+
+def asset_files(records):
+    r"""
+    Returns the file entries (dicts with a :code:`file_url` and :code:`file_size`) of image or video records.
+
+    Parameters
+    ----------
+    records : dict, Record or list
+        An image or video record as returned by :func:`~hubblepy.api.images` or :func:`~hubblepy.api.videos`, a single
+        file entry, or a list of either.
+
+    Returns
+    -------
+    list
+        List of file entries, in the order they appear in the records.
+
+    """
+    if isinstance(records, Mapping):
+        records = [records]
+
+    files = []
+
+    for record in records:
+        if 'file_url' in record:
+            files.append(record)
+        else:
+            files.extend(record.get('image_files', []))
+            files.extend(record.get('video_files', []))
+
+    return files
+
+
+def download(records, directory='.', client=None, max_workers=4, chunk_size=1024 * 1024, resume=True,
+             verify_size=True):
+    r"""
+    Downloads image or video files to a directory, several files at a time.
+
+    Parameters
+    ----------
+    records : dict, Record or list
+        The files to download: an image or video record (all of its files are downloaded), a single file entry from
+        :code:`image_files` or :code:`video_files`, or a list of either.
+    directory : str
+        The directory the files are written to, under the name of the file in its URL. It is created if it does not
+        exist. Defaults to the current directory.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` whose session is used for the downloads. If None, the default client is
+        used.
+    max_workers : int
+        The maximum number of files downloaded at once. Defaults to 4.
+    chunk_size : int
+        The number of bytes read from the network and written to disk at a time. Defaults to 1 MiB.
+    resume : bool
+        If True (the default), interrupted downloads are resumed from where they stopped instead of starting over.
+    verify_size : bool
+        If True (the default), the size of each downloaded file is checked against its :code:`file_size`.
+
+    Returns
+    -------
+    list
+        The paths of the downloaded files, in the same order as the files in :code:`records`.
+
+    Raises
+    ------
+    BatchError
+        If any download fails. The paths of the files that were downloaded are kept in the :code:`results` of the
+        error.
+
+    """
+    files = asset_files(records)
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(contextvars.copy_context().run, download_file, f,
+                                   os.path.join(directory, _file_name(f['file_url'])), client=client,
+                                   chunk_size=chunk_size, resume=resume, verify_size=verify_size)
+                   for f in files]
+
+    res, errors = [], {}
+
+    for f, future in zip(files, futures):
+        try:
+            res.append(future.result())
+        except Exception as e:
+            res.append(None)
+            errors[f['file_url']] = e
+
+    if errors:
+        raise BatchError(errors, res)
+
+    return res
+
+
+def download_file(file, path, client=None, chunk_size=1024 * 1024, resume=True, verify_size=True):
+    r"""
+    Downloads a single image or video file.
+
+    Parameters
+    ----------
+    file : dict or str
+        A file entry from :code:`image_files` or :code:`video_files`, or the URL of the file. The size of the file
+        can only be verified if a file entry is given.
+    path : str
+        The path the file is written to. If a complete file already exists there, it is not downloaded again.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` whose session is used for the download. If None, the default client is
+        used.
+    chunk_size : int
+        The number of bytes read from the network and written to disk at a time. Defaults to 1 MiB.
+    resume : bool
+        If True (the default), a download interrupted by an earlier call is resumed from where it stopped.
+    verify_size : bool
+        If True (the default), the size of the downloaded file is checked against the :code:`file_size` of the file
+        entry.
+
+    Returns
+    -------
+    str
+        The path of the downloaded file.
+
+    Raises
+    ------
+    DownloadError
+        If the size of the downloaded file does not match its :code:`file_size`.
+
+    """
+    if client is None:
+        client = get_default_client()
+
+    if isinstance(file, Mapping):
+        url, size = file['file_url'], file.get('file_size')
+    else:
+        url, size = file, None
+
+    if os.path.exists(path) and (size is None or os.path.getsize(path) == size):
+        return path
+
+    part = path + '.part'
+    offset = os.path.getsize(part) if resume and os.path.exists(part) else 0
+
+    if size is not None and offset > size:
+        offset = 0
+
+    headers = {'Range': 'bytes={}-'.format(offset)} if offset else None
+
+    with client.session.get(url, headers=headers, stream=True, timeout=request_timeout(client.timeout)) as r:
+        # A server answers 416 (range not satisfiable) when the .part file is already complete.
+        if not (offset and r.status_code == 416):
+            r.raise_for_status()
+
+            # The server ignored the range and is sending the whole file.
+            if r.status_code != 206:
+                offset = 0
+
+            with open(part, 'ab' if offset else 'wb') as f:
+                for chunk in r.iter_content(chunk_size=chunk_size):
+                    f.write(chunk)
+
+    if verify_size and size is not None and os.path.getsize(part) != size:
+        raise DownloadError('{} is {} bytes, expected {}'.format(url, os.path.getsize(part), size), url, part)
+
+    os.replace(part, path)
+
+    return path
+
+
+def _file_name(url):
+    return os.path.basename(urlparse(url).path)
@@ -0,0 +1,53 @@
+class HubblepyError(Exception):
+    r"""
+    Base class of the exceptions raised by hubblepy.
+
+    """
+
+
+class BatchError(HubblepyError):
+    r"""
+    Raised when one or more requests of a concurrent batch fail. The requests that succeeded are not lost; their
+    results are kept in :code:`results`.
+
+    Attributes
+    ----------
+    errors : dict
+        Maps each failed page or id to the exception raised by its request.
+    results : list
+        The results of the batch in the order of the input, with None in place of each failed request.
+
+    """
+    def __init__(self, errors, results):
+        self.errors = errors
+        self.results = results
+
+        super(BatchError, self).__init__('{} of {} requests failed: {}'.format(
+            len(errors), len(results), ', '.join(repr(key) for key in errors)))
+
+
+class DownloadError(HubblepyError):
+    r"""
+    Raised when a downloaded file is incomplete or its size does not match the :code:`file_size` reported by the
+    API.
+
+    Attributes
+    ----------
+    url : str
+        The URL of the file.
+    path : str
+        The path the file was being written to.
+
+    """
+    def __init__(self, message, url, path):
+        self.url = url
+        self.path = path
+
+        super(DownloadError, self).__init__(message)
+
+
+class DeadlineExceeded(HubblepyError):
+    r"""
+    Raised when a request cannot complete before the deadline set with :func:`~hubblepy.timeouts.deadline`.
+
+    """
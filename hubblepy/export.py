@@ -0,0 +1,199 @@
+r"""
+Columnar export of API results for analytics. Records are converted a batch at a time as they arrive, so a stream of
+pages such as the generator returned for :code:`page='all'` is never held in memory as dicts. Publication dates are
+parsed into timezone-aware UTC timestamps, and nested lists such as :code:`image_files` are split into child tables
+that refer to their parent record by key.
+
+Arrow and pandas output need :code:`pyarrow` or :code:`pandas`, installed separately
+(:code:`pip install hubblepy[arrow]` or :code:`pip install hubblepy[pandas]`).
+
+>>> tables = to_arrow(hubblepy.news(page='all'))
+>>> tables['records'].num_rows
+>>> images = to_pandas(hubblepy.images([4229, 4230]), ids=[4229, 4230])
+>>> images['image_files']
+
+"""
+from collections.abc import Mapping
+from datetime import timezone
+
+try:
+    import pyarrow
+except ImportError:  # pragma: no cover
+    pyarrow = None
+
+try:
+    import pandas
+except ImportError:  # pragma: no cover
+    pandas = None
+
+from .records import Record, _flatten
+from .sync import _parse_date
+
+
+timestamp_fields = ('publication', 'pub_date')
+child_fields = ('image_files', 'video_files', 'release_images', 'release_videos')
+
+
+def to_columns(records, ids=None):
+    r"""
+    Converts records to columns of plain Python values.
+
+    Parameters
+    ----------
+    records : dict, list or generator
+        The records, as returned by the API functions: a single record, a list of records or of pages, or the
+        generator returned for :code:`page='all'`.
+    ids : list or None
+        The ids of the records, in the same order, for records that do not hold their own id (those of
+        :func:`~hubblepy.api.images` and :func:`~hubblepy.api.videos`). They are stored in an :code:`id` column.
+
+    Returns
+    -------
+    dict
+        Maps 'records' and the name of each nested list field (e.g. 'image_files') to its table, itself a dict mapping
+        column names to lists of equal length. Rows of a child table start with the key (:code:`news_id` or
+        :code:`id`) of their parent record. Missing values are None.
+
+    """
+    tables = {}
+
+    for batch in iter_columns(records, ids=ids, batch_size=None):
+        for name, columns in batch.items():
+            _extend(tables.setdefault(name, {}), columns)
+
+    return tables
+
+
+def iter_columns(records, ids=None, batch_size=1000):
+    r"""
+    Generator yielding the tables of :func:`to_columns` for consecutive batches of at most :code:`batch_size` records.
+    If :code:`batch_size` is None, a single batch holding every record is yielded.
+
+    """
+    tables = {}
+    n = 0
+
+    for i, record in enumerate(_flatten(records)):
+        if record is None:
+            continue
+
+        record = record.to_dict() if isinstance(record, Record) else record
+        if ids is not None:
+            record = dict(record, id=ids[i])
+
+        key_field = 'news_id' if 'news_id' in record else 'id'
+        row = {}
+
+        for field, value in record.items():
+            if field in child_fields and isinstance(value, (list, tuple)):
+                children = dict({key_field: [record.get(key_field)] * len(value)}, **_child_columns(value))
+                _extend(tables.setdefault(field, {}), children)
+            elif field in timestamp_fields and value:
+                row[field] = _parse_date(value).astimezone(timezone.utc)
+            else:
+                row[field] = value
+
+        _extend(tables.setdefault('records', {}), {k: [v] for k, v in row.items()})
+        n += 1
+
+        if batch_size is not None and n == batch_size:
+            yield tables
+            tables, n = {}, 0
+
+    if n:
+        yield tables
+
+
+def to_arrow(records, ids=None, batch_size=1000):
+    r"""
+    Converts records to :code:`pyarrow` tables, building one record batch per :code:`batch_size` records. The
+    parameters are those of :func:`to_columns`.
+
+    Returns
+    -------
+    dict
+        Maps 'records' and the name of each nested list field to a :code:`pyarrow.Table`. Timestamp columns have the
+        type :code:`timestamp('us', tz='UTC')`.
+
+    """
+    if pyarrow is None:
+        raise ImportError('to_arrow requires pyarrow. Install it with: pip install hubblepy[arrow]')
+
+    batches = {}
+
+    for batch in iter_columns(records, ids=ids, batch_size=batch_size):
+        for name, columns in batch.items():
+            batches.setdefault(name, []).append(pyarrow.Table.from_pydict(columns))
+
+    # Batches may differ in columns (fields missing from every record of a batch) and null-only column types.
+    return {name: pyarrow.concat_tables(tables, promote_options='default') for name, tables in batches.items()}
+
+
+def to_pandas(records, ids=None):
+    r"""
+    Converts records to :code:`pandas` DataFrames. The parameters are those of :func:`to_columns`.
+
+    Returns
+    -------
+    dict
+        Maps 'records' and the name of each nested list field to a :code:`pandas.DataFrame`. Timestamp columns have
+        the type :code:`datetime64[ns, UTC]`.
+
+    """
+    if pandas is None:
+        raise ImportError('to_pandas requires pandas. Install it with: pip install hubblepy[pandas]')
+
+    tables = {}
+
+    for name, columns in to_columns(records, ids=ids).items():
+        frame = pandas.DataFrame(columns)
+
+        for field in timestamp_fields:
+            if field in frame:
+                frame[field] = pandas.to_datetime(frame[field], utc=True)
+
+        tables[name] = frame
+
+    return tables
+
+
+def _child_columns(values):
+    r"""
+    Returns the columns of the rows of a nested list: the fields of dict items, or a :code:`value` column for
+    scalar items such as the image ids of :code:`release_images`.
+
+    """
+    columns = {}
+
+    for value in values:
+        if not isinstance(value, Mapping):
+            value = {'value': value}
+
+        _extend(columns, {k: [v] for k, v in value.items()})
+
+    return columns
+
+
+def _extend(table, columns):
+    r"""
+    Appends rows to a table, padding columns missing from either side with None so all columns stay of equal length.
+
+    """
+    length = _length(table)
+    added = _length(columns)
+
+    for name, values in columns.items():
+        column = table.setdefault(name, [])
+        column.extend([None] * (length - len(column)))
+        column.extend(values)
+
+    _pad(table, length + added)
+
+
+def _pad(table, length):
+    for column in table.values():
+        column.extend([None] * (length - len(column)))
+
+
+def _length(table):
+    return max([len(column) for column in table.values()] or [0])
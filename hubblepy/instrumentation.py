@@ -0,0 +1,464 @@
+r"""
+Instrumentation of the requests sent by hubblepy. An :class:`Instrumentation` given to a
+:class:`~hubblepy.client.Client` or :class:`~hubblepy.aio.AsyncClient` keeps, for each endpoint (API function),
+histograms of request latency, response size and decoding time, and counts of requests, errors, retries and cache
+hits. Hooks can be registered to run before and after every request, and the measurements can be exported in the
+Prometheus text format or to OpenTelemetry.
+
+>>> instrumentation = Instrumentation()
+>>> client = hubblepy.Client(instrumentation=instrumentation, max_workers=8)
+>>> hubblepy.images(list(range(4000, 4100)), client=client)
+>>> instrumentation.histogram('request_seconds', 'images').quantile(0.99)
+>>> print(PrometheusExporter(instrumentation).render())
+
+"""
+import threading
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    from opentelemetry import metrics as otel_metrics
+except ImportError:  # pragma: no cover
+    otel_metrics = None
+
+
+default_buckets = {
+    'request_seconds': (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+    'response_bytes': (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216),
+    'decode_seconds': (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1),
+}
+
+# The name, kind, unit and description of every metric.
+metrics = {
+    'request_seconds': ('histogram', 's', 'Time taken by HTTP requests, from sending to reading the whole body.'),
+    'response_bytes': ('histogram', 'By', 'Size of the response bodies.'),
+    'decode_seconds': ('histogram', 's', 'Time taken to decode response bodies to the requested return type.'),
+    'requests': ('counter', '1', 'HTTP requests sent, including retries and hedged requests.'),
+    'errors': ('counter', '1', 'HTTP requests that raised an exception or were answered with a 4xx or 5xx status.'),
+    'retries': ('counter', '1', 'HTTP requests resent by the retry policy.'),
+    'memo_hits': ('counter', '1', 'Calls answered from the memo of decoded results.'),
+    'memo_misses': ('counter', '1', 'Calls not found in the memo of decoded results.'),
+    'cache_hits': ('counter', '1', 'Requests answered from the response cache, including revalidated responses.'),
+    'cache_misses': ('counter', '1', 'Requests not found in the response cache or changed on revalidation.'),
+    'mirror_hits': ('counter', '1', 'Requests answered from the local mirror.'),
+    'mirror_misses': ('counter', '1', 'Requests the local mirror could not answer.'),
+}
+
+
+class Histogram(object):
+    r"""
+    Histogram of observed values counted in fixed buckets, as in Prometheus.
+
+    Parameters
+    ----------
+    buckets : tuple
+        The upper bounds of the buckets, in increasing order. Values above the last bound are counted in an extra
+        overflow bucket.
+
+    Attributes
+    ----------
+    counts : list
+        The number of values in each bucket (not cumulative), the last item being the overflow bucket.
+    count : int
+        The number of values observed.
+    sum : float
+        The sum of the values observed.
+
+    """
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        r"""
+        Counts a value.
+
+        """
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    @property
+    def mean(self):
+        r"""
+        The mean of the values observed, or None if there are none.
+
+        """
+        return self.sum / self.count if self.count else None
+
+    def quantile(self, q):
+        r"""
+        Returns an estimate of the :code:`q` quantile (between 0 and 1) of the values observed, interpolating linearly
+        within the bucket it falls in, or None if there are none. Quantiles in the overflow bucket are given as the
+        last bound.
+
+        """
+        if not self.count:
+            return None
+
+        rank = q * self.count
+        seen = 0
+
+        for i, n in enumerate(self.counts[:-1]):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+
+            seen += n
+
+        return self.buckets[-1]
+
+    def copy(self):
+        histogram = Histogram(self.buckets)
+        histogram.counts = list(self.counts)
+        histogram.count = self.count
+        histogram.sum = self.sum
+
+        return histogram
+
+    def __repr__(self):
+        return 'Histogram(count={}, mean={})'.format(self.count, self.mean)
+
+
+class Instrumentation(object):
+    r"""
+    Collects measurements of the requests of one or more clients, per endpoint. Requests to URLs outside of the API
+    (such as downloaded files) are recorded under the endpoint None.
+
+    Parameters
+    ----------
+    buckets : dict or None
+        Maps histogram names ('request_seconds', 'response_bytes', 'decode_seconds') to their bucket bounds, merged
+        over :code:`hubblepy.instrumentation.default_buckets`.
+    exporters : list or None
+        :class:`Exporter` objects every measurement is passed on to as it is made, such as an
+        :class:`OpenTelemetryExporter`.
+
+    Examples
+    --------
+    >>> instrumentation = Instrumentation()
+    >>> @instrumentation.on_response
+    ... def log_slow(endpoint, url, params, response, seconds, error):
+    ...     if seconds > 1:
+    ...         print('slow request', url, seconds)
+
+    """
+    def __init__(self, buckets=None, exporters=None):
+        self.buckets = dict(default_buckets, **(buckets or {}))
+        self.exporters = list(exporters or ())
+
+        self.before_request = []
+        self.after_request = []
+
+        self._histograms = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def on_request(self, hook):
+        r"""
+        Registers a hook called as :code:`hook(endpoint, url, params)` before every HTTP request. Returns the hook, so
+        this can be used as a decorator.
+
+        """
+        self.before_request.append(hook)
+
+        return hook
+
+    def on_response(self, hook):
+        r"""
+        Registers a hook called as :code:`hook(endpoint, url, params, response, seconds, error)` after every HTTP
+        request. :code:`response` is None and :code:`error` the exception if the request failed. Returns the hook, so
+        this can be used as a decorator.
+
+        """
+        self.after_request.append(hook)
+
+        return hook
+
+    def observe(self, name, endpoint, value):
+        r"""
+        Adds a value to the histogram :code:`name` of an endpoint.
+
+        """
+        with self._lock:
+            histogram = self._histograms.get((name, endpoint))
+
+            if histogram is None:
+                histogram = self._histograms[name, endpoint] = Histogram(self.buckets[name])
+
+            histogram.observe(value)
+
+        for exporter in self.exporters:
+            exporter.observe(name, endpoint, value)
+
+    def count(self, name, endpoint, value=1):
+        r"""
+        Adds :code:`value` to the counter :code:`name` of an endpoint.
+
+        """
+        with self._lock:
+            self._counters[name, endpoint] = self._counters.get((name, endpoint), 0) + value
+
+        for exporter in self.exporters:
+            exporter.count(name, endpoint, value)
+
+    def request_started(self, endpoint, url, params):
+        r"""
+        Called by the clients before sending an HTTP request; runs the :code:`before_request` hooks.
+
+        """
+        for hook in self.before_request:
+            hook(endpoint, url, params)
+
+    def request_finished(self, endpoint, url, params, response, seconds, error=None):
+        r"""
+        Called by the clients once an HTTP request has completed or failed; records its latency and response size and
+        runs the :code:`after_request` hooks.
+
+        """
+        self.count('requests', endpoint)
+        self.observe('request_seconds', endpoint, seconds)
+
+        size = _response_size(response) if response is not None else None
+
+        if size is not None:
+            self.observe('response_bytes', endpoint, size)
+
+        if error is not None or response.status_code >= 400:
+            self.count('errors', endpoint)
+
+        for hook in self.after_request:
+            hook(endpoint, url, params, response, seconds, error)
+
+    def histogram(self, name, endpoint=None):
+        r"""
+        Returns a copy of the histogram :code:`name` of an endpoint, or of all endpoints merged if :code:`endpoint` is
+        None.
+
+        """
+        with self._lock:
+            if endpoint is not None:
+                histogram = self._histograms.get((name, endpoint))
+
+                return histogram.copy() if histogram is not None else Histogram(self.buckets[name])
+
+            merged = Histogram(self.buckets[name])
+
+            for (n, _), histogram in self._histograms.items():
+                if n == name:
+                    merged.counts = [a + b for a, b in zip(merged.counts, histogram.counts)]
+                    merged.count += histogram.count
+                    merged.sum += histogram.sum
+
+        return merged
+
+    def counter(self, name, endpoint=None):
+        r"""
+        Returns the counter :code:`name` of an endpoint, or its total over all endpoints if :code:`endpoint` is None.
+
+        """
+        with self._lock:
+            if endpoint is not None:
+                return self._counters.get((name, endpoint), 0)
+
+            return sum(value for (n, _), value in self._counters.items() if n == name)
+
+    def hit_rate(self, layer='cache', endpoint=None):
+        r"""
+        Returns the fraction of lookups answered by a layer ('memo', 'cache' or 'mirror'), or None if it has not been
+        looked up.
+
+        """
+        hits = self.counter(layer + '_hits', endpoint)
+        lookups = hits + self.counter(layer + '_misses', endpoint)
+
+        return hits / lookups if lookups else None
+
+    def snapshot(self):
+        r"""
+        Returns copies of every histogram and counter, as a :code:`(histograms, counters)` tuple of dicts keyed by
+        :code:`(name, endpoint)` tuples.
+
+        """
+        with self._lock:
+            histograms = {key: histogram.copy() for key, histogram in self._histograms.items()}
+
+            return histograms, dict(self._counters)
+
+    def reset(self):
+        r"""
+        Discards every measurement.
+
+        """
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+
+class Exporter(object):
+    r"""
+    Base class of the exporters given to an :class:`Instrumentation`, which receive each measurement as it is made.
+    Subclasses override :meth:`observe` and :meth:`count`, which must be thread-safe and quick, as they are called
+    while requests are sent.
+
+    """
+    def observe(self, name, endpoint, value):
+        r"""
+        Receives a value added to the histogram :code:`name` of an endpoint.
+
+        """
+
+    def count(self, name, endpoint, value):
+        r"""
+        Receives an increment of the counter :code:`name` of an endpoint.
+
+        """
+
+
+class OpenTelemetryExporter(Exporter):
+    r"""
+    Records the measurements on OpenTelemetry instruments, with the endpoint as the :code:`hubblepy.endpoint`
+    attribute. Requires :code:`opentelemetry-api` unless a meter is given (:code:`pip install hubblepy[otel]`).
+
+    Parameters
+    ----------
+    meter : opentelemetry.metrics.Meter or None
+        The meter creating the instruments. Defaults to the 'hubblepy' meter of the global meter provider.
+    prefix : str
+        Prefix of the instrument names, e.g. 'hubblepy.request_seconds'. Defaults to 'hubblepy.'.
+
+    """
+    def __init__(self, meter=None, prefix='hubblepy.'):
+        if meter is None:
+            if otel_metrics is None:
+                raise ImportError('OpenTelemetryExporter requires opentelemetry-api. Install it with: '
+                                  'pip install hubblepy[otel]')
+
+            meter = otel_metrics.get_meter('hubblepy')
+
+        self.meter = meter
+        self.instruments = {}
+
+        for name, (kind, unit, description) in metrics.items():
+            create = meter.create_histogram if kind == 'histogram' else meter.create_counter
+            self.instruments[name] = create(prefix + name, unit=unit, description=description)
+
+    def observe(self, name, endpoint, value):
+        self.instruments[name].record(value, attributes={'hubblepy.endpoint': str(endpoint)})
+
+    def count(self, name, endpoint, value):
+        self.instruments[name].add(value, attributes={'hubblepy.endpoint': str(endpoint)})
+
+
+class PrometheusExporter(object):
+    r"""
+    Renders the measurements of an :class:`Instrumentation` in the Prometheus text exposition format, to be scraped
+    from :meth:`serve` or written to a file for the node exporter's textfile collector. Unlike an :class:`Exporter`,
+    it reads the histograms and counters kept by the instrumentation when rendered.
+
+    Parameters
+    ----------
+    instrumentation : Instrumentation
+        The instrumentation whose measurements are exported.
+    namespace : str
+        Prefix of the metric names. Defaults to 'hubblepy'.
+
+    """
+    def __init__(self, instrumentation, namespace='hubblepy'):
+        self.instrumentation = instrumentation
+        self.namespace = namespace
+
+    def render(self):
+        r"""
+        Returns the measurements in the Prometheus text format.
+
+        """
+        histograms, counters = self.instrumentation.snapshot()
+        lines = []
+
+        for name, (kind, unit, description) in metrics.items():
+            metric = '{}_{}'.format(self.namespace, name)
+
+            if kind == 'histogram':
+                series = sorted((k[1] or '', h) for k, h in histograms.items() if k[0] == name)
+
+                if not series:
+                    continue
+
+                lines.append('# HELP {} {}'.format(metric, description))
+                lines.append('# TYPE {} histogram'.format(metric))
+
+                for endpoint, histogram in series:
+                    cumulative = 0
+
+                    for bound, n in zip(histogram.buckets + (float('inf'),), histogram.counts):
+                        cumulative += n
+                        lines.append('{}_bucket{{endpoint="{}",le="{}"}} {}'.format(metric, endpoint,
+                                                                                   _format(bound), cumulative))
+
+                    lines.append('{}_sum{{endpoint="{}"}} {}'.format(metric, endpoint, _format(histogram.sum)))
+                    lines.append('{}_count{{endpoint="{}"}} {}'.format(metric, endpoint, histogram.count))
+            else:
+                series = sorted((k[1] or '', v) for k, v in counters.items() if k[0] == name)
+
+                if not series:
+                    continue
+
+                lines.append('# HELP {}_total {}'.format(metric, description))
+                lines.append('# TYPE {}_total counter'.format(metric))
+
+                for endpoint, value in series:
+                    lines.append('{}_total{{endpoint="{}"}} {}'.format(metric, endpoint, value))
+
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port=9464, address=''):
+        r"""
+        Serves the rendered measurements over HTTP on a background thread, for Prometheus to scrape. Returns the
+        server; call its :code:`shutdown` method to stop it.
+
+        """
+        exporter = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = exporter.render().encode('utf-8')
+
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer((address, port), Handler)
+        thread = threading.Thread(target=server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+        return server
+
+
+def _format(value):
+    if value == float('inf'):
+        return '+Inf'
+
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def _response_size(response):
+    r"""
+    Returns the size of a response body. Streamed bodies are not read for it; their :code:`Content-Length` is used if
+    they have one, and None is returned otherwise.
+
+    """
+    if getattr(response, '_content', None) is False:
+        length = response.headers.get('Content-Length', '')
+
+        return int(length) if length.isdigit() else None
+
+    return len(response.content)
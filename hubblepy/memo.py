@@ -0,0 +1,195 @@
+r"""
+In-process memoization of decoded API results. Where :mod:`hubblepy.cache` stores raw responses, a :class:`Memo`
+keeps the objects returned by the API functions themselves, so repeated calls skip both the request and the decoding
+of the response.
+
+>>> client = hubblepy.Client(memo=Memo(max_bytes=64 * 1024 * 1024, ttl=60))
+>>> hubblepy.glossary(client=client)
+>>> hubblepy.glossary(client=client)
+>>> client.memo.hits
+1
+
+"""
+import copy
+import sys
+import threading
+import time
+from collections import OrderedDict
+from types import MappingProxyType
+
+from .records import Record, _freeze
+
+
+missing = object()
+
+
+class Memo(object):
+    r"""
+    Least recently used store of decoded results, bounded by the approximate memory size of the stored objects.
+
+    Parameters
+    ----------
+    max_bytes : int
+        The approximate maximum size, in bytes, of all stored results. Least recently used results are evicted once
+        the budget is exceeded. Defaults to 32 MiB.
+    ttl : int, float or None
+        How long, in seconds, a result is reused before it is requested again. If None, results are kept until they
+        are evicted. Defaults to 60 seconds.
+    view : str, {'copy', 'readonly', 'shared'}
+        How stored results are handed out. 'copy' (the default) returns a deep copy on every hit, so callers may
+        freely modify what they get. 'readonly' stores the result as nested :code:`MappingProxyType` objects,
+        tuples and read-only records, which are returned as is and cannot be modified. 'shared' returns the stored
+        objects themselves and is only safe if callers never modify them. Text and bytes results are always returned
+        as is.
+
+    Attributes
+    ----------
+    hits : int
+        The number of lookups answered from the memo.
+    misses : int
+        The number of lookups that were not.
+    evictions : int
+        The number of results evicted to stay under :code:`max_bytes`.
+
+    """
+    def __init__(self, max_bytes=32 * 1024 * 1024, ttl=60, view='copy'):
+        if view not in ('copy', 'readonly', 'shared'):
+            raise ValueError("'view' must be one of 'copy', 'readonly', 'shared'.")
+
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.view = view
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes = 0
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        r"""
+        Returns a view of the result stored under :code:`key`, or :code:`hubblepy.memo.missing` if there is no such
+        result or it has expired.
+
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and self.ttl is not None and time.time() >= entry[2]:
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+
+                return missing
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        return self._view(entry[0])
+
+    def set(self, key, value):
+        r"""
+        Stores :code:`value` under :code:`key` and returns the view of it that should be handed to the caller.
+
+        """
+        if self.view == 'readonly':
+            value = freeze(value)
+
+        size = sizeof(value)
+        expires = time.time() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size, expires)
+                self.bytes += size
+
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+        return self._view(value) if self.view == 'copy' else value
+
+    def clear(self):
+        r"""
+        Removes every stored result. The hit and miss counters are kept.
+
+        """
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self):
+        r"""
+        Returns the hit, miss and eviction counters along with the number and total size of the stored results.
+
+        Returns
+        -------
+        dict
+
+        """
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._entries), 'bytes': self.bytes}
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self.bytes -= size
+
+    def _view(self, value):
+        if self.view == 'copy' and isinstance(value, (dict, list, Record)):
+            return copy.deepcopy(value)
+
+        return value
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def freeze(obj):
+    r"""
+    Returns a read-only version of a decoded JSON object or record, where dicts become :code:`MappingProxyType`
+    objects, lists become tuples and records become read-only copies.
+
+    """
+    if isinstance(obj, dict):
+        return MappingProxyType({k: freeze(v) for k, v in obj.items()})
+    if isinstance(obj, (list, tuple)):
+        return tuple(freeze(v) for v in obj)
+    if isinstance(obj, Record):
+        return _freeze(obj, freeze)
+
+    return obj
+
+
+def sizeof(obj):
+    r"""
+    Returns the approximate memory size, in bytes, of a decoded JSON object or record including everything it
+    contains.
+
+    """
+    size = sys.getsizeof(obj)
+
+    if isinstance(obj, (dict, MappingProxyType)):
+        if isinstance(obj, MappingProxyType):
+            size += sys.getsizeof(dict(obj))
+
+        for k, v in obj.items():
+            size += sizeof(k) + sizeof(v)
+
+    elif isinstance(obj, (list, tuple)):
+        for v in obj:
+            size += sizeof(v)
+
+    elif isinstance(obj, Record):
+        for cls in type(obj).__mro__:
+            for name in getattr(cls, '__slots__', ()):
+                size += sizeof(getattr(obj, name, None))
+
+    return size
@@ -0,0 +1,388 @@
+r"""
+Local mirror of the HubbleSite catalogues. :meth:`Mirror.pull` copies the news releases, images, videos, glossary
+and external feeds into an indexed sqlite database; the mirror can then be queried directly, or attached to a
+:class:`~hubblepy.client.Client` so that the API functions read from it instead of hubblesite.org.
+
+>>> mirror = Mirror('hubble.sqlite')
+>>> mirror.pull(image_collections=['news'], video_collections=['news'], feeds=['esa_feed'])
+>>> mirror.images(collection='news', mission='hubble')
+>>> hubblepy.news_release('2016-24', client=hubblepy.Client(mirror=mirror))
+
+"""
+import json
+import re
+import sqlite3
+import threading
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+from . import api
+
+
+_schema = [
+    'CREATE TABLE IF NOT EXISTS news (news_id TEXT PRIMARY KEY, publication TEXT, mission TEXT, body TEXT)',
+    'CREATE INDEX IF NOT EXISTS news_publication ON news (publication)',
+    'CREATE INDEX IF NOT EXISTS news_mission ON news (mission)',
+    'CREATE TABLE IF NOT EXISTS images (id INTEGER PRIMARY KEY, collection TEXT, mission TEXT, news_name TEXT, '
+    'body TEXT)',
+    'CREATE INDEX IF NOT EXISTS images_collection ON images (collection)',
+    'CREATE INDEX IF NOT EXISTS images_mission ON images (mission)',
+    'CREATE TABLE IF NOT EXISTS videos (id INTEGER PRIMARY KEY, collection TEXT, mission TEXT, body TEXT)',
+    'CREATE INDEX IF NOT EXISTS videos_collection ON videos (collection)',
+    'CREATE INDEX IF NOT EXISTS videos_mission ON videos (mission)',
+    'CREATE TABLE IF NOT EXISTS glossary (name TEXT PRIMARY KEY, slug TEXT, definition TEXT)',
+    'CREATE INDEX IF NOT EXISTS glossary_slug ON glossary (slug)',
+    'CREATE TABLE IF NOT EXISTS feed_posts (feed TEXT, pub_date TEXT, body TEXT, PRIMARY KEY (feed, pub_date))',
+    'CREATE TABLE IF NOT EXISTS listings (route TEXT, position INTEGER, body TEXT, PRIMARY KEY (route, position))'
+]
+
+#: The primary key columns of the tables of records.
+_keys = {
+    'news': ('news_id',),
+    'images': ('id',),
+    'videos': ('id',),
+    'glossary': ('name',),
+    'feed_posts': ('feed', 'pub_date'),
+}
+
+
+class Mirror(object):
+    r"""
+    Offline copy of the HubbleSite catalogues stored in a sqlite database.
+
+    Release :code:`news_id`, image and video ids, glossary names and the :code:`pub_date` of feed posts are primary
+    keys, and the :code:`collection` and :code:`mission` of images and videos and the :code:`publication` date of
+    releases are indexed, so lookups do not scan the tables. The listings returned by the paginated endpoints are kept
+    in their original order.
+
+    Parameters
+    ----------
+    path : str
+        The path of the database file. It is created if it does not exist. ':memory:' keeps the database in memory.
+
+    """
+    def __init__(self, path):
+        self.path = path
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+
+        for statement in _schema:
+            self._conn.execute(statement)
+
+        self._conn.commit()
+
+    def pull(self, client=None, news=True, image_collections=None, video_collections=None, glossary=True,
+             feeds=None):
+        r"""
+        Copies catalogues from the API into the mirror, replacing what was pulled before. Records that a pulled
+        listing held before but no longer holds are removed, unless another pulled collection still holds them (such as
+        an image of two collections).
+
+        Parameters
+        ----------
+        client : Client or None
+            The :class:`~hubblepy.client.Client` used for the requests. It must not read from a mirror itself. With a
+            client created with :code:`max_workers`, the records of each catalogue are fetched concurrently.
+        news : bool
+            If True (the default), the :code:`news` listing and the :code:`news_release` record of each release are
+            pulled.
+        image_collections : list or None
+            The names of the image collections (e.g. 'news', 'spacecraft') whose listing and :code:`images` records
+            are pulled.
+        video_collections : list or None
+            The names of the video collections whose listing and :code:`videos` records are pulled.
+        glossary : bool
+            If True (the default), the glossary is pulled.
+        feeds : list or None
+            The names of the external feeds (e.g. 'esa_feed') whose posts are pulled.
+
+        Returns
+        -------
+        dict
+            The number of items pulled into each listing, keyed by route (e.g. 'news', 'images/news').
+
+        """
+        if client is not None and client.mirror is not None:
+            raise ValueError('The client used to pull a mirror must not read from a mirror.')
+
+        counts = {}
+
+        if news:
+            items = list(api.news(page='all', client=client))
+            releases = api.news_release([item['news_id'] for item in items], client=client)
+
+            self._replace('news', items, 'news', lambda item: (item['news_id'],),
+                          [(r['news_id'], r.get('publication'), r.get('mission'), _dumps(r)) for r in releases])
+            counts['news'] = len(items)
+
+        for collection in image_collections or []:
+            items = list(api.image_collections(page='all', collection_name=collection, client=client))
+            records = api.images([item['id'] for item in items], client=client)
+
+            self._replace('images/' + collection, items, 'images', lambda item: (item['id'],),
+                          [(item['id'], r.get('collection'), r.get('mission'), r.get('news_name'), _dumps(r))
+                           for item, r in zip(items, records)])
+            counts['images/' + collection] = len(items)
+
+        for collection in video_collections or []:
+            items = list(api.video_collections(page='all', collection_name=collection, client=client))
+            records = api.videos([item['id'] for item in items], client=client)
+
+            self._replace('videos/' + collection, items, 'videos', lambda item: (item['id'],),
+                          [(item['id'], r.get('collection'), r.get('mission'), _dumps(r))
+                           for item, r in zip(items, records)])
+            counts['videos/' + collection] = len(items)
+
+        if glossary:
+            items = list(api.glossary(page='all', client=client))
+
+            self._replace('glossary', items, 'glossary', lambda item: (item['name'],),
+                          [(item['name'], _slug(item['name']), item['definition']) for item in items])
+            counts['glossary'] = len(items)
+
+        for feed in feeds or []:
+            items = list(api.rss(feed, page='all', sort='desc', client=client))
+
+            self._replace('external_feed/' + feed, items, 'feed_posts',
+                          lambda item, feed=feed: (feed, item['pub_date']),
+                          [(feed, item['pub_date'], _dumps(item)) for item in items])
+            counts['external_feed/' + feed] = len(items)
+
+        return counts
+
+    def news_release(self, news_id):
+        r"""
+        Returns the :code:`news_release` record of a release, or None if it is not in the mirror. 'first' and 'last'
+        return the earliest and latest published release.
+
+        """
+        if news_id in ('first', 'last'):
+            order = 'ASC' if news_id == 'first' else 'DESC'
+
+            return self._one('SELECT body FROM news ORDER BY publication {} LIMIT 1'.format(order), ())
+
+        return self._one('SELECT body FROM news WHERE news_id = ?', (news_id,))
+
+    def image(self, image_id):
+        r"""
+        Returns the :code:`images` record of an image, or None if it is not in the mirror.
+
+        """
+        return self._one('SELECT body FROM images WHERE id = ?', (int(image_id),))
+
+    def video(self, video_id):
+        r"""
+        Returns the :code:`videos` record of a video, or None if it is not in the mirror.
+
+        """
+        return self._one('SELECT body FROM videos WHERE id = ?', (int(video_id),))
+
+    def images(self, collection=None, mission=None):
+        r"""
+        Returns the records of the images in a collection and/or of a mission, by ascending id. Each record is given
+        an :code:`id` key.
+
+        """
+        return self._records('images', collection, mission)
+
+    def videos(self, collection=None, mission=None):
+        r"""
+        Returns the records of the videos in a collection and/or of a mission, by ascending id. Each record is given
+        an :code:`id` key.
+
+        """
+        return self._records('videos', collection, mission)
+
+    def glossary_term(self, term):
+        r"""
+        Returns the definition of a glossary term in the form returned by :func:`~hubblepy.api.glossary_term`, or
+        None if it is not in the mirror. The term can be given by its name or its URL slug.
+
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT definition FROM glossary WHERE name = ? OR slug = ?',
+                                     (term, _slug(term))).fetchone()
+
+        return {'definition': row[0]} if row is not None else None
+
+    def feed_posts(self, feed, since=None, until=None):
+        r"""
+        Returns the posts of an external feed, newest first, optionally limited to those published from
+        :code:`since` up to :code:`until` (ISO 8601 strings such as '2018-01-01').
+
+        """
+        sql, args = 'SELECT body FROM feed_posts WHERE feed = ?', [feed]
+
+        if since is not None:
+            sql += ' AND pub_date >= ?'
+            args.append(since)
+        if until is not None:
+            sql += ' AND pub_date < ?'
+            args.append(until)
+
+        with self._lock:
+            rows = self._conn.execute(sql + ' ORDER BY pub_date DESC', args).fetchall()
+
+        return [json.loads(row[0]) for row in rows]
+
+    def response(self, url, params=None):
+        r"""
+        Answers an API request from the mirror, as used by :class:`~hubblepy.client.Client`.
+
+        Parameters
+        ----------
+        url : str
+            The requested URL.
+        params : dict or None
+            Query string parameters of the request.
+
+        Returns
+        -------
+        requests.Response or None
+            A response holding the mirrored JSON, or None if the mirror does not hold the requested data.
+
+        """
+        if not url.startswith(api.api_url):
+            return None
+
+        parsed = urlparse(url)
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        query.update({k: v for k, v in (params or {}).items() if v is not None})
+
+        route = parsed.path[len(urlparse(api.api_url).path):].strip('/').split('/')
+        body = self._route(route, query)
+
+        if body is None:
+            return None
+
+        r = requests.Response()
+        r.url = requests.Request('GET', url, params=params).prepare().url
+        r.status_code = 200
+        r.headers = CaseInsensitiveDict({'Content-Type': 'application/json; charset=utf-8'})
+        r.encoding = 'utf-8'
+        r._content = body.encode('utf-8')
+
+        return r
+
+    def close(self):
+        r"""
+        Closes the database connection.
+
+        """
+        with self._lock:
+            self._conn.close()
+
+    def _route(self, route, query):
+        name = api._endpoint_names.get((route[0], len(route)))
+
+        if name in ('news', 'image_collections', 'video_collections', 'glossary', 'rss'):
+            return self._page('/'.join(route), query)
+
+        if name == 'news_release':
+            record = self.news_release(route[1])
+        elif name in ('images', 'videos') and route[1].isdigit():
+            record = self.image(route[1]) if name == 'images' else self.video(route[1])
+        elif name == 'glossary_term':
+            record = self.glossary_term(route[1])
+        elif name == 'rss_posts':
+            record = self._one('SELECT body FROM feed_posts WHERE feed = ? AND pub_date = ?', (route[1], route[2]))
+        else:
+            record = None
+
+        return _dumps(record) if record is not None else None
+
+    def _page(self, route, query):
+        try:
+            page = int(query.get('page') or 1)
+        except (TypeError, ValueError):
+            # Left to the API, which answers such pages itself.
+            return None
+
+        if page < 1:
+            return None
+
+        with self._lock:
+            count = self._conn.execute('SELECT COUNT(*) FROM listings WHERE route = ?', (route,)).fetchone()[0]
+
+            if count == 0:
+                return None
+
+            # Feeds are pulled newest first; the oldest first order is read backwards.
+            if query.get('sort') == 'pub_date':
+                start, stop = count - page * api.page_size, count - (page - 1) * api.page_size
+                order = 'DESC'
+            else:
+                start, stop = (page - 1) * api.page_size, page * api.page_size
+                order = 'ASC'
+
+            rows = self._conn.execute('SELECT body FROM listings WHERE route = ? AND position >= ? AND position < ? '
+                                      'ORDER BY position {}'.format(order), (route, start, stop)).fetchall()
+
+        return '[' + ','.join(row[0] for row in rows) + ']'
+
+    def _replace(self, route, items, table, key, rows):
+        r"""
+        Replaces the listing of a route and the records of its items in :code:`table`, deleting the records of items
+        it no longer holds unless another collection of images or videos holds them. :code:`key` returns the primary
+        key of the record of a listing item.
+
+        """
+        placeholders = ', '.join('?' * len(rows[0])) if rows else ''
+
+        with self._lock:
+            listed = self._conn.execute('SELECT body FROM listings WHERE route = ?', (route,)).fetchall()
+            stale = set(key(json.loads(row[0])) for row in listed) - set(key(item) for item in items)
+
+            self._conn.execute('DELETE FROM listings WHERE route = ?', (route,))
+            self._conn.executemany('INSERT INTO listings VALUES (?, ?, ?)',
+                                   [(route, i, _dumps(item)) for i, item in enumerate(items)])
+
+            if stale and table in ('images', 'videos'):
+                others = self._conn.execute('SELECT body FROM listings WHERE route LIKE ?', (table + '/%',)).fetchall()
+                stale -= set(key(json.loads(row[0])) for row in others)
+
+            if stale:
+                self._conn.executemany('DELETE FROM {} WHERE {}'.format(table, ' AND '.join(
+                    '{} = ?'.format(column) for column in _keys[table])), list(stale))
+
+            if rows:
+                self._conn.executemany('INSERT OR REPLACE INTO {} VALUES ({})'.format(table, placeholders), rows)
+
+            self._conn.commit()
+
+    def _one(self, sql, args):
+        with self._lock:
+            row = self._conn.execute(sql, args).fetchone()
+
+        return json.loads(row[0]) if row is not None else None
+
+    def _records(self, table, collection, mission):
+        sql, args = 'SELECT id, body FROM {} WHERE 1'.format(table), []
+
+        if collection is not None:
+            sql += ' AND collection = ?'
+            args.append(collection)
+        if mission is not None:
+            sql += ' AND mission = ?'
+            args.append(mission)
+
+        with self._lock:
+            rows = self._conn.execute(sql + ' ORDER BY id', args).fetchall()
+
+        return [dict(json.loads(body), id=i) for i, body in rows]
+
+    def __len__(self):
+        with self._lock:
+            return sum(self._conn.execute('SELECT COUNT(*) FROM {}'.format(table)).fetchone()[0]
+                       for table in ('news', 'images', 'videos', 'glossary', 'feed_posts'))
+
+
+def _dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+
+
+def _slug(name):
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')
@@ -0,0 +1,191 @@
+r"""
+Client-side rate limiting and retries. A :class:`TokenBucket` shared by a :class:`~hubblepy.client.Client` (and, if
+given to both, an :class:`~hubblepy.aio.AsyncClient`) paces the requests of every thread and task. It backs off
+when the server answers 429 (Too Many Requests) and slowly speeds up again while requests succeed. A :class:`Retry`
+policy resends requests that failed with a 429, a 5xx status or a connection error, waiting with jittered
+exponential backoff or as long as the server's :code:`Retry-After` header asks.
+
+>>> bucket = TokenBucket(rate=5, max_rate=20)
+>>> client = hubblepy.Client(rate_limit=bucket, retry=Retry(total=5), max_workers=8)
+>>> hubblepy.images(list(range(4000, 4500)), client=client)
+
+"""
+import asyncio
+import random
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket(object):
+    r"""
+    Adaptive token bucket limiting the rate of requests.
+
+    Each request takes a token; tokens are added at :code:`rate` per second up to :code:`burst`. When the server
+    answers 429, the rate is halved (down to :code:`min_rate`) and no token is handed out until the
+    :code:`Retry-After` delay has passed. Every successful response raises the rate by :code:`increase` (up to
+    :code:`max_rate`), so the rate settles just below what the server tolerates.
+
+    Parameters
+    ----------
+    rate : float
+        The initial number of requests per second. Defaults to 10.
+    burst : int or None
+        The maximum number of requests sent at once after an idle period. Defaults to the initial rate.
+    min_rate : float
+        The rate is never lowered below this. Defaults to 0.5.
+    max_rate : float or None
+        The rate is never raised above this. Defaults to the initial rate; set it higher to let the rate grow while
+        the server accepts it.
+    increase : float
+        How much the rate grows with each successful response. Defaults to 0.1.
+
+    """
+    def __init__(self, rate=10, burst=None, min_rate=0.5, max_rate=None, increase=0.1):
+        self.rate = float(rate)
+        self.burst = burst if burst is not None else max(1, int(rate))
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else float(rate)
+        self.increase = increase
+
+        self.throttled = 0
+
+        # The time the next request may be sent at the current rate, ignoring the burst allowance.
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        r"""
+        Takes a token and returns how long, in seconds, the caller must wait before sending its request. Tokens are
+        handed out in order, so concurrent callers are spaced :code:`1 / rate` seconds apart.
+
+        """
+        with self._lock:
+            now = time.monotonic()
+            start = max(self._next, now - (self.burst - 1) / self.rate)
+            self._next = start + 1 / self.rate
+
+            return max(0, start - now)
+
+    def acquire(self):
+        r"""
+        Waits until a request may be sent. Returns the time waited, in seconds.
+
+        """
+        wait = self.reserve()
+
+        if wait > 0:
+            time.sleep(wait)
+
+        return wait
+
+    async def acquire_async(self):
+        r"""
+        Asynchronous version of :meth:`acquire`, waiting without blocking the event loop.
+
+        """
+        wait = self.reserve()
+
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+        return wait
+
+    def throttle(self, retry_after=None):
+        r"""
+        Lowers the rate after a 429 response and holds back every request for :code:`retry_after` seconds (or one
+        interval at the lowered rate if None).
+
+        """
+        with self._lock:
+            self.throttled += 1
+            self.rate = max(self.min_rate, self.rate / 2)
+
+            pause = retry_after if retry_after is not None else 1 / self.rate
+            self._next = max(self._next, time.monotonic() + pause)
+
+    def success(self):
+        r"""
+        Raises the rate after a successful response.
+
+        """
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def observe(self, status_code, retry_after=None):
+        r"""
+        Adapts the rate to the status of a response: :meth:`throttle` for 429 and :meth:`success` for any other status
+        below 500.
+
+        """
+        if status_code == 429:
+            self.throttle(retry_after)
+        elif status_code < 500:
+            self.success()
+
+
+class Retry(object):
+    r"""
+    Retry policy for failed requests. Only GET requests are sent by hubblepy, so every request can be safely resent.
+
+    Parameters
+    ----------
+    total : int
+        The maximum number of retries of a request. Defaults to 3.
+    backoff : float
+        The base delay, in seconds. The n-th retry waits a random time of up to :code:`backoff * 2 ** n` seconds
+        ("full jitter"), so clients retrying at once spread out. Defaults to 0.5.
+    max_backoff : float
+        The maximum delay, in seconds, including delays asked for by :code:`Retry-After`. Defaults to 60.
+    statuses : tuple
+        The response statuses that are retried. Defaults to 429, 500, 502, 503 and 504.
+    connection_errors : bool
+        If True (the default), requests failing with a connection error or timeout are retried too.
+
+    """
+    def __init__(self, total=3, backoff=0.5, max_backoff=60, statuses=(429, 500, 502, 503, 504),
+                 connection_errors=True):
+        self.total = total
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.statuses = statuses
+        self.connection_errors = connection_errors
+
+    def delay(self, attempt, retry_after=None):
+        r"""
+        Returns how long to wait, in seconds, before the retry following the failed attempt number :code:`attempt`
+        (starting from 0). A :code:`retry_after` delay from the server takes precedence over the backoff.
+
+        """
+        if retry_after is not None:
+            return min(self.max_backoff, retry_after)
+
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+
+def retry_after(headers):
+    r"""
+    Returns the delay, in seconds, asked for by the :code:`Retry-After` header of a response, or None. Both the
+    number of seconds and the HTTP date forms are understood.
+
+    """
+    value = headers.get('Retry-After')
+
+    if value is None:
+        return None
+
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+
+    return max(0.0, (date - datetime.now(timezone.utc)).total_seconds())
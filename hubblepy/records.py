@@ -0,0 +1,384 @@
+r"""
+Compact record classes returned by the API functions for :code:`return_type='record'`. Records use
+:code:`__slots__` instead of a per-object dict, repeated values such as :code:`mission` and :code:`collection` are
+interned so every record shares one string object, and long text fields (abstracts, descriptions, definitions and
+credits) are kept as UTF-8 bytes and only decoded when they are read.
+
+>>> image = hubblepy.images(4229, return_type='record')
+>>> image.mission, image.image_files[0].width
+('hubble', 878)
+>>> image.to_dict()
+
+Fields returned by the API that a record class does not know about are kept in its :code:`extra` dict. Records are
+read-only mappings of their fields that are not None, so they can be passed wherever the dicts of the 'json' return
+type are taken.
+
+"""
+import sys
+from collections.abc import Mapping
+from urllib.parse import unquote, urlparse
+
+
+def _text(name):
+    r"""
+    Returns a property storing a text field as UTF-8 bytes in the slot :code:`_<name>` and decoding it on access.
+
+    """
+    slot = '_' + name
+
+    def get(self):
+        value = getattr(self, slot)
+
+        return value.decode('utf-8') if value is not None else None
+
+    def set(self, value):
+        setattr(self, slot, value.encode('utf-8') if isinstance(value, str) else value)
+
+    return property(get, set)
+
+
+class Record(Mapping):
+    r"""
+    Base class of the records. Records compare equal when their :meth:`to_dict` results are equal, and fields can
+    also be read with :code:`record['name']`, :code:`record.get('name')` and the other methods of a mapping, like the
+    dicts of the 'json' return type. The keys of a record are those of its :meth:`to_dict` result.
+
+    """
+    __slots__ = ('extra',)
+
+    #: The fields of the record, in the order of the API response.
+    fields = ()
+    #: Fields whose values are interned.
+    interned = ()
+    #: Fields kept encoded until they are read.
+    text = ()
+    #: Fields holding lists of nested records, mapped to the class of their items.
+    nested = {}
+
+    @classmethod
+    def from_json(cls, obj, **defaults):
+        r"""
+        Creates a record from a decoded JSON object. :code:`defaults` gives values for fields missing from the object,
+        such as the id of an image, which is only part of its URL.
+
+        """
+        record = cls.__new__(cls)
+        known = set(cls.fields)
+
+        for name in cls.fields:
+            value = obj.get(name, defaults.get(name))
+
+            if isinstance(value, list):
+                item_cls = cls.nested.get(name)
+                value = tuple(item_cls.from_json(v) if item_cls is not None else v for v in value)
+            elif name in cls.interned and isinstance(value, str):
+                value = sys.intern(value)
+
+            setattr(record, name, value)
+
+        extra = {k: v for k, v in obj.items() if k not in known}
+        record.extra = extra or None
+
+        return record
+
+    def to_dict(self):
+        r"""
+        Returns the record as the dict of the 'json' return type. Fields that are None are left out.
+
+        """
+        res = {}
+
+        for name in self.fields:
+            value = getattr(self, name)
+
+            if isinstance(value, tuple):
+                value = [v.to_dict() if isinstance(v, Record) else v for v in value]
+
+            if value is not None:
+                res[name] = value
+
+        if self.extra:
+            res.update(self.extra)
+
+        return res
+
+    def __getitem__(self, name):
+        if name in self.fields and getattr(self, name) is not None:
+            return getattr(self, name)
+        if self.extra and name in self.extra:
+            return self.extra[name]
+
+        raise KeyError(name)
+
+    def __iter__(self):
+        for name in self.fields:
+            if getattr(self, name) is not None:
+                yield name
+
+        if self.extra:
+            for name in self.extra:
+                yield name
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __contains__(self, name):
+        if name in self.fields:
+            return getattr(self, name) is not None
+
+        return bool(self.extra) and name in self.extra
+
+    def __eq__(self, other):
+        return _kind(self) is _kind(other) and self.to_dict() == other.to_dict()
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None
+
+    def __repr__(self):
+        shown = ', '.join('{}={!r}'.format(name, getattr(self, name)) for name in self.fields
+                          if name not in self.text and name not in self.nested and getattr(self, name) is not None)
+
+        return '{}({})'.format(type(self).__name__, shown)
+
+
+class ImageFile(Record):
+    r"""
+    A file of an image, from the :code:`image_files` of an :class:`Image`.
+
+    """
+    __slots__ = ('file_url', 'file_size', 'width', 'height')
+
+    fields = __slots__
+
+
+class VideoFile(Record):
+    r"""
+    A file of a video, from the :code:`video_files` of a :class:`Video`.
+
+    """
+    __slots__ = ('file_url', 'file_size', 'width', 'height', 'format')
+
+    fields = __slots__
+    interned = ('format',)
+
+
+class NewsItem(Record):
+    r"""
+    An item of the :func:`~hubblepy.api.news` listing.
+
+    """
+    __slots__ = ('news_id', 'name', 'url')
+
+    fields = __slots__
+
+
+class NewsRelease(Record):
+    r"""
+    A news release, as returned by :func:`~hubblepy.api.news_release`.
+
+    """
+    __slots__ = ('name', 'news_id', 'url', 'publication', 'mission', '_abstract', '_credits', 'thumbnail',
+                 'thumbnail_retina', 'thumbnail_1x', 'thumbnail_2x', 'keystone_image_1x', 'keystone_image_2x',
+                 'release_images', 'release_videos')
+
+    fields = ('name', 'news_id', 'url', 'publication', 'mission', 'abstract', 'credits', 'thumbnail',
+              'thumbnail_retina', 'thumbnail_1x', 'thumbnail_2x', 'keystone_image_1x', 'keystone_image_2x',
+              'release_images', 'release_videos')
+    interned = ('mission',)
+    text = ('abstract', 'credits')
+
+    abstract = _text('abstract')
+    credits = _text('credits')
+
+
+class Image(Record):
+    r"""
+    An image, as returned by :func:`~hubblepy.api.images`, or an item of the :func:`~hubblepy.api.image_collections`
+    listing (which only sets :code:`id`, :code:`name` and :code:`news_name`).
+
+    """
+    __slots__ = ('id', 'name', '_description', '_credits', 'news_name', 'mission', 'collection', 'image_files')
+
+    fields = ('id', 'name', 'description', 'credits', 'news_name', 'mission', 'collection', 'image_files')
+    interned = ('news_name', 'mission', 'collection')
+    text = ('description', 'credits')
+    nested = {'image_files': ImageFile}
+
+    description = _text('description')
+    credits = _text('credits')
+
+
+class Video(Record):
+    r"""
+    A video, as returned by :func:`~hubblepy.api.videos`, or an item of the :func:`~hubblepy.api.video_collections`
+    listing (which only sets :code:`id`, :code:`name` and :code:`image`).
+
+    """
+    __slots__ = ('id', 'name', '_short_description', '_credits', 'mission', 'collection', 'image', 'image_retina',
+                 'video_files')
+
+    fields = ('id', 'name', 'short_description', 'credits', 'mission', 'collection', 'image', 'image_retina',
+              'video_files')
+    interned = ('mission', 'collection')
+    text = ('short_description', 'credits')
+    nested = {'video_files': VideoFile}
+
+    short_description = _text('short_description')
+    credits = _text('credits')
+
+
+class GlossaryTerm(Record):
+    r"""
+    A glossary term, from :func:`~hubblepy.api.glossary` or :func:`~hubblepy.api.glossary_term` (whose response only
+    holds the definition; the name is then the term as requested).
+
+    """
+    __slots__ = ('name', '_definition')
+
+    fields = ('name', 'definition')
+    text = ('definition',)
+
+    definition = _text('definition')
+
+
+class FeedPost(Record):
+    r"""
+    A post of an external feed, from :func:`~hubblepy.api.rss` or :func:`~hubblepy.api.rss_posts`.
+
+    """
+    __slots__ = ('title', 'pub_date', '_description', 'link', 'guid', 'image', 'image_square', 'image_square_large',
+                 'thumbnail', 'thumbnail_large')
+
+    fields = ('title', 'pub_date', 'description', 'link', 'guid', 'image', 'image_square', 'image_square_large',
+              'thumbnail', 'thumbnail_large')
+    text = ('description',)
+
+    description = _text('description')
+
+
+_endpoint_records = {
+    'news': NewsItem,
+    'news_release': NewsRelease,
+    'image_collections': Image,
+    'images': Image,
+    'video_collections': Video,
+    'videos': Video,
+    'glossary': GlossaryTerm,
+    'glossary_term': GlossaryTerm,
+    'rss': FeedPost,
+    'rss_posts': FeedPost
+}
+
+
+def from_json(obj, endpoint, url=None):
+    r"""
+    Converts a decoded response of an endpoint to records.
+
+    Parameters
+    ----------
+    obj : dict or list
+        The decoded JSON response.
+    endpoint : str
+        The name of the API function the response belongs to, e.g. 'images'.
+    url : str or None
+        The URL of the request, from which the id of an image or video and the name of a glossary term are taken.
+
+    Returns
+    -------
+    Record or list
+        A record, or a list of records for listings. Responses of unknown endpoints are returned as is.
+
+    """
+    cls = _endpoint_records.get(endpoint)
+
+    if cls is None:
+        return obj
+
+    if isinstance(obj, list):
+        return [cls.from_json(item) for item in obj]
+
+    return cls.from_json(obj, **_url_defaults(endpoint, url))
+
+
+def _url_defaults(endpoint, url):
+    r"""
+    Returns the fields of a record that are only part of its URL: the id of an image or video, or the name of a
+    glossary term.
+
+    """
+    defaults = {}
+
+    if url is not None:
+        last = unquote(urlparse(url).path.rstrip('/').rsplit('/', 1)[-1])
+
+        if endpoint in ('images', 'videos') and last.isdigit():
+            defaults['id'] = int(last)
+        elif endpoint == 'glossary_term':
+            defaults['name'] = last
+
+    return defaults
+
+
+def _immutable(self, *args):
+    raise AttributeError('{} is read-only'.format(type(self).__name__))
+
+
+_frozen_types = {}
+
+
+def _frozen_type(cls):
+    r"""
+    Returns the read-only subclass of a record class, which refuses to set or delete attributes. Its records are
+    never modified, so copying them returns the record itself.
+
+    """
+    if cls not in _frozen_types:
+        _frozen_types[cls] = type(cls.__name__, (cls,), {
+            '__slots__': (), '__module__': cls.__module__, '__setattr__': _immutable, '__delattr__': _immutable,
+            '__copy__': lambda self: self, '__deepcopy__': lambda self, memo: self,
+        })
+
+    return _frozen_types[cls]
+
+
+def _kind(obj):
+    # The record class of a record or of its read-only copy.
+    cls = type(obj)
+
+    return cls.__bases__[0] if cls in _frozen_types.values() else cls
+
+
+def _freeze(record, freeze):
+    r"""
+    Returns a read-only copy of a record, with :code:`freeze` applied to the value of each of its slots.
+
+    """
+    if type(record) in _frozen_types.values():
+        return record
+
+    frozen = _frozen_type(type(record)).__new__(_frozen_type(type(record)))
+
+    for cls in type(record).__mro__:
+        for name in cls.__dict__.get('__slots__', ()):
+            object.__setattr__(frozen, name, freeze(getattr(record, name, None)))
+
+    return frozen
+
+
+def _flatten(records):
+    r"""
+    Yields the records of a single record (a dict or :class:`Record`), a list of records, a list of pages or a
+    generator.
+
+    """
+    if isinstance(records, Mapping):
+        records = [records]
+
+    for record in records:
+        if isinstance(record, (list, tuple)):
+            for r in record:
+                yield r
+        else:
+            yield record
@@ -0,0 +1,266 @@
+r"""
+Local full-text search over glossary definitions, news release abstracts and image and video descriptions. The index
+is built incrementally from the results of the API functions and answers ranked keyword and prefix queries without
+any network access.
+
+>>> index = SearchIndex()
+>>> index.add_glossary(hubblepy.glossary(page='all'))
+>>> index.add_news_releases(hubblepy.news_release(['2016-24', '2018-39']))
+>>> index.search('jupiter aur*')
+[{'kind': 'news_release', 'key': '2016-24', 'title': "Hubble Captures Vivid Auroras in Jupiter's Atmosphere",
+  'score': 7.25}, ...]
+>>> index.save('hubble.index')
+>>> index = SearchIndex.load('hubble.index')
+
+"""
+import bisect
+import math
+import pickle
+import re
+import threading
+
+from .records import _flatten
+
+
+_token = re.compile(r'[a-z0-9]+')
+_tag = re.compile(r'<[^>]+>')
+
+stop_words = frozenset(['a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'its', 'of',
+                        'on', 'or', 'that', 'the', 'this', 'to', 'was', 'were', 'with'])
+
+
+def tokenize(text):
+    r"""
+    Splits a text into lower-case alphanumeric terms, leaving out HTML tags and stop words.
+
+    """
+    return [t for t in _token.findall(_tag.sub(' ', text or '').lower()) if t not in stop_words]
+
+
+class SearchIndex(object):
+    r"""
+    Inverted index ranking documents with BM25.
+
+    Documents are identified by their kind ('glossary', 'news_release', 'images' or 'videos') and key (the term name,
+    :code:`news_id` or id). Adding a document that is already indexed replaces it, so the index can be refreshed by
+    adding the latest records again.
+
+    Parameters
+    ----------
+    k1 : float
+        BM25 term frequency saturation. Defaults to 1.2.
+    b : float
+        BM25 document length normalization. Defaults to 0.75.
+
+    """
+    def __init__(self, k1=1.2, b=0.75):
+        self.k1 = k1
+        self.b = b
+
+        self._docs = {}
+        self._postings = {}
+        self._total_length = 0
+        self._vocab = None
+        self._lock = threading.Lock()
+
+    def add(self, kind, key, title, text):
+        r"""
+        Indexes a document. The terms of the title count twice.
+
+        Parameters
+        ----------
+        kind : str
+            The kind of the document.
+        key : str or int
+            The key of the document within its kind.
+        title : str
+            The title of the document, returned with the search results.
+        text : str
+            The body of the document.
+
+        """
+        terms = tokenize(title) * 2 + tokenize(text)
+        counts = {}
+
+        for term in terms:
+            counts[term] = counts.get(term, 0) + 1
+
+        doc = (kind, key)
+
+        with self._lock:
+            self._remove(doc)
+
+            self._docs[doc] = (title, len(terms), tuple(counts))
+            self._total_length += len(terms)
+
+            for term, count in counts.items():
+                if term not in self._postings:
+                    self._postings[term] = {}
+                    self._vocab = None
+
+                self._postings[term][doc] = count
+
+    def remove(self, kind, key):
+        r"""
+        Removes a document from the index, if it is indexed.
+
+        """
+        with self._lock:
+            self._remove((kind, key))
+
+    def add_glossary(self, terms):
+        r"""
+        Indexes glossary terms, as returned by :func:`~hubblepy.api.glossary` (a page, a list of pages or the
+        generator returned for :code:`page='all'`). The terms may be dicts or :class:`~hubblepy.records.Record`
+        objects, as for the other :code:`add_*` methods.
+
+        """
+        for term in _flatten(terms):
+            self.add('glossary', term['name'], term['name'], term.get('definition'))
+
+    def add_news_releases(self, releases):
+        r"""
+        Indexes the names and abstracts of :func:`~hubblepy.api.news_release` records.
+
+        """
+        for release in _flatten(releases):
+            self.add('news_release', release['news_id'], release.get('name'), release.get('abstract'))
+
+    def add_images(self, images, ids=None):
+        r"""
+        Indexes the names and descriptions of :func:`~hubblepy.api.images` records. As the records do not hold their
+        own id, the ids are given in :code:`ids`, in the same order, unless the records have an :code:`id` key.
+
+        """
+        for i, image in enumerate(_flatten(images)):
+            self.add('images', ids[i] if ids is not None else image['id'], image.get('name'),
+                     image.get('description'))
+
+    def add_videos(self, videos, ids=None):
+        r"""
+        Indexes the names and short descriptions of :func:`~hubblepy.api.videos` records, given with their
+        :code:`ids` as for :meth:`add_images`.
+
+        """
+        for i, video in enumerate(_flatten(videos)):
+            self.add('videos', ids[i] if ids is not None else video['id'], video.get('name'),
+                     video.get('short_description'))
+
+    def search(self, query, limit=10, kind=None):
+        r"""
+        Returns the documents best matching a query.
+
+        Parameters
+        ----------
+        query : str
+            The search terms. A term ending in :code:`*` matches every term starting with it, e.g. 'galax*'.
+        limit : int or None
+            The maximum number of results. Defaults to 10; None returns every matching document.
+        kind : str or None
+            If given, only documents of this kind are returned.
+
+        Returns
+        -------
+        list
+            The matching documents, best first, as dicts with the :code:`kind`, :code:`key`, :code:`title` and BM25
+            :code:`score` of each.
+
+        """
+        scores = {}
+
+        with self._lock:
+            n = len(self._docs)
+
+            if n == 0:
+                return []
+
+            average_length = self._total_length / float(n)
+
+            for term in self._expand(query):
+                postings = self._postings[term]
+                idf = math.log(1 + (n - len(postings) + 0.5) / (len(postings) + 0.5))
+
+                for doc, tf in postings.items():
+                    if kind is not None and doc[0] != kind:
+                        continue
+
+                    norm = self.k1 * (1 - self.b + self.b * self._docs[doc][1] / average_length)
+                    scores[doc] = scores.get(doc, 0) + idf * tf * (self.k1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda s: -s[1])[:limit]
+
+            return [{'kind': doc[0], 'key': doc[1], 'title': self._docs[doc][0], 'score': round(score, 4)}
+                    for doc, score in ranked]
+
+    def save(self, path):
+        r"""
+        Writes the index to a file.
+
+        """
+        with self._lock:
+            state = (self.k1, self.b, self._docs, self._postings, self._total_length)
+
+            with open(path, 'wb') as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @classmethod
+    def load(cls, path):
+        r"""
+        Reads an index written by :meth:`save`. Only load files from trusted sources, as they are unpickled.
+
+        Returns
+        -------
+        SearchIndex
+
+        """
+        with open(path, 'rb') as f:
+            k1, b, docs, postings, total_length = pickle.load(f)
+
+        index = cls(k1=k1, b=b)
+        index._docs, index._postings, index._total_length = docs, postings, total_length
+
+        return index
+
+    def _expand(self, query):
+        terms = set()
+
+        for word in query.lower().split():
+            if word.endswith('*'):
+                prefix = ''.join(_token.findall(word))
+
+                if not prefix:
+                    continue
+
+                if self._vocab is None:
+                    self._vocab = sorted(self._postings)
+
+                i = bisect.bisect_left(self._vocab, prefix)
+
+                while i < len(self._vocab) and self._vocab[i].startswith(prefix):
+                    terms.add(self._vocab[i])
+                    i += 1
+            else:
+                terms.update(t for t in tokenize(word) if t in self._postings)
+
+        return terms
+
+    def _remove(self, doc):
+        if doc not in self._docs:
+            return
+
+        _, length, terms = self._docs.pop(doc)
+        self._total_length -= length
+
+        for term in terms:
+            postings = self._postings[term]
+            del postings[doc]
+
+            if not postings:
+                del self._postings[term]
+                self._vocab = None
+
+    def __len__(self):
+        return len(self._docs)
+
+    def __contains__(self, doc):
+        return doc in self._docs
@@ -0,0 +1,145 @@
+r"""
+Selection of the rendition of an image or video that best fits a resolution limit, a format preference or a byte
+budget, so that only the files that are actually used need to be downloaded.
+
+>>> files = select_assets([4229, 4230], 'images', max_width=2000, formats=['jpg', 'png'])
+>>> hubblepy.download.download(files, 'hubble/')
+
+"""
+import os
+from urllib.parse import urlparse
+
+from . import api
+from .download import asset_files
+
+
+_format_aliases = {
+    'jpeg': 'jpg',
+    'tiff': 'tif',
+    'mpeg4': 'mp4'
+}
+
+
+def file_format(file):
+    r"""
+    Returns the format of an image or video file entry as the lower-case extension of its URL, e.g. 'jpg', 'tif',
+    'png', 'pdf' or 'mp4'.
+
+    """
+    ext = os.path.splitext(urlparse(file['file_url']).path)[1].lstrip('.').lower()
+
+    return _format_aliases.get(ext, ext)
+
+
+def select_file(record, max_width=None, max_height=None, formats=None, max_bytes=None):
+    r"""
+    Returns the rendition of an image or video that best fits the given limits.
+
+    Among the files within the limits, the one whose format comes first in :code:`formats` is chosen; ties are broken
+    by the largest resolution and then by the smallest file size.
+
+    Parameters
+    ----------
+    record : dict, Record or list
+        An image or video record as returned by :func:`~hubblepy.api.images` or :func:`~hubblepy.api.videos`, or a
+        list of file entries.
+    max_width : int or None
+        The maximum width, in pixels, of the file. Files without a known width are left out when it is set.
+    max_height : int or None
+        The maximum height, in pixels, of the file. Files without a known height are left out when it is set.
+    formats : list, tuple, str or None
+        The accepted formats (see :func:`file_format`) in order of preference, e.g. :code:`['jpg', 'png']`. If None,
+        every format is accepted.
+    max_bytes : int or None
+        The maximum :code:`file_size` of the file.
+
+    Returns
+    -------
+    dict or None
+        The selected file entry, or None if no file fits the limits.
+
+    Examples
+    --------
+    >>> select_file(hubblepy.images(3814), max_width=2500, formats=['tif', 'jpg'])
+    {'file_size': 1256136,
+     'file_url': 'https://media.stsci.edu/uploads/image_file/image_attachment/29290/STScI-H-spacecraft24-title-2400x3000.jpg',
+     'height': 3000,
+     'width': 2400}
+
+    """
+    if isinstance(formats, str):
+        formats = [formats]
+    if formats is not None:
+        formats = [_format_aliases.get(f.lower(), f.lower()) for f in formats]
+
+    candidates = []
+
+    for file in asset_files(record):
+        fmt = file_format(file)
+        width, height, size = file.get('width'), file.get('height'), file.get('file_size')
+
+        if formats is not None and fmt not in formats:
+            continue
+        if max_width is not None and (width is None or width > max_width):
+            continue
+        if max_height is not None and (height is None or height > max_height):
+            continue
+        if max_bytes is not None and (size is None or size > max_bytes):
+            continue
+
+        rank = formats.index(fmt) if formats is not None else 0
+        candidates.append(((rank, -(width or 0) * (height or 0), size or 0), file))
+
+    if not candidates:
+        return None
+
+    return min(candidates, key=lambda c: c[0])[1]
+
+
+def select_files(records, max_width=None, max_height=None, formats=None, max_bytes=None):
+    r"""
+    Applies :func:`select_file` to each of a list of image or video records.
+
+    Returns
+    -------
+    list
+        The selected file entry of each record, in the same order, with None for records that have no fitting file.
+
+    """
+    return [select_file(record, max_width=max_width, max_height=max_height, formats=formats, max_bytes=max_bytes)
+            for record in records]
+
+
+def select_assets(ids, kind='images', max_width=None, max_height=None, formats=None, max_bytes=None, client=None):
+    r"""
+    Fetches the records of a batch of image or video ids and selects the best fitting file of each with
+    :func:`select_file`.
+
+    Parameters
+    ----------
+    ids : list, tuple, str or int
+        The image or video ids.
+    kind : str, {'images', 'videos'}
+        Whether the ids are image or video ids. Defaults to 'images'.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used to fetch the records. With a client created with
+        :code:`max_workers`, the records are fetched concurrently.
+
+    Returns
+    -------
+    list
+        The selected file entries, in the same order as :code:`ids`, leaving out the records that have no fitting
+        file. The result can be passed to :func:`~hubblepy.download.download` as is.
+
+    """
+    if kind not in ('images', 'videos'):
+        raise ValueError("'kind' must be one of 'images', 'videos'.")
+
+    if not isinstance(ids, (list, tuple)):
+        ids = [ids]
+
+    records = getattr(api, kind)(list(ids), client=client)
+    selected = select_files(records, max_width=max_width, max_height=max_height, formats=formats,
+                            max_bytes=max_bytes)
+
+    return [file for file in selected if file is not None]
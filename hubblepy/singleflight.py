@@ -0,0 +1,122 @@
+r"""
+Coalescing of identical concurrent requests ("single flight"). When several threads or tasks ask for the same
+endpoint with the same parameters while a request for it is in flight, only the first sends the request; the others
+wait for it and share its decoded result.
+
+>>> client = hubblepy.Client(single_flight=True, max_workers=16)
+>>> hubblepy.news_release(['last'] * 100, client=client)  # a single request is sent
+
+"""
+import asyncio
+import copy
+import threading
+from types import MappingProxyType
+
+
+class _Call(object):
+    __slots__ = ('event', 'result', 'error', 'callers')
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.callers = 1
+
+
+class SingleFlight(object):
+    r"""
+    Coalesces identical calls made concurrently from several threads.
+
+    Parameters
+    ----------
+    copy : bool
+        If True (the default), each caller of a shared call gets its own deep copy of the result, so callers may
+        modify what they get. If False, every caller gets the same object. Immutable results are never copied.
+
+    Attributes
+    ----------
+    shared : int
+        The number of calls that waited for a call already in flight instead of making their own.
+
+    """
+    def __init__(self, copy=True):
+        self.copy = copy
+        self.shared = 0
+
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args):
+        r"""
+        Returns :code:`fn(*args)`. If a call with the same :code:`key` is already in flight, waits for it and returns
+        its result (or raises its exception) instead.
+
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                call.callers += 1
+                self.shared += 1
+
+        if leader:
+            try:
+                call.result = fn(*args)
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+
+                call.event.set()
+        else:
+            call.event.wait()
+
+        if call.error is not None:
+            raise call.error
+
+        return _view(call.result, self.copy and call.callers > 1)
+
+
+class AsyncSingleFlight(object):
+    r"""
+    Coalesces identical calls made concurrently from several tasks of an event loop. The shared call runs as a task
+    of its own, so cancelling one of the callers does not cancel it for the others. The parameters are those of
+    :class:`SingleFlight`.
+
+    """
+    def __init__(self, copy=True):
+        self.copy = copy
+        self.shared = 0
+
+        self._calls = {}
+
+    async def do(self, key, fn, *args):
+        r"""
+        Returns :code:`await fn(*args)`, or the result of the identical call already in flight.
+
+        """
+        call = self._calls.get(key)
+
+        if call is None:
+            call = self._calls[key] = [asyncio.ensure_future(fn(*args)), 1]
+            # Registered before any caller awaits the task, so the call is gone by the time its callers resume.
+            call[0].add_done_callback(lambda task: self._calls.pop(key, None))
+        else:
+            call[1] += 1
+            self.shared += 1
+
+        result = await asyncio.shield(call[0])
+
+        return _view(result, self.copy and call[1] > 1)
+
+
+def _view(result, copied):
+    # Text, bytes and the read-only results of a memo with view='readonly' cannot be modified and are not copied.
+    if copied and not isinstance(result, (str, bytes, tuple, MappingProxyType)):
+        return copy.deepcopy(result)
+
+    return result
@@ -0,0 +1,341 @@
+r"""
+Streamed response bodies, returned by the API functions called with :code:`return_type='stream'`, and incremental
+parsing of JSON arrays.
+
+A :class:`Stream` reads the body from the connection as it is consumed instead of loading it whole first, so large
+bodies can be forwarded to storage in fixed-size chunks, and the items of list pages (:func:`~hubblepy.api.news`,
+:func:`~hubblepy.api.glossary`, :func:`~hubblepy.api.image_collections` and the like) are decoded as soon as each one
+has arrived, before the rest of the page.
+
+>>> with hubblepy.news(1, return_type='stream') as stream, open('news-1.json', 'wb') as f:
+...     stream.write_to(f)
+>>> for item in hubblepy.glossary(1, return_type='stream').items():
+...     print(item['name'])
+
+"""
+import re
+
+from .decoders import Decoder
+
+
+default_chunk_size = 64 * 1024
+
+_structure = re.compile(rb'["\[\]{},]')
+_string_end = re.compile(rb'["\\]')
+_whitespace = b' \t\r\n'
+
+
+class Stream(object):
+    r"""
+    The body of a response, read from the connection as it is consumed. A stream can only be read once, and its
+    connection is released once it is read to the end or closed; use it as a context manager to close it early.
+
+    Responses answered from a :class:`~hubblepy.mirror.Mirror` or a cache are already in memory and are served from
+    a view of their content.
+
+    Parameters
+    ----------
+    response : requests.Response
+        The response, sent with :code:`stream=True`.
+    decoder : Decoder or None
+        The decoder used by :meth:`items`. If None, the fastest installed library is used.
+
+    Attributes
+    ----------
+    url : str
+        The URL of the response.
+    status_code : int
+        The status code of the response.
+    headers : dict
+        The headers of the response.
+
+    """
+    def __init__(self, response, decoder=None):
+        self.response = response
+        self.decoder = decoder if decoder is not None else Decoder()
+        self.url = str(response.url)
+        self.status_code = response.status_code
+        self.headers = response.headers
+
+    @property
+    def buffered(self):
+        r"""
+        True if the body is already in memory (e.g. it came from a mirror or a cache).
+
+        """
+        return self.response._content is not False
+
+    def iter_chunks(self, chunk_size=default_chunk_size):
+        r"""
+        Yields the body in chunks of at most :code:`chunk_size` bytes as they are read from the connection, without
+        copying them further. Buffered bodies are yielded as memoryview slices of their content.
+
+        """
+        if self.buffered:
+            view = memoryview(self.response.content)
+
+            for start in range(0, len(view), chunk_size):
+                yield view[start:start + chunk_size]
+
+            return
+
+        try:
+            for chunk in self.response.raw.stream(chunk_size, decode_content=True):
+                yield chunk
+        finally:
+            self.close()
+
+    def __iter__(self):
+        return self.iter_chunks()
+
+    def readinto(self, buffer):
+        r"""
+        Reads the next bytes of the body into a writable buffer (such as a :code:`bytearray` or a memoryview of
+        one), and returns the number of bytes read, 0 at the end of the body.
+
+        """
+        if self.buffered:
+            raise ValueError('readinto is not available for buffered bodies; use iter_chunks or view.')
+
+        self.response.raw.decode_content = True
+        n = self.response.raw.readinto(buffer)
+
+        if not n:
+            self.close()
+
+        return n
+
+    def write_to(self, f, chunk_size=default_chunk_size):
+        r"""
+        Writes the body to a binary file object through one reused buffer of :code:`chunk_size` bytes. Returns the
+        number of bytes written.
+
+        """
+        if self.buffered:
+            return f.write(self.response.content)
+
+        view = memoryview(bytearray(chunk_size))
+        size = 0
+
+        while True:
+            n = self.readinto(view)
+
+            if not n:
+                return size
+
+            f.write(view[:n])
+            size += n
+
+    def view(self):
+        r"""
+        Reads the rest of the body and returns it as a memoryview. When the size of the body is known from its
+        :code:`Content-Length`, it is read straight into one buffer of that size.
+
+        """
+        if self.buffered:
+            return memoryview(self.response.content)
+
+        length = self.headers.get('Content-Length', '')
+
+        if not length.isdigit() or self.headers.get('Content-Encoding', 'identity') != 'identity':
+            buffer = bytearray()
+
+            for chunk in self.iter_chunks():
+                buffer += chunk
+
+            return memoryview(buffer)
+
+        view = memoryview(bytearray(int(length)))
+        size = 0
+
+        while size < len(view):
+            n = self.readinto(view[size:])
+
+            if not n:
+                break
+
+            size += n
+
+        self.close()
+
+        return view[:size]
+
+    def items(self, chunk_size=default_chunk_size):
+        r"""
+        Yields the items of a body holding a JSON array, each decoded as soon as it has arrived. See
+        :class:`ItemParser`.
+
+        """
+        return iter_items(self.iter_chunks(chunk_size), self.decoder)
+
+    def close(self):
+        r"""
+        Closes the response, releasing its connection.
+
+        """
+        self.response.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __repr__(self):
+        return 'Stream({!r}, status_code={})'.format(self.url, self.status_code)
+
+
+class ItemParser(object):
+    r"""
+    Incremental parser of a JSON array. Bytes of the array are given to :meth:`feed` as they arrive, which returns the
+    items completed by them. Only the bytes of the item being received are kept, and each item is decoded once, by the
+    decoder, when its end is found.
+
+    Parameters
+    ----------
+    decoder : str, Decoder or None
+        The JSON library used to decode the items, as for :class:`~hubblepy.client.Client`. If None, the fastest
+        installed library is used.
+
+    Examples
+    --------
+    >>> parser = ItemParser()
+    >>> parser.feed(b'[{"name": "Nebula"}, {"na')
+    [{'name': 'Nebula'}]
+    >>> parser.feed(b'me": "Galaxy"}]')
+    [{'name': 'Galaxy'}]
+    >>> parser.close()
+
+    """
+    def __init__(self, decoder=None):
+        self.decoder = decoder if isinstance(decoder, Decoder) else Decoder(decoder)
+        self.done = False
+        self._buffer = bytearray()
+        self._pos = 0
+        self._start = None
+        self._depth = 0
+        self._string = False
+
+    def feed(self, data):
+        r"""
+        Adds the next bytes of the array and returns the list of the items they complete.
+
+        """
+        buffer = self._buffer
+        buffer += data
+        pos = self._pos
+        items = []
+
+        while not self.done:
+            if self._string:
+                m = _string_end.search(buffer, pos)
+
+                if m is None:
+                    pos = max(pos, len(buffer))
+                    break
+                if buffer[m.start()] == 0x5c:
+                    # Skip the escaped character, which may not have arrived yet.
+                    pos = m.start() + 2
+                else:
+                    self._string = False
+                    pos = m.end()
+
+                continue
+
+            if self._depth == 0:
+                while pos < len(buffer) and buffer[pos] in _whitespace:
+                    pos += 1
+
+                if pos == len(buffer):
+                    break
+                if buffer[pos] != 0x5b:
+                    raise ValueError('Expected a JSON array, got {!r}.'.format(bytes(buffer[pos:pos + 40])))
+
+                pos += 1
+                self._depth = 1
+                self._start = pos
+
+                continue
+
+            m = _structure.search(buffer, pos)
+
+            if m is None:
+                pos = len(buffer)
+                break
+
+            c = buffer[m.start()]
+            pos = m.end()
+
+            if c == 0x22:
+                self._string = True
+            elif c in (0x5b, 0x7b):
+                self._depth += 1
+            elif self._depth > 1:
+                if c in (0x5d, 0x7d):
+                    self._depth -= 1
+            elif c in (0x2c, 0x5d):
+                item = buffer[self._start:m.start()]
+
+                if item and not item.isspace():
+                    items.append(self.decoder.loads(item))
+                elif c == 0x2c:
+                    raise ValueError('Empty item in the JSON array.')
+
+                self._start = pos
+
+                if c == 0x5d:
+                    self.done = True
+            else:
+                raise ValueError('Unbalanced {!r} in the JSON array.'.format(chr(c)))
+
+        # Drop the bytes of the items already decoded.
+        if self.done:
+            del buffer[:]
+            pos = 0
+        elif self._start:
+            del buffer[:self._start]
+            pos -= self._start
+            self._start = 0
+
+        self._pos = pos
+
+        return items
+
+    def close(self):
+        r"""
+        Checks that the whole array was received, raising a ValueError otherwise.
+
+        """
+        if not self.done:
+            raise ValueError('The JSON array is incomplete.')
+
+
+def iter_items(chunks, decoder=None):
+    r"""
+    Yields the items of a JSON array received in chunks, each as soon as the chunks holding it have arrived.
+
+    Parameters
+    ----------
+    chunks : iterable
+        The bytes of the array, in chunks of any size, such as the chunks of a :class:`Stream`.
+    decoder : str, Decoder or None
+        The JSON library used to decode the items. If None, the fastest installed library is used.
+
+    Returns
+    -------
+    generator
+        The decoded items.
+
+    Raises
+    ------
+    ValueError
+        If the chunks do not hold a complete JSON array.
+
+    """
+    parser = ItemParser(decoder)
+
+    for chunk in chunks:
+        for item in parser.feed(chunk):
+            yield item
+
+    parser.close()
@@ -0,0 +1,186 @@
+r"""
+Incremental synchronization of news releases and RSS feeds. The newest item seen by the last run (the high-water
+mark) is kept in a small JSON state file; later runs page through the newest items only until they reach a known one,
+so only new items are downloaded.
+
+>>> new_releases = sync_news('hubblepy-sync.json')
+>>> new_posts = sync_rss('esa_feed', 'hubblepy-sync.json')
+
+"""
+import json
+import os
+from datetime import datetime
+
+from . import api
+
+
+seen_size = 100
+
+
+class SyncState(object):
+    r"""
+    High-water marks of the synced news releases and feeds, persisted as a JSON file.
+
+    Parameters
+    ----------
+    path : str or None
+        The path of the state file. It is read if it exists and written by :meth:`save`. If None, the state is only
+        kept in memory.
+
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.marks = {}
+
+        if path is not None and os.path.exists(path):
+            with open(path) as f:
+                self.marks = json.load(f)
+
+    def get(self, key):
+        r"""
+        Returns the mark stored under :code:`key` (e.g. 'news' or 'rss/esa_feed'), or None.
+
+        """
+        return self.marks.get(key)
+
+    def set(self, key, mark):
+        r"""
+        Stores a mark under :code:`key`. The state file is only updated by :meth:`save`.
+
+        """
+        self.marks[key] = mark
+
+    def save(self):
+        r"""
+        Writes the marks to the state file. The file is replaced atomically, so an interrupted run never leaves a
+        partially written state behind.
+
+        """
+        if self.path is None:
+            return
+
+        tmp = self.path + '.tmp'
+
+        with open(tmp, 'w') as f:
+            json.dump(self.marks, f, indent=2, sort_keys=True)
+
+        os.replace(tmp, self.path)
+
+
+def sync_news(state, client=None, max_pages=None):
+    r"""
+    Returns the news releases published since the last sync and moves the high-water mark to the newest one.
+
+    The pages of :func:`~hubblepy.api.news` are walked from the newest item and walking stops at the first
+    :code:`news_id` recorded by an earlier run. The full :func:`~hubblepy.api.news_release` records are then fetched
+    for the new ids only.
+
+    Parameters
+    ----------
+    state : SyncState or str
+        The sync state, or the path of its file. The state is saved once the new releases have been fetched.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used for the requests. With a client created with :code:`max_workers`,
+        the new releases are fetched concurrently.
+    max_pages : int or None
+        The maximum number of :code:`news` pages to walk. Useful to bound the first run, which has no mark to stop
+        at. If None, every page is walked if needed.
+
+    Returns
+    -------
+    list
+        The :code:`news_release` records of the new releases, newest first.
+
+    """
+    if not isinstance(state, SyncState):
+        state = SyncState(state)
+
+    mark = state.get('news') or {}
+    seen = set(mark.get('seen', []))
+
+    new_ids = []
+
+    for i, item in enumerate(api.news(page='all', client=client)):
+        if item['news_id'] in seen or (max_pages is not None and i >= max_pages * api.page_size):
+            break
+
+        new_ids.append(item['news_id'])
+
+    if not new_ids:
+        return []
+
+    releases = api.news_release(new_ids, client=client)
+
+    state.set('news', {'news_id': new_ids[0],
+                       'publication': releases[0].get('publication'),
+                       'seen': (new_ids + mark.get('seen', []))[:seen_size]})
+    state.save()
+
+    return releases
+
+
+def sync_rss(feed_name, state, client=None, max_pages=None):
+    r"""
+    Returns the posts of an RSS feed published since the last sync and moves the high-water mark to the newest one.
+
+    The pages of :func:`~hubblepy.api.rss` are walked from the newest post and walking stops at the first post
+    published before the mark's :code:`pub_date`, or at a post recorded by an earlier run.
+
+    Parameters
+    ----------
+    feed_name : str
+        The name of the RSS feed.
+    state : SyncState or str
+        The sync state, or the path of its file. The mark of the feed is stored under 'rss/<feed_name>'.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` used for the requests.
+    max_pages : int or None
+        The maximum number of pages to walk. If None, every page is walked if needed.
+
+    Returns
+    -------
+    list
+        The new posts, newest first.
+
+    """
+    if not isinstance(state, SyncState):
+        state = SyncState(state)
+
+    key = 'rss/' + feed_name
+    mark = state.get(key) or {}
+    seen = set(mark.get('seen', []))
+    since = _parse_date(mark['pub_date']) if mark.get('pub_date') else None
+
+    posts = []
+
+    for i, post in enumerate(api.rss(feed_name, page='all', sort='desc', client=client)):
+        if max_pages is not None and i >= max_pages * api.page_size:
+            break
+        if _post_key(post) in seen or (since is not None and _parse_date(post['pub_date']) < since):
+            break
+
+        posts.append(post)
+
+    if not posts:
+        return []
+
+    state.set(key, {'pub_date': posts[0]['pub_date'],
+                    'seen': ([_post_key(p) for p in posts] + mark.get('seen', []))[:seen_size]})
+    state.save()
+
+    return posts
+
+
+def _post_key(post):
+    return post.get('guid') or post.get('link') or post['pub_date']
+
+
+def _parse_date(date):
+    r"""
+    Parses a publication date such as '2018-09-13T11:00:00.000-04:00'.
+
+    """
+    if date[-3] == ':':
+        date = date[:-3] + date[-2:]
+
+    return datetime.strptime(date, '%Y-%m-%dT%H:%M:%S.%f%z')
@@ -0,0 +1,782 @@
+r"""
+Local stub of the HubbleSite API for testing and load testing applications built on hubblepy without sending requests
+to hubblesite.org. A :class:`StubServer` serves the v3 routes used by the :mod:`hubblepy.api` functions with data
+generated deterministically from seed fixtures. The number of pages, the latency, the rate of errors and the size of
+the payloads can be configured.
+
+>>> with StubServer(pages=10, latency=(0.01, 0.05), error_rate=0.05) as server:
+...     client = server.client(max_workers=16, retry=5)
+...     releases = list(hubblepy.news(page='all', client=client))
+...     server.requests
+
+The server also runs on its own, for services in other processes (which reach it as an HTTP proxy for
+:code:`http://hubblesite.org`):
+
+    python -m hubblepy.testing --port 8000 --pages 10 --latency 20
+
+:class:`HTTP2StubServer` serves the same data over HTTP/2, for testing and benchmarking the HTTP/2 transport of
+:mod:`hubblepy.transport`.
+
+Responses depend only on the request and the :code:`seed`: the same URL always gets the same body, and whether its
+n-th request fails does not depend on the order in which concurrent requests arrive.
+
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+import requests
+
+try:
+    import h2.config
+    import h2.connection
+    import h2.events
+    import h2.exceptions
+except ImportError:  # pragma: no cover
+    h2 = None
+
+from .api import page_size
+from .client import Client
+from .transport import HTTP2Adapter
+
+
+#: The fixtures the data is generated from.
+fixtures = {
+    'missions': ('hubble', 'james_webb', 'spitzer', 'chandra'),
+    'image_collections': ('all', 'news', 'printshop', 'stsci_gallery', 'wallpaper', 'spacecraft'),
+    'video_collections': ('all', 'news', 'science', 'shuttle', 'hubble_launch'),
+    'feeds': ('esa_feed', 'jwst_feed', 'hubble_feed'),
+    'subjects': ('Galaxy Cluster', 'Spiral Galaxy', 'Planetary Nebula', 'Star-Forming Region', 'Supernova Remnant',
+                 'Globular Cluster', 'Quasar', 'Exoplanet Atmosphere', 'Brown Dwarf', 'Dark Matter Map'),
+    'catalogues': ('Abell', 'NGC', 'Messier', 'IC', 'Hickson', 'MACS'),
+    'words': ('astronomers', 'galaxy', 'light', 'telescope', 'observations', 'stars', 'dust', 'gas', 'universe',
+              'billion', 'years', 'infrared', 'ultraviolet', 'image', 'cluster', 'massive', 'distant', 'survey',
+              'black', 'hole', 'nebula', 'spectrum', 'bright', 'young', 'formation', 'gravitational', 'lensing',
+              'the', 'of', 'and', 'in', 'a', 'with', 'from', 'by', 'across', 'near', 'its'),
+    'image_formats': (('png', 878, 1000), ('png', 1757, 2000), ('jpg', 3000, 3414), ('tif', 7819, 8897)),
+    'video_formats': (('MPEG-4 (H.264)', 'mp4', 1280, 720), ('MPEG-4 (H.264)', 'mp4', 1920, 1080),
+                      ('Quicktime', 'mov', 640, 480)),
+}
+
+
+class StubServer(object):
+    r"""
+    HTTP server answering the routes of the HubbleSite API with generated data, on a background thread.
+
+    Parameters
+    ----------
+    pages : int
+        The number of pages of every listing (news, image and video collections, glossary and feeds). The last page is
+        half full, so the API functions stop there. Defaults to 4.
+    latency : float, tuple or None
+        Seconds to wait before answering each request, or a :code:`(min, max)` tuple to wait a (deterministic)
+        random time between. Defaults to 0.
+    error_rate : float
+        The fraction of requests answered with :code:`error_status` instead. Defaults to 0.
+    error_status : int
+        The status of the failed requests. Defaults to 503.
+    retry_after : float or None
+        If set, failed requests carry a :code:`Retry-After` header of this many seconds.
+    payload_size : int
+        The approximate length, in characters, of the long text fields (abstracts, descriptions and definitions).
+        Defaults to 500.
+    seed : int
+        Seed of the generated data, latencies and errors. Defaults to 0.
+    port : int
+        The port to listen on. Defaults to 0, any free port.
+    host : str
+        The address to listen on. Defaults to '127.0.0.1'.
+
+    Attributes
+    ----------
+    url : str
+        The URL of the server, once started.
+    requests : int
+        The number of requests received.
+    errors : int
+        The number of requests answered with :code:`error_status`.
+    counts : dict
+        Maps the path and query of every URL requested to the number of times it was requested.
+
+    """
+    def __init__(self, pages=4, latency=0, error_rate=0, error_status=503, retry_after=None, payload_size=500,
+                 seed=0, port=0, host='127.0.0.1'):
+        self.pages = pages
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.payload_size = payload_size
+        self.seed = seed
+        self.host = host
+        self.port = port
+
+        self.url = None
+        self.requests = 0
+        self.errors = 0
+        self.counts = {}
+
+        self._bodies = {}
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    def start(self):
+        r"""
+        Starts serving on a background thread. Returns the server.
+
+        """
+        self._server = self._make_server()
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+        return self
+
+    def serve_forever(self):
+        r"""
+        Serves on the calling thread until interrupted.
+
+        """
+        self._server = self._make_server()
+
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+
+    def stop(self):
+        r"""
+        Stops the server.
+
+        """
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+
+        self._server = None
+        self._thread = None
+
+    def _make_server(self):
+        server = ThreadingHTTPServer((self.host, self.port), type('Handler', (_Handler,), {'stub': self}))
+        server.daemon_threads = True
+        self.url = 'http://{}:{}'.format(*server.server_address[:2])
+
+        return server
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def session(self):
+        r"""
+        Returns a :code:`requests.Session` sending the requests for :code:`http://hubblesite.org` to the server.
+
+        """
+        session = requests.Session()
+        session.trust_env = False
+        session.proxies = {'http': self.url}
+
+        return session
+
+    def client(self, **kwargs):
+        r"""
+        Returns a :class:`~hubblepy.client.Client` sending its requests to the server. Keyword arguments are passed on
+        to the client.
+
+        """
+        return Client(session=self.session(), **kwargs)
+
+    def async_client(self, **kwargs):
+        r"""
+        Returns an :class:`~hubblepy.aio.AsyncClient` sending its requests to the server. Keyword arguments are passed
+        on to the client. Requires :code:`httpx`.
+
+        """
+        import httpx
+        from .aio import AsyncClient
+
+        limits = httpx.Limits(max_connections=kwargs.pop('max_connections', 10))
+
+        return AsyncClient(client=httpx.AsyncClient(proxy=self.url, trust_env=False, limits=limits), **kwargs)
+
+    def respond(self, path, query):
+        r"""
+        Returns the status, headers and body of the response to a request. Errors and latency are applied here, so
+        subclasses overriding :meth:`body` keep them.
+
+        """
+        key, rng, delay = self._receive(path, query)
+
+        if delay:
+            time.sleep(delay)
+
+        return self._response(key, path, query, rng)
+
+    def _receive(self, path, query):
+        r"""
+        Counts a request. Returns its key, the random generator of its errors and the latency to apply.
+
+        """
+        key = path + ('?' + query if query else '')
+
+        with self._lock:
+            self.requests += 1
+            n = self.counts[key] = self.counts.get(key, 0) + 1
+
+        rng = random.Random('{}|{}|{}'.format(self.seed, key, n))
+
+        return key, rng, rng.uniform(*self.latency) if isinstance(self.latency, tuple) else self.latency
+
+    def _response(self, key, path, query, rng):
+        if self.error_rate and rng.random() < self.error_rate:
+            with self._lock:
+                self.errors += 1
+
+            headers = {'Retry-After': str(self.retry_after)} if self.retry_after is not None else {}
+
+            return self.error_status, headers, b'{"error": "injected error"}'
+
+        body = self._bodies.get(key)
+
+        if body is None:
+            result = self.body(path, dict(parse_qsl(query)))
+            body = json.dumps(result).encode('utf-8') if result is not None else None
+
+            # Bounded, as load tests may request any number of distinct ids.
+            if len(self._bodies) < 10000:
+                self._bodies[key] = body
+
+        if body is None:
+            return 404, {}, b'{"error": "not found"}'
+
+        return 200, {'ETag': '"{}"'.format(hashlib.md5(body).hexdigest())}, body
+
+    def body(self, path, params):
+        r"""
+        Returns the JSON data answering a request for a path of the API with the given query parameters, or None for
+        a 404 response.
+
+        """
+        route = [unquote(part) for part in path.split('/api/v3/', 1)[-1].strip('/').split('/')]
+        page = _int(params.get('page', 1))
+
+        if page is None:
+            return None
+
+        name, args = route[0], route[1:]
+
+        if name == 'news' and not args:
+            return self._page([self._news_item(i) for i in self._range()], page)
+        if name == 'news_release' and len(args) == 1:
+            return self._news_release(args[0])
+        if name == 'images' and len(args) == 1 and args[0] in fixtures['image_collections']:
+            return self._page([self._image_item(self._id(args[0], i)) for i in self._range()], page)
+        if name == 'image' and len(args) == 1 and _int(args[0]) is not None:
+            return self._image(int(args[0]))
+        if name == 'videos' and len(args) == 1 and args[0] in fixtures['video_collections']:
+            return self._page([self._video_item(self._id(args[0], i)) for i in self._range()], page)
+        if name == 'video' and len(args) == 1 and _int(args[0]) is not None:
+            return self._video(int(args[0]))
+        if name == 'glossary' and not args:
+            return self._page([self._term(i) for i in self._range()], page)
+        if name == 'glossary' and len(args) == 1:
+            return {'definition': self._text('glossary/' + args[0].lower())}
+        if name == 'external_feed' and args and args[0] in fixtures['feeds']:
+            if len(args) == 2:
+                return self._post(args[0], args[1])
+
+            dates = [self._pub_date(i) for i in self._range()]
+            posts = [self._post(args[0], date) for date in (reversed(dates) if params.get('sort') == 'pub_date'
+                                                            else dates)]
+
+            return self._page(posts, page)
+
+        return None
+
+    def _range(self):
+        return range((self.pages - 1) * page_size + page_size // 2)
+
+    def _page(self, items, page):
+        return items[(page - 1) * page_size:page * page_size]
+
+    def _id(self, collection, i):
+        collections = fixtures['image_collections'] + fixtures['video_collections']
+
+        return 1000 + i * len(collections) + collections.index(collection)
+
+    def _rng(self, key):
+        return random.Random('{}|{}'.format(self.seed, key))
+
+    def _text(self, key, size=None):
+        rng = self._rng(key)
+        words = fixtures['words']
+        text = []
+        length = 0
+
+        while length < (size or self.payload_size):
+            word = rng.choice(words)
+            text.append(word)
+            length += len(word) + 1
+
+        return ' '.join(text).capitalize() + '.'
+
+    def _title(self, key):
+        rng = self._rng(key)
+
+        return '{} {} {}'.format(rng.choice(fixtures['subjects']), rng.choice(fixtures['catalogues']),
+                                 rng.randint(1, 9999))
+
+    def _news_id(self, i):
+        # Newest first, as in the API: item 0 is the last release.
+        n = len(self._range()) - 1 - i
+
+        return '{}-{:02d}'.format(1990 + n // 50, n % 50 + 1)
+
+    def _news_item(self, i):
+        news_id = self._news_id(i)
+
+        return {'news_id': news_id, 'name': self._title('news/' + news_id),
+                'url': 'http://hubblesite.org/news_release/news/' + news_id}
+
+    def _news_release(self, which):
+        ids = [self._news_id(i) for i in self._range()]
+
+        if which == 'first':
+            which = ids[-1]
+        elif which == 'last':
+            which = ids[0]
+        elif which not in ids:
+            return None
+
+        rng = self._rng('news_release/' + which)
+        thumbnail = 'https://media.stsci.edu/uploads/story/thumbnail/{}/'.format(which)
+
+        release = dict(self._news_item(ids.index(which)), **{
+            'publication': '{}-{:02d}-{:02d}T10:00:00.000-04:00'.format(which[:4], rng.randint(1, 12),
+                                                                       rng.randint(1, 28)),
+            'mission': rng.choice(fixtures['missions']),
+            'abstract': self._text('abstract/' + which),
+            'credits': 'Credit: NASA, ESA and STScI',
+            'thumbnail': thumbnail + 'low_thumb.jpg',
+            'thumbnail_retina': thumbnail + 'thumb.jpg',
+            'thumbnail_1x': thumbnail + 'low_small.jpg',
+            'thumbnail_2x': thumbnail + 'small.jpg',
+            'keystone_image_1x': thumbnail + 'low_keystone.jpg',
+            'keystone_image_2x': thumbnail + 'keystone.jpg',
+            'release_images': sorted(rng.sample(range(1000, 1000 + 50 * page_size), rng.randint(1, 6))),
+            'release_videos': sorted(rng.sample(range(1000, 1000 + 50 * page_size), rng.randint(0, 2))),
+        })
+
+        return release
+
+    def _image_item(self, image_id):
+        return {'id': image_id, 'name': self._title('image/{}'.format(image_id)),
+                'news_name': self._rng('image/{}'.format(image_id)).choice('abcdefgh')}
+
+    def _image(self, image_id):
+        rng = self._rng('image/{}/files'.format(image_id))
+        files = []
+
+        for extension, width, height in fixtures['image_formats']:
+            files.append({
+                'file_url': 'https://media.stsci.edu/uploads/image_file/image_attachment/{}/{}x{}.{}'.format(
+                    image_id, width, height, extension),
+                'file_size': width * height * rng.randint(1, 4),
+                'width': width,
+                'height': height,
+            })
+
+        return dict(self._image_item(image_id), **{
+            'description': self._text('description/image/{}'.format(image_id)),
+            'credits': 'NASA, ESA and STScI',
+            'mission': rng.choice(fixtures['missions']),
+            'collection': rng.choice(fixtures['image_collections']),
+            'image_files': files,
+        })
+
+    def _video_item(self, video_id):
+        image = 'https://media.stsci.edu/uploads/video/image_attachment/{}/'.format(video_id)
+
+        return {'id': video_id, 'name': self._title('video/{}'.format(video_id)), 'image': image + 'low_thumb.png'}
+
+    def _video(self, video_id):
+        rng = self._rng('video/{}/files'.format(video_id))
+        item = self._video_item(video_id)
+        files = []
+
+        for video_format, extension, width, height in fixtures['video_formats']:
+            files.append({
+                'file_url': 'https://media.stsci.edu/uploads/video_file/video_attachment/{}/{}x{}.{}'.format(
+                    video_id, width, height, extension),
+                'file_size': width * height * rng.randint(20, 200),
+                'width': width,
+                'height': height,
+                'format': video_format,
+            })
+
+        return {
+            'name': item['name'],
+            'short_description': self._text('description/video/{}'.format(video_id)),
+            'credits': 'NASA, ESA and STScI',
+            'mission': rng.choice(fixtures['missions']),
+            'collection': rng.choice(fixtures['video_collections']),
+            'image': item['image'],
+            'image_retina': item['image'].replace('low_', ''),
+            'video_files': files,
+        }
+
+    def _term(self, i):
+        name = '{} {}'.format(self._rng('term/{}'.format(i)).choice(fixtures['words']).capitalize(), i)
+
+        return {'name': name, 'definition': self._text('glossary/' + name.lower())}
+
+    def _pub_date(self, i):
+        # Newest first, one post a week, in US Eastern daylight time as in the API.
+        t = time.gmtime(1577880000 - 4 * 3600 - i * 7 * 86400)
+
+        return time.strftime('%Y-%m-%dT%H:%M:%S.000-04:00', t)
+
+    def _post(self, feed, pub_date):
+        key = '{}/{}'.format(feed, pub_date)
+        slug = hashlib.md5(key.encode('utf-8')).hexdigest()[:8]
+        image = 'https://media.stsci.edu/uploads/feed_post/thumbnail/{}/'.format(slug)
+
+        return {
+            'title': self._title('post/' + key),
+            'pub_date': pub_date,
+            'description': self._text('post/' + key),
+            'link': 'http://www.spacetelescope.org/news/{}/'.format(slug),
+            'guid': 'http://www.spacetelescope.org/news/{}/'.format(slug),
+            'image': image + 'image.jpg',
+            'image_square': image + 'square_low.jpg',
+            'image_square_large': image + 'square.jpg',
+            'thumbnail': image + 'thumb_low.jpg',
+            'thumbnail_large': image + 'thumb.jpg',
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # Headers and body are written separately; without this, delayed ACKs add ~40 ms to every response.
+    disable_nagle_algorithm = True
+
+    stub = None
+
+    def do_GET(self):
+        # Requests sent through a proxy carry the absolute URL; direct requests only its path.
+        parts = urlsplit(self.path)
+        status, headers, body = self.stub.respond(parts.path, parts.query)
+
+        if status == 200 and self.headers.get('If-None-Match') == headers['ETag']:
+            status, body = 304, b''
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+
+        for name, value in headers.items():
+            self.send_header(name, value)
+
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class HTTP2StubServer(StubServer):
+    r"""
+    A :class:`StubServer` speaking HTTP/2 without negotiation (h2c), on an :mod:`asyncio` event loop of a background
+    thread. Concurrent requests are received as streams of one connection and answered as tasks of the loop, so their
+    latencies overlap. Requires :code:`h2`.
+
+    Clients reach the server directly rather than as a proxy: :meth:`client` returns a
+    :class:`~hubblepy.client.Client` whose :class:`~hubblepy.transport.HTTP2Adapter` connects to the server for
+    every URL, and :meth:`async_client` an :class:`~hubblepy.aio.AsyncClient` whose :code:`httpx` client does the
+    same.
+
+    The parameters are those of :class:`StubServer`.
+
+    Attributes
+    ----------
+    connections : int
+        The number of connections accepted.
+
+    """
+    def __init__(self, pages=4, latency=0, error_rate=0, error_status=503, retry_after=None, payload_size=500,
+                 seed=0, port=0, host='127.0.0.1'):
+        if h2 is None:
+            raise ImportError('HTTP2StubServer requires h2. Install it with: pip install hubblepy[http2]')
+
+        super(HTTP2StubServer, self).__init__(pages=pages, latency=latency, error_rate=error_rate,
+                                              error_status=error_status, retry_after=retry_after,
+                                              payload_size=payload_size, seed=seed, port=port, host=host)
+
+        self.connections = 0
+
+        self._loop = None
+        self._writers = set()
+
+    def start(self):
+        r"""
+        Starts serving on a background thread. Returns the server.
+
+        """
+        started = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(started,))
+        self._thread.daemon = True
+        self._thread.start()
+        started.wait()
+
+        return self
+
+    def serve_forever(self):
+        r"""
+        Serves on the calling thread until interrupted.
+
+        """
+        self._run(threading.Event())
+
+    def stop(self):
+        r"""
+        Stops the server.
+
+        """
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+        self._thread = None
+
+    def _run(self, started):
+        self._loop = asyncio.new_event_loop()
+        server = self._loop.run_until_complete(asyncio.start_server(self._serve, self.host, self.port))
+        self.url = 'http://{}:{}'.format(*server.sockets[0].getsockname()[:2])
+        started.set()
+
+        try:
+            self._loop.run_forever()
+        finally:
+            server.close()
+
+            # Closing the connections ends their handlers, which cancel the requests still being answered.
+            for writer in list(self._writers):
+                writer.close()
+
+            tasks = asyncio.all_tasks(self._loop)
+
+            if tasks:
+                self._loop.run_until_complete(asyncio.wait(tasks))
+
+            self._loop.close()
+            self._loop = None
+
+    def session(self):
+        r"""
+        Returns a :code:`requests.Session` sending every request to the server over HTTP/2.
+
+        """
+        session = requests.Session()
+        session.trust_env = False
+        session.mount('http://', self.adapter())
+
+        return session
+
+    def adapter(self, **kwargs):
+        r"""
+        Returns an :class:`~hubblepy.transport.HTTP2Adapter` connecting to the server. Keyword arguments are passed on
+        to the adapter.
+
+        """
+        host, port = self.url.rsplit('//', 1)[1].rsplit(':', 1)
+
+        return HTTP2Adapter(prior_knowledge=True, connect_to=(host, int(port)), **kwargs)
+
+    def client(self, **kwargs):
+        r"""
+        Returns a :class:`~hubblepy.client.Client` sending its requests to the server over HTTP/2. Keyword arguments
+        are passed on to the client.
+
+        """
+        session = requests.Session()
+        session.trust_env = False
+
+        return Client(session=session, http2=self.adapter(max_connections=kwargs.get('pool_maxsize', 10)), **kwargs)
+
+    def async_client(self, **kwargs):
+        r"""
+        Returns an :class:`~hubblepy.aio.AsyncClient` sending its requests to the server over HTTP/2. Keyword arguments
+        are passed on to the client. Requires :code:`httpx`.
+
+        """
+        import httpx
+        from .aio import AsyncClient
+
+        host, port = self.url.rsplit('//', 1)[1].rsplit(':', 1)
+        limits = httpx.Limits(max_connections=kwargs.pop('max_connections', 10))
+        transport = httpx.AsyncHTTPTransport(http1=False, http2=True, limits=limits)
+
+        return AsyncClient(client=httpx.AsyncClient(transport=_ConnectTo(transport, host, int(port)), trust_env=False),
+                           **kwargs)
+
+    async def _serve(self, reader, writer):
+        with self._lock:
+            self.connections += 1
+
+        self._writers.add(writer)
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding='utf-8'))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+
+        # Notified when the peer opens the flow control window, for the streams waiting to send data.
+        window = asyncio.Condition()
+        tasks = {}
+
+        try:
+            while True:
+                data = await reader.read(65536)
+
+                if not data:
+                    break
+
+                try:
+                    events = conn.receive_data(data)
+                except h2.exceptions.ProtocolError:
+                    writer.write(conn.data_to_send())
+                    break
+
+                for event in events:
+                    if isinstance(event, h2.events.RequestReceived):
+                        tasks[event.stream_id] = self._loop.create_task(
+                            self._answer(conn, writer, window, event.stream_id, dict(event.headers)))
+                    elif isinstance(event, h2.events.WindowUpdated):
+                        async with window:
+                            window.notify_all()
+                    elif isinstance(event, h2.events.StreamReset) and event.stream_id in tasks:
+                        tasks.pop(event.stream_id).cancel()
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
+
+                writer.write(conn.data_to_send())
+
+        except ConnectionError:
+            pass
+
+        finally:
+            for task in tasks.values():
+                task.cancel()
+
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _answer(self, conn, writer, window, stream_id, headers):
+        parts = urlsplit(headers[':path'])
+        key, rng, delay = self._receive(parts.path, parts.query)
+
+        if delay:
+            await asyncio.sleep(delay)
+
+        status, extra, body = self._response(key, parts.path, parts.query, rng)
+
+        if status == 200 and headers.get('if-none-match') == extra['ETag']:
+            status, body = 304, b''
+
+        response_headers = [(':status', str(status)), ('content-type', 'application/json; charset=utf-8'),
+                            ('content-length', str(len(body)))]
+        response_headers += [(name.lower(), value) for name, value in extra.items()]
+
+        try:
+            conn.send_headers(stream_id, response_headers, end_stream=not body)
+            writer.write(conn.data_to_send())
+
+            while body:
+                size = min(conn.local_flow_control_window(stream_id), conn.max_outbound_frame_size, len(body))
+
+                if size <= 0:
+                    async with window:
+                        await window.wait()
+
+                    continue
+
+                conn.send_data(stream_id, body[:size], end_stream=size == len(body))
+                writer.write(conn.data_to_send())
+                body = body[size:]
+
+        except h2.exceptions.StreamClosedError:
+            pass
+
+
+class _ConnectTo(object):
+    r"""
+    Transport of an :code:`httpx.AsyncClient` sending every request to one address. The host of the URL is still sent
+    as the :code:`Host` (or :code:`:authority`) of the request.
+
+    """
+    def __init__(self, transport, host, port):
+        self.transport = transport
+        self.host = host
+        self.port = port
+
+    async def handle_async_request(self, request):
+        request.url = request.url.copy_with(host=self.host, port=self.port)
+
+        return await self.transport.handle_async_request(request)
+
+    async def __aenter__(self):
+        await self.transport.__aenter__()
+
+        return self
+
+    async def __aexit__(self, *args):
+        await self.transport.__aexit__(*args)
+
+    async def aclose(self):
+        await self.transport.aclose()
+
+
+def _int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Local stub of the HubbleSite API.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--pages', type=int, default=4, help='pages of every listing')
+    parser.add_argument('--latency', type=float, default=0, help='milliseconds added to every response')
+    parser.add_argument('--error-rate', type=float, default=0, help='fraction of requests failing')
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--payload-size', type=int, default=500, help='characters of the long text fields')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--http2', action='store_true', help='serve HTTP/2 without negotiation (h2c)')
+    args = parser.parse_args(args)
+
+    server = (HTTP2StubServer if args.http2 else StubServer)(pages=args.pages, latency=args.latency / 1000,
+                                                             error_rate=args.error_rate,
+                                                             error_status=args.error_status,
+                                                             payload_size=args.payload_size, seed=args.seed,
+                                                             port=args.port, host=args.host)
+
+    print('Serving the HubbleSite API stub on http://{}:{}'.format(args.host, args.port))
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
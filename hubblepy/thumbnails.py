@@ -0,0 +1,348 @@
+r"""
+Prefetching of the thumbnail and keystone images linked from API results into a local, content-addressed cache, so
+pages showing them can be served from local files instead of fetching them from the origin on demand.
+
+The URLs are collected from the :code:`thumbnail`, :code:`keystone_image_*`, :code:`image` and similar fields of
+:func:`~hubblepy.api.news_release`, :func:`~hubblepy.api.rss` and :func:`~hubblepy.api.video_collections` results and
+downloaded concurrently. Each file is stored once under the SHA-256 of its content, whichever URLs it was fetched
+from, and the least recently used files are evicted when the cache grows over its size budget.
+
+>>> cache = ThumbnailCache('thumbnails/', max_bytes=2 * 1024 ** 3)
+>>> paths = cache.prefetch(hubblepy.news_release(['2016-24', '2016-25']), max_workers=8)
+>>> cache.path('https://media.stsci.edu/uploads/story/thumbnail/3700/low_STSCI-H-p1624a-t-400x400.png')
+'thumbnails/objects/5e/5e0b...7c.png'
+
+"""
+import contextvars
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlparse
+
+from .client import get_default_client
+from .exceptions import BatchError
+from .records import _flatten
+from .singleflight import SingleFlight
+from .timeouts import request_timeout
+
+
+#: The fields of news releases, feed posts and video listings holding the URL of an image shown with them.
+thumbnail_fields = ('thumbnail', 'thumbnail_retina', 'thumbnail_1x', 'thumbnail_2x', 'thumbnail_large',
+                    'keystone_image_1x', 'keystone_image_2x', 'image', 'image_retina', 'image_square',
+                    'image_square_large')
+
+
+def thumbnail_urls(records, fields=thumbnail_fields):
+    r"""
+    Returns the image URLs found in the given fields of API results, without duplicates, in the order they appear.
+
+    Parameters
+    ----------
+    records : dict, Record, list or generator
+        A result of :func:`~hubblepy.api.news_release`, :func:`~hubblepy.api.rss`,
+        :func:`~hubblepy.api.video_collections` or a similar function (as JSON or records), a list of them, a list of
+        pages or the generator returned for :code:`page='all'`.
+    fields : tuple
+        The fields holding image URLs. Defaults to :code:`hubblepy.thumbnails.thumbnail_fields`.
+
+    Returns
+    -------
+    list
+        The URLs.
+
+    """
+    urls = {}
+
+    for record in _flatten(records):
+        for field in fields:
+            url = record.get(field)
+
+            if isinstance(url, str) and url.startswith(('http://', 'https://')):
+                urls[url] = None
+
+    return list(urls)
+
+
+class ThumbnailCache(object):
+    r"""
+    Content-addressed cache of downloaded images on disk, with a size budget.
+
+    Files are stored under :code:`objects/` in the cache directory, named after the SHA-256 of their content (with the
+    extension of the first URL they were fetched from), and a sqlite index maps every URL to its file. A file fetched
+    from several URLs, or fetched again after its URL changed, is stored once.
+
+    Parameters
+    ----------
+    directory : str
+        The cache directory. It is created if it does not exist.
+    max_bytes : int or None
+        The size budget of the cached files, in bytes. Least recently used files are evicted after each
+        :meth:`prefetch` and :meth:`fetch` to stay under it. If None, nothing is evicted. Defaults to 1 GiB.
+    client : Client or None
+        The :class:`~hubblepy.client.Client` whose session and timeout are used for the downloads. If None, the default
+        client is used.
+
+    Attributes
+    ----------
+    downloads : int
+        The number of files downloaded.
+    duplicates : int
+        The number of downloaded files whose content was already cached under another URL.
+    evictions : int
+        The number of files evicted to stay under :code:`max_bytes`.
+
+    """
+    def __init__(self, directory, max_bytes=1024 ** 3, client=None):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.client = client
+
+        self.downloads = 0
+        self.duplicates = 0
+        self.evictions = 0
+
+        for name in ('objects', 'tmp'):
+            os.makedirs(os.path.join(directory, name), exist_ok=True)
+
+        self._flight = SingleFlight(copy=False)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, 'index.sqlite'), check_same_thread=False)
+        self._conn.execute('CREATE TABLE IF NOT EXISTS objects '
+                           '(digest TEXT PRIMARY KEY, path TEXT, size INTEGER, accessed REAL)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS urls (url TEXT PRIMARY KEY, digest TEXT)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS urls_digest ON urls (digest)')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS objects_accessed ON objects (accessed)')
+        self._conn.commit()
+
+    def path(self, url):
+        r"""
+        Returns the local path of the file cached for a URL, or None if it is not cached. The file is marked as used,
+        so it is evicted last.
+
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT objects.digest, objects.path FROM urls JOIN objects '
+                                     'ON urls.digest = objects.digest WHERE urls.url = ?', (url,)).fetchone()
+
+            if row is None:
+                return None
+
+            self._conn.execute('UPDATE objects SET accessed = ? WHERE digest = ?', (time.time(), row[0]))
+            self._conn.commit()
+
+        return os.path.join(self.directory, row[1])
+
+    def fetch(self, url):
+        r"""
+        Returns the local path of the file of a URL, downloading it first if it is not cached. Concurrent calls for
+        the same URL share one download.
+
+        """
+        path = self.path(url)
+
+        if path is None:
+            digest = self._flight.do(url, self._download, url)
+            path = self.path(url)
+            self.evict(keep=(digest,))
+
+        return path
+
+    def prefetch(self, records, max_workers=8, fields=thumbnail_fields):
+        r"""
+        Downloads the images linked from API results that are not cached yet, several at a time.
+
+        Parameters
+        ----------
+        records : dict, Record or list
+            Results of :func:`~hubblepy.api.news_release`, :func:`~hubblepy.api.rss`,
+            :func:`~hubblepy.api.video_collections` or similar functions, as for :func:`thumbnail_urls`.
+        max_workers : int
+            The maximum number of files downloaded at once. Defaults to 8.
+        fields : tuple
+            The fields holding image URLs. Defaults to :code:`hubblepy.thumbnails.thumbnail_fields`.
+
+        Returns
+        -------
+        dict
+            Maps each URL to the local path of its file. The files of the batch are not evicted by it, even if they
+            exceed :code:`max_bytes` together.
+
+        Raises
+        ------
+        BatchError
+            If any download fails. The :code:`results` of the error are the paths of the URLs, in the order of
+            :func:`thumbnail_urls`, with None in place of each failed download.
+
+        """
+        urls = thumbnail_urls(records, fields)
+        res = {url: self.path(url) for url in urls}
+        missing = [url for url in urls if res[url] is None]
+        errors = {}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, self._flight.do, url, self._download, url)
+                       for url in missing]
+
+        for url, future in zip(missing, futures):
+            try:
+                future.result()
+                res[url] = self.path(url)
+            except Exception as e:
+                errors[url] = e
+
+        with self._lock:
+            keep = [row[0] for url in urls
+                    for row in self._conn.execute('SELECT digest FROM urls WHERE url = ?', (url,))]
+
+        self.evict(keep=keep)
+
+        if errors:
+            raise BatchError(errors, [res[url] for url in urls])
+
+        return res
+
+    def _download(self, url):
+        r"""
+        Downloads a URL into the cache, returning the digest of its content.
+
+        """
+        client = self.client if self.client is not None else get_default_client()
+        tmp = os.path.join(self.directory, 'tmp', uuid.uuid4().hex)
+        sha = hashlib.sha256()
+        size = 0
+
+        try:
+            with client.session.get(url, stream=True, timeout=request_timeout(client.timeout)) as r:
+                r.raise_for_status()
+
+                with open(tmp, 'wb') as f:
+                    for chunk in r.iter_content(chunk_size=64 * 1024):
+                        sha.update(chunk)
+                        f.write(chunk)
+                        size += len(chunk)
+
+            digest = sha.hexdigest()
+            extension = os.path.splitext(urlparse(url).path)[1].lower()
+            path = os.path.join('objects', digest[:2], digest + (extension if len(extension) <= 5 else ''))
+
+            with self._lock:
+                row = self._conn.execute('SELECT path FROM objects WHERE digest = ?', (digest,)).fetchone()
+
+                if row is None:
+                    os.makedirs(os.path.join(self.directory, 'objects', digest[:2]), exist_ok=True)
+                    os.replace(tmp, os.path.join(self.directory, path))
+                    self._conn.execute('INSERT INTO objects VALUES (?, ?, ?, ?)', (digest, path, size, time.time()))
+                else:
+                    self.duplicates += 1
+
+                self.downloads += 1
+                self._conn.execute('INSERT OR REPLACE INTO urls VALUES (?, ?)', (url, digest))
+                self._conn.commit()
+
+            return digest
+
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def evict(self, keep=()):
+        r"""
+        Removes the least recently used files until the cached files fit in :code:`max_bytes`, except the files whose
+        digest is in :code:`keep`. Returns the number of files removed.
+
+        """
+        if self.max_bytes is None:
+            return 0
+
+        removed = 0
+        keep = set(keep)
+
+        with self._lock:
+            total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM objects').fetchone()[0]
+
+            if total <= self.max_bytes:
+                return 0
+
+            for digest, path, size in self._conn.execute('SELECT digest, path, size FROM objects '
+                                                          'ORDER BY accessed').fetchall():
+                if total <= self.max_bytes:
+                    break
+                if digest in keep:
+                    continue
+
+                try:
+                    os.remove(os.path.join(self.directory, path))
+                except FileNotFoundError:
+                    pass
+
+                self._conn.execute('DELETE FROM objects WHERE digest = ?', (digest,))
+                self._conn.execute('DELETE FROM urls WHERE digest = ?', (digest,))
+                total -= size
+                removed += 1
+
+            self._conn.commit()
+            self.evictions += removed
+
+        return removed
+
+    def urls(self):
+        r"""
+        Returns a dict mapping every cached URL to the local path of its file.
+
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT urls.url, objects.path FROM urls JOIN objects '
+                                      'ON urls.digest = objects.digest').fetchall()
+
+        return {url: os.path.join(self.directory, path) for url, path in rows}
+
+    @property
+    def size(self):
+        r"""
+        The total size of the cached files, in bytes.
+
+        """
+        with self._lock:
+            return self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM objects').fetchone()[0]
+
+    def clear(self):
+        r"""
+        Removes every cached file.
+
+        """
+        with self._lock:
+            for (path,) in self._conn.execute('SELECT path FROM objects').fetchall():
+                try:
+                    os.remove(os.path.join(self.directory, path))
+                except FileNotFoundError:
+                    pass
+
+            self._conn.execute('DELETE FROM objects')
+            self._conn.execute('DELETE FROM urls')
+            self._conn.commit()
+
+    def close(self):
+        r"""
+        Closes the index database.
+
+        """
+        with self._lock:
+            self._conn.close()
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM urls WHERE url = ?', (url,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM objects').fetchone()[0]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,171 @@
+r"""
+Deadlines and hedged requests. A :func:`deadline` bounds the total time of every request sent inside a :code:`with`
+block, including the concurrent requests of a batch and their retries. A :class:`Hedge` policy cuts tail latency by
+sending a duplicate request when the first has not answered within a high percentile of the recent response times of
+its endpoint, and using whichever response arrives first.
+
+>>> client = hubblepy.Client(timeout=(3, 10), hedge=Hedge(percentile=95), max_workers=8)
+>>> with deadline(5):
+...     hubblepy.images(list(range(4000, 4100)), client=client)
+
+"""
+import contextvars
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from .exceptions import DeadlineExceeded
+
+
+_deadline = contextvars.ContextVar('hubblepy_deadline', default=None)
+
+
+@contextmanager
+def deadline(seconds):
+    r"""
+    Context manager giving the requests sent inside it :code:`seconds` seconds to complete. Requests that would start
+    after the deadline raise :class:`~hubblepy.exceptions.DeadlineExceeded`, and the connect and read timeouts of the
+    others are shortened to the remaining time. Nested deadlines cannot extend an outer one.
+
+    The deadline applies to the calling thread or task and to the requests the API functions send on its behalf on
+    other threads, such as the concurrent requests of a batch.
+
+    """
+    at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(min(at, current) if current is not None else at)
+
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining():
+    r"""
+    Returns the number of seconds left before the current deadline, or None if there is none.
+
+    """
+    at = _deadline.get()
+
+    return at - time.monotonic() if at is not None else None
+
+
+def past_deadline(delay):
+    r"""
+    Returns whether waiting :code:`delay` seconds would reach the current deadline.
+
+    """
+    left = remaining()
+
+    return left is not None and delay >= left
+
+
+def request_timeout(timeout):
+    r"""
+    Returns the timeout of a request given the client's :code:`timeout` (a number, a :code:`(connect, read)` tuple or
+    None), shortened to the time left before the current deadline.
+
+    Raises
+    ------
+    DeadlineExceeded
+        If the deadline has passed.
+
+    """
+    left = remaining()
+
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded('The deadline passed before the request was sent.')
+
+    if timeout is None:
+        return left
+    if isinstance(timeout, tuple):
+        return tuple(min(t, left) if t is not None else left for t in timeout)
+
+    return min(timeout, left)
+
+
+class Hedge(object):
+    r"""
+    Hedged request policy. The response times of each endpoint are recorded over a sliding window; once enough have
+    been seen, a request that has not answered within the :code:`percentile` of them is sent a second time, and the
+    first response to arrive is used.
+
+    Parameters
+    ----------
+    percentile : float
+        The percentile of recent response times after which a duplicate request is sent. Defaults to 95, which sends
+        about one duplicate per twenty requests.
+    min_samples : int
+        The number of response times an endpoint needs before its requests are hedged. Defaults to 20.
+    window : int
+        The number of recent response times kept per endpoint. Defaults to 200.
+    endpoints : tuple or None
+        The endpoint (function) names whose requests are hedged. Defaults to :code:`('images', 'videos',
+        'news_release')`, whose lookups are small and safe to duplicate. If None, every endpoint is hedged.
+
+    Attributes
+    ----------
+    hedged : int
+        The number of duplicate requests sent.
+
+    """
+    def __init__(self, percentile=95, min_samples=20, window=200, endpoints=('images', 'videos', 'news_release')):
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.window = window
+        self.endpoints = endpoints
+
+        self.hedged = 0
+
+        self._latencies = {}
+        self._lock = threading.Lock()
+
+    def applies(self, endpoint):
+        r"""
+        Returns whether the requests of an endpoint are hedged.
+
+        """
+        return self.endpoints is None or endpoint in self.endpoints
+
+    def record(self, endpoint, latency):
+        r"""
+        Records the response time, in seconds, of a request of an endpoint.
+
+        """
+        with self._lock:
+            if endpoint not in self._latencies:
+                self._latencies[endpoint] = deque(maxlen=self.window)
+
+            self._latencies[endpoint].append(latency)
+
+    def delay(self, endpoint):
+        r"""
+        Returns how long, in seconds, to wait for a response of an endpoint before sending a duplicate request, or
+        None if its requests are not hedged (yet).
+
+        """
+        if not self.applies(endpoint):
+            return None
+
+        with self._lock:
+            latencies = self._latencies.get(endpoint)
+
+            if latencies is None or len(latencies) < self.min_samples:
+                return None
+
+            ordered = sorted(latencies)
+
+        return ordered[min(len(ordered) - 1, int(math.ceil(self.percentile / 100.0 * len(ordered))) - 1)]
+
+    def sent(self):
+        r"""
+        Counts a duplicate request.
+
+        """
+        with self._lock:
+            self.hedged += 1
@@ -0,0 +1,339 @@
+r"""
+HTTP/2 transport for :class:`~hubblepy.client.Client`. Over HTTP/1.1, every request in flight needs a connection of
+its own, so the batches of :func:`~hubblepy.api.images`, :func:`~hubblepy.api.videos`,
+:func:`~hubblepy.api.news_release` and the like are limited by the size of the connection pool. Over HTTP/2, the
+requests of all the workers are multiplexed as concurrent streams of one connection.
+
+:class:`HTTP2Adapter` is a :code:`requests` transport adapter sending the requests with :code:`httpx`. It requires
+the :code:`httpx` and :code:`h2` packages (:code:`pip install hubblepy[http2]`).
+
+>>> client = hubblepy.Client(http2=True, max_workers=32)
+>>> hubblepy.images(list(range(4000, 4500)), client=client)
+>>> client.http2.protocols, client.http2.fallbacks
+
+For :code:`https://` URLs, HTTP/2 is negotiated with the server when the connection is set up (ALPN), and servers that
+do not offer it are sent HTTP/1.1 requests instead. The API functions request plain :code:`http://` URLs, which can
+only be sent over HTTP/2 without negotiation (h2c); the adapter does so when :code:`prior_knowledge` is set, as it is
+for :code:`Client(http2=True)`, and a host that turns out not to speak HTTP/2 is sent HTTP/1.1 requests from its
+first failed request on. Without :code:`prior_knowledge`, :code:`http://` URLs are sent over HTTP/1.1.
+
+"""
+import asyncio
+import os
+import ssl
+import threading
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers, select_proxy
+
+try:
+    import httpx
+except ImportError:  # pragma: no cover
+    httpx = None
+
+try:
+    import h2
+except ImportError:  # pragma: no cover
+    h2 = None
+
+
+class HTTP2Adapter(BaseAdapter):
+    r"""
+    Transport adapter sending the requests of a :code:`requests.Session` over HTTP/2 with :code:`httpx`, multiplexing
+    concurrent requests to a host over one connection. Pass it (or True) as the :code:`http2` option of
+    :class:`~hubblepy.client.Client`, or mount it on a session.
+
+    The connections are driven by an :mod:`asyncio` event loop on a background thread, which the requests of every
+    thread are handed to, so that one connection is never written to by several threads at once.
+
+    Parameters
+    ----------
+    max_connections : int
+        The maximum number of connections opened at once, per HTTP version. One HTTP/2 connection carries every
+        concurrent request to a host; the limit applies to the hosts answering over HTTP/1.1. Defaults to 10.
+    prior_knowledge : bool
+        If True, :code:`http://` URLs are requested over HTTP/2 too, without negotiation (h2c). A host answering such
+        requests with HTTP/1.1, or breaking the connection before answering any of them, is then sent HTTP/1.1
+        requests from there on. If False (the default), :code:`http://` URLs are requested over HTTP/1.1.
+    connect_to : tuple or None
+        A :code:`(host, port)` address connected to instead of the host of the URLs, which is still sent as the
+        :code:`Host` (or :code:`:authority`) of the requests, as with curl's :code:`--connect-to`. Useful for sending
+        the requests to a local server.
+
+    Attributes
+    ----------
+    protocols : dict
+        Maps each HTTP version ('HTTP/2', 'HTTP/1.1') to the number of responses received with it.
+    fallbacks : set
+        The origins (such as :code:`http://hubblesite.org`) requested over HTTP/1.1 after HTTP/2 failed.
+
+    """
+    def __init__(self, max_connections=10, prior_knowledge=False, connect_to=None):
+        if httpx is None or h2 is None:
+            raise ImportError('The HTTP/2 transport requires httpx and h2. Install them with: '
+                              'pip install hubblepy[http2]')
+
+        super(HTTP2Adapter, self).__init__()
+
+        self.max_connections = max_connections
+        self.prior_knowledge = prior_knowledge
+        self.connect_to = connect_to
+        self.protocols = {}
+        self.fallbacks = set()
+
+        self._clients = {}
+        self._http2_origins = set()
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        r"""
+        Sends a prepared request and returns its :code:`requests.Response`, as :code:`requests.adapters.HTTPAdapter`
+        does. The errors of :code:`httpx` are raised as the matching :code:`requests` exceptions.
+
+        """
+        parts = urlsplit(request.url)
+        origin = '{}://{}'.format(parts.scheme, parts.netloc)
+
+        if origin in self.fallbacks or (parts.scheme == 'http' and not self.prior_knowledge):
+            protocol = 'http/1.1'
+        else:
+            protocol = 'h2c' if parts.scheme == 'http' else 'h2'
+
+        headers = dict(request.headers)
+        url = request.url
+
+        if self.connect_to is not None:
+            headers['Host'] = parts.netloc
+            url = parts._replace(netloc='{}:{}'.format(*self.connect_to)).geturl()
+
+        try:
+            r = self._run(self._send(protocol, select_proxy(request.url, proxies), verify, cert, request.method, url,
+                                     headers, request.body, _timeout(timeout), stream))
+
+        except (httpx.RemoteProtocolError, httpx.ReadError, httpx.WriteError) as e:
+            # The host does not speak HTTP/2 without negotiation.
+            if protocol == 'h2c' and origin not in self._http2_origins:
+                self.fallbacks.add(origin)
+
+                return self.send(request, stream=stream, timeout=timeout, verify=verify, cert=cert, proxies=proxies)
+
+            raise _error(e, request) from e
+
+        except httpx.HTTPError as e:
+            raise _error(e, request) from e
+
+        if r.http_version == 'HTTP/2':
+            self._http2_origins.add(origin)
+
+        response = requests.Response()
+        response.status_code = r.status_code
+        response.reason = r.reason_phrase
+        response.headers = CaseInsensitiveDict(r.headers.items())
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        response.raw = _Body(self, r, request)
+
+        if not stream:
+            response._content = r.content
+
+        return response
+
+    async def _send(self, protocol, proxy, verify, cert, method, url, headers, body, timeout, stream):
+        client = self._client(protocol, proxy, verify, cert)
+        r = await client.send(client.build_request(method, url, headers=headers, content=body, timeout=timeout),
+                              stream=True)
+
+        # Bodies that are not streamed are read here, saving a round trip to the event loop per chunk.
+        if not stream:
+            try:
+                await r.aread()
+            finally:
+                await r.aclose()
+
+        # Counted on the thread of the event loop, so without a lock.
+        self.protocols[r.http_version] = self.protocols.get(r.http_version, 0) + 1
+
+        return r
+
+    def _client(self, protocol, proxy, verify, cert):
+        key = (protocol, proxy, verify, cert if not isinstance(cert, list) else tuple(cert))
+        client = self._clients.get(key)
+
+        if client is None:
+            limits = httpx.Limits(max_connections=self.max_connections,
+                                  max_keepalive_connections=self.max_connections)
+            client = httpx.AsyncClient(http1=protocol != 'h2c', http2=protocol != 'http/1.1', proxy=proxy,
+                                       verify=_ssl_context(verify, cert), limits=limits, trust_env=False)
+            self._clients[key] = client
+
+        return client
+
+    def _run(self, coroutine):
+        r"""
+        Runs a coroutine on the event loop of the adapter, started on first use, and returns its result.
+
+        """
+        if self._loop is None:
+            with self._lock:
+                if self._loop is None:
+                    loop = asyncio.new_event_loop()
+                    self._thread = threading.Thread(target=loop.run_forever)
+                    self._thread.daemon = True
+                    self._thread.start()
+                    self._loop = loop
+
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def close(self):
+        r"""
+        Closes every connection and stops the event loop.
+
+        """
+        with self._lock:
+            loop, self._loop = self._loop, None
+
+        if loop is None:
+            return
+
+        clients = list(self._clients.values())
+        self._clients.clear()
+
+        asyncio.run_coroutine_threadsafe(_close_clients(clients), loop).result()
+        loop.call_soon_threadsafe(loop.stop)
+        self._thread.join()
+        loop.close()
+
+
+async def _close_clients(clients):
+    for client in clients:
+        await client.aclose()
+
+
+class _Body(object):
+    r"""
+    The body of an :code:`httpx` response, read as the :code:`raw` body of a :code:`requests.Response` is. Chunks are
+    handed on as they arrive, without copying them.
+
+    """
+    def __init__(self, adapter, response, request):
+        self.adapter = adapter
+        self.response = response
+        self.request = request
+        self.decode_content = True
+        self._chunks = None
+        self._pending = b''
+
+    def read(self, amt=None, decode_content=True):
+        try:
+            if amt is None:
+                data = self._pending + self.adapter._run(self._read_all())
+                self._pending = b''
+
+                return data
+
+            if not self._pending:
+                self._pending = self.adapter._run(self._next())
+
+            data, self._pending = self._pending[:amt], self._pending[amt:]
+
+            return data
+
+        except httpx.HTTPError as e:
+            raise _error(e, self.request) from e
+
+    async def _next(self):
+        if self._chunks is None:
+            self._chunks = self.response.aiter_bytes()
+
+        try:
+            return await self._chunks.__anext__()
+        except StopAsyncIteration:
+            return b''
+
+    async def _read_all(self):
+        if self._chunks is None:
+            return await self.response.aread()
+
+        return b''.join([chunk async for chunk in self._chunks])
+
+    def readinto(self, b):
+        data = self.read(len(b))
+        b[:len(data)] = data
+
+        return len(data)
+
+    def stream(self, amt=64 * 1024, decode_content=True):
+        while True:
+            data = self.read(amt)
+
+            if not data:
+                return
+
+            yield data
+
+    def close(self):
+        if not self.response.is_closed and self.adapter._loop is not None:
+            self.adapter._run(self.response.aclose())
+
+    def release_conn(self):
+        self.close()
+
+
+def _timeout(timeout):
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+
+        return httpx.Timeout(read, connect=connect)
+
+    return httpx.Timeout(timeout)
+
+
+def _ssl_context(verify, cert):
+    r"""
+    Returns the :code:`verify` argument of :code:`httpx` matching the :code:`verify` and :code:`cert` arguments of
+    :code:`requests`.
+
+    """
+    if verify is False or (verify is True and cert is None):
+        return verify
+
+    if verify is True:
+        context = ssl.create_default_context()
+    elif os.path.isdir(verify):
+        context = ssl.create_default_context(capath=verify)
+    else:
+        context = ssl.create_default_context(cafile=verify)
+
+    if cert is not None:
+        context.load_cert_chain(*(cert if isinstance(cert, (tuple, list)) else (cert,)))
+
+    return context
+
+
+def _error(e, request):
+    r"""
+    Returns the :code:`requests` exception matching an :code:`httpx` error, so that retries and deadlines treat both
+    transports alike.
+
+    """
+    if isinstance(e, httpx.ConnectTimeout):
+        cls = requests.ConnectTimeout
+    elif isinstance(e, httpx.ReadTimeout):
+        cls = requests.ReadTimeout
+    elif isinstance(e, (httpx.WriteTimeout, httpx.PoolTimeout)):
+        cls = requests.Timeout
+    elif isinstance(e, httpx.ProxyError):
+        cls = requests.exceptions.ProxyError
+    elif isinstance(e, httpx.DecodingError):
+        cls = requests.exceptions.ContentDecodingError
+    else:
+        cls = requests.ConnectionError
+
+    return cls(e, request=request)
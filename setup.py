@@ -12,6 +12,18 @@ setup(
     include_package_data=True,
     long_description=open('README.md').read(),
     install_requires=['requests>=2.18'],
+    python_requires='>=3.7',
+    extras_require={
+        'async': ['httpx'],
+        'arrow': ['pyarrow>=14'],
+        'pandas': ['pandas'],
+        'fast': ['orjson', 'msgspec'],
+        'otel': ['opentelemetry-api'],
+        'http2': ['httpx', 'h2'],
+    },
+    entry_points={
+        'console_scripts': ['hubblepy = hubblepy.cli:main'],
+    },
     home_page='',
     classifiers=[
         'Development Status :: 2 - Pre-Alpha',
@@ -21,9 +33,11 @@ setup(
         'Operating System :: OS Independent',
         'Programming Language :: Python',
         'Programming Language :: Python :: 3',
-        'Programming Language :: Python :: 3.4',
-        'Programming Language :: Python :: 3.5',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3.7',
+        'Programming Language :: Python :: 3.8',
+        'Programming Language :: Python :: 3.9',
+        'Programming Language :: Python :: 3.10',
+        'Programming Language :: Python :: 3.11',
         'Topic :: Software Development :: Libraries :: Python Modules'
     ]
 )
@@ -0,0 +1,83 @@
+import glob
+import threading
+
+import pytest
+import requests
+import yaml
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+_recorded_responses = {}
+
+
+def recorded_responses():
+    r"""
+    Returns a dict mapping every URL recorded in the cassettes to its (first) recorded response. The cassettes are
+    only parsed once per test session.
+
+    """
+    if not _recorded_responses:
+        for path in sorted(glob.glob('tests/cassettes/*.yml')):
+            with open(path) as f:
+                cassette = yaml.load(f, Loader=getattr(yaml, 'CSafeLoader', yaml.SafeLoader))
+
+            for interaction in cassette['interactions']:
+                _recorded_responses.setdefault(interaction['request']['uri'], interaction['response'])
+
+    return _recorded_responses
+
+
+class CassetteAdapter(BaseAdapter):
+    r"""
+    Transport adapter answering requests from the recorded cassettes. Unlike vcr, it can be used from several threads
+    at once and replays each recorded URL any number of times. Requests for URLs that were never recorded raise a
+    :code:`requests.ConnectionError`. Conditional requests whose :code:`If-None-Match` header matches the recorded
+    :code:`ETag` get an empty 304 response.
+
+    """
+    def __init__(self):
+        super(CassetteAdapter, self).__init__()
+
+        self.responses = recorded_responses()
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.requests.append(request)
+
+        recorded = self.responses.get(request.url)
+
+        if recorded is None:
+            raise requests.ConnectionError('{} is not in the cassettes'.format(request.url), request=request)
+
+        r = requests.Response()
+        r.url = request.url
+        r.request = request
+        r.status_code = recorded['status']['code']
+        r.headers = CaseInsensitiveDict({k: v[0] for k, v in recorded['headers'].items()})
+        r.encoding = 'utf-8'
+        r._content = recorded['body']['string'].encode('utf-8')
+
+        if 'ETag' in r.headers and request.headers.get('If-None-Match') == r.headers['ETag']:
+            r.status_code = 304
+            r._content = b''
+
+        return r
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def cassette_adapter():
+    return CassetteAdapter()
+
+
+@pytest.fixture
+def replay_session(cassette_adapter):
+    session = requests.Session()
+    session.mount('http://hubblesite.org/', cassette_adapter)
+
+    return session
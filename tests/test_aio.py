@@ -0,0 +1,151 @@
+import asyncio
+
+import pytest
+import vcr
+
+pytest.importorskip('httpx')
+
+from hubblepy import aio
+from hubblepy.exceptions import BatchError
+from hubblepy.testing import StubServer
+
+
+def run(coro):
+    loop = asyncio.new_event_loop()
+
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        loop.close()
+
+
+@vcr.use_cassette('tests/cassettes/test_news.yml')
+def test_news():
+    async def main():
+        async with aio.AsyncClient() as client:
+            p1 = await aio.news(1, client=client)
+            p2 = await aio.news([1, 2, 3], client=client)
+            p3 = await aio.news(1, 'text', client=client)
+            p4 = await aio.news(1, 'content', client=client)
+
+        return p1, p2, p3, p4
+
+    p1, p2, p3, p4 = run(main())
+
+    assert isinstance(p1, list)
+    assert isinstance(p1[0], dict)
+    assert [p[0]['news_id'] for p in p2] == ['2018-39', '2018-10', '2017-23']
+    assert isinstance(p3, str)
+    assert isinstance(p4, bytes)
+
+
+@vcr.use_cassette('tests/cassettes/test_images.yml')
+def test_images():
+    async def main():
+        async with aio.AsyncClient(max_concurrency=1) as client:
+            p1 = await aio.images(4229, client=client)
+            p2 = await aio.images([4229, 4230], client=client)
+
+        return p1, p2
+
+    p1, p2 = run(main())
+
+    assert isinstance(p1, dict)
+    assert isinstance(p2, list)
+    assert isinstance(p2[1], dict)
+
+
+@vcr.use_cassette('tests/cassettes/test_rss_posts.yml')
+def test_rss_posts():
+    async def main():
+        return await aio.rss_posts('esa_feed', ['2017-03-23T13:00:00.000-04:00', '2018-09-13T11:00:00.000-04:00'])
+
+    p1 = run(main())
+
+    assert isinstance(p1, list)
+    assert isinstance(p1[0], dict)
+
+
+@vcr.use_cassette('tests/cassettes/test_glossary_term.yml')
+def test_batch_errors():
+    async def main():
+        async with aio.AsyncClient() as client:
+            return await aio.glossary_term(['asteroid', 'not-a-term'], client=client)
+
+    with pytest.raises(BatchError) as e:
+        run(main())
+
+    assert list(e.value.errors) == ['not-a-term']
+    assert isinstance(e.value.results[0], dict)
+
+
+def test_return_types_exceptions():
+    async def main():
+        async with aio.AsyncClient() as client:
+            return await aio.news_release('first', return_type='na', client=client)
+
+    with vcr.use_cassette('tests/cassettes/test_news_releases.yml'):
+        with pytest.raises(ValueError):
+            run(main())
+
+
+def test_glossary_all():
+    async def main(server):
+        async with server.async_client() as client:
+            return [term async for term in await aio.glossary(page='all', client=client)]
+
+    with StubServer(pages=2) as server:
+        p1 = run(main(server))
+
+    assert len(p1) == 37
+    assert isinstance(p1[0], dict)
+    assert '/api/v3/glossary?page=3' not in server.counts
+
+
+def test_glossary_all_without_prefetch():
+    async def main(server, prefetch):
+        async with server.async_client(prefetch=prefetch) as client:
+            terms = await aio.glossary(page='all', client=client)
+
+            async for term in terms:
+                await asyncio.sleep(0.05)
+                break
+
+            await terms.aclose()
+
+    with StubServer(pages=2) as server:
+        run(main(server, False))
+
+    assert '/api/v3/glossary?page=2' not in server.counts
+
+    with StubServer(pages=2) as server:
+        run(main(server, True))
+
+    assert '/api/v3/glossary?page=2' in server.counts
+
+
+def test_batch_cancellation(monkeypatch):
+    async def request(url, params=None, return_type='json', client=None):
+        if url.endswith('4230'):
+            raise asyncio.CancelledError()
+
+        return {'name': url}
+
+    monkeypatch.setattr(aio, '_request', request)
+
+    async def main():
+        async with aio.AsyncClient() as client:
+            return await aio.images([4229, 4230], client=client)
+
+    # A cancelled request is not collected as a failure of the batch.
+    with pytest.raises(asyncio.CancelledError):
+        run(main())
+
+
+def test_default_client_closed():
+    async def main():
+        return aio.get_default_client()
+
+    client = asyncio.run(main())
+
+    assert client.client.is_closed
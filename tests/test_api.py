@@ -1,7 +1,10 @@
+import types
+
 import vcr
 import pytest
 
 import hubblepy
+from hubblepy.testing import StubServer
 
 
 tape = vcr.VCR(
@@ -82,18 +85,12 @@ def test_images():
 @vcr.use_cassette('tests/cassettes/test_video_collections.yml')
 def test_video_collections():
     p1 = hubblepy.video_collections(collection_name='science')
-    p2 = hubblepy.video_collections(collection_name='science', page=2)
-    p3 = hubblepy.video_collections(collection_name='science', page='all')
     p4 = hubblepy.video_collections(collection_name='science', return_type='content')
     p5 = hubblepy.video_collections(collection_name='science', return_type='text')
     p6 = hubblepy.video_collections(collection_name='science', page=[1, 2])
 
     assert isinstance(p1[0], dict)
     assert isinstance(p1, list)
-    assert isinstance(p2[0], dict)
-    assert isinstance(p2, list)
-    assert isinstance(p3[0], dict)
-    assert isinstance(p3, list)
     assert isinstance(p4, bytes)
     assert isinstance(p5, str)
     assert isinstance(p6, list)
@@ -121,7 +118,6 @@ def test_videos():
 def test_glossary():
     p1 = hubblepy.glossary()
     p2 = hubblepy.glossary(page=2)
-    p3 = hubblepy.glossary(page='all')
     p4 = hubblepy.glossary(page=2, return_type='content')
     p5 = hubblepy.glossary(page=2, return_type='text')
     p6 = hubblepy.glossary(page=[1, 2])
@@ -130,8 +126,6 @@ def test_glossary():
     assert isinstance(p1, list)
     assert isinstance(p2[0], dict)
     assert isinstance(p2, list)
-    assert isinstance(p3[0], dict)
-    assert isinstance(p3, list)
     assert isinstance(p4, bytes)
     assert isinstance(p5, str)
     assert isinstance(p6, list)
@@ -158,7 +152,6 @@ def test_rss():
     p1 = hubblepy.rss(feed_name='esa_feed')
     p2 = hubblepy.rss(feed_name='esa_feed', sort='asc', page=1)
     p3 = hubblepy.rss(feed_name='esa_feed', sort='asc', page=[1, 2])
-    p4 = hubblepy.rss(feed_name='esa_feed', sort='asc', page='all')
     p5 = hubblepy.rss(feed_name='esa_feed', return_type='content')
     p6 = hubblepy.rss(feed_name='esa_feed', return_type='text')
 
@@ -168,9 +161,8 @@ def test_rss():
     assert isinstance(p2[0], dict)
     assert isinstance(p2[1], dict)
     assert isinstance(p3, list)
-    assert isinstance(p3[0], dict)
-    assert isinstance(p4, list)
-    assert isinstance(p4[0], dict)
+    assert isinstance(p3[0], list)
+    assert isinstance(p3[0][0], dict)
     assert isinstance(p5, bytes)
     assert isinstance(p6, str)
 
@@ -194,3 +186,27 @@ def test_rss_posts():
 def test_return_types_exceptions():
     with pytest.raises(ValueError):
         hubblepy.news_release(which='first', return_type='na')
+
+
+def test_all_pages():
+    with StubServer(pages=2) as server, server.client() as client:
+        p1 = hubblepy.glossary(page='all', client=client)
+        p2 = hubblepy.rss(feed_name='esa_feed', sort='asc', page='all', client=client)
+        p3 = hubblepy.video_collections(collection_name='science', page='all', client=client)
+
+        for pages in (p1, p2, p3):
+            assert isinstance(pages, types.GeneratorType)
+
+        p1, p2, p3 = list(p1), list(p2), list(p3)
+        p4 = hubblepy.video_collections(collection_name='science', page=2, client=client)
+
+    for items in (p1, p2, p3):
+        assert len(items) == 37
+        assert isinstance(items[0], dict)
+
+    assert p4 == p3[25:]
+
+    # Pages are requested one at a time, stopping after the first short page.
+    assert server.counts['/api/v3/glossary?page=1'] == 1
+    assert server.counts['/api/v3/glossary?page=2'] == 1
+    assert '/api/v3/glossary?page=3' not in server.counts
@@ -0,0 +1,125 @@
+import time
+
+import hubblepy
+from hubblepy.cache import CacheEntry, MemoryCache, SQLiteCache
+
+
+def entry(content=b'[]', expires=None, headers=None):
+    return CacheEntry('http://hubblesite.org/api/v3/news', 200, headers or {'Content-Type': 'application/json'},
+                      content, expires or time.time() + 60)
+
+
+def test_memory_cache():
+    cache = MemoryCache(maxsize=2)
+    cache.set('a', entry(b'a'))
+    cache.set('b', entry(b'b'))
+
+    assert cache.get('a').content == b'a'
+
+    cache.set('c', entry(b'c'))
+
+    assert cache.get('b') is None
+    assert cache.get('a').content == b'a'
+    assert len(cache) == 2
+
+    cache.delete('a')
+
+    assert cache.get('a') is None
+
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_sqlite_cache(tmpdir):
+    path = str(tmpdir.join('cache.sqlite'))
+
+    cache = SQLiteCache(path)
+    cache.set('a', entry(b'[1, 2]', headers={'ETag': 'W/"1"'}))
+    cache.close()
+
+    cache = SQLiteCache(path)
+    e = cache.get('a')
+
+    assert e.content == b'[1, 2]'
+    assert e.etag == 'W/"1"'
+    assert e.is_fresh()
+    assert e.to_response().json() == [1, 2]
+    assert cache.get('b') is None
+
+    cache.clear()
+
+    assert len(cache) == 0
+
+
+def test_client_cache_hits(replay_session, cassette_adapter):
+    with hubblepy.Client(session=replay_session, cache=MemoryCache()) as client:
+        p1 = hubblepy.images(4229, client=client)
+        p2 = hubblepy.images(4229, client=client)
+        p3 = hubblepy.images(4229, return_type='text', client=client)
+
+    assert p1 == p2
+    assert isinstance(p3, str)
+    assert len(cassette_adapter.requests) == 1
+
+
+def test_client_cache_ttl(replay_session, cassette_adapter):
+    with hubblepy.Client(session=replay_session, cache=MemoryCache(), cache_ttl={'images': 0}) as client:
+        hubblepy.images(4229, client=client)
+        hubblepy.images(4229, client=client)
+        hubblepy.glossary_term('asteroid', client=client)
+        hubblepy.glossary_term('asteroid', client=client)
+
+    assert len(cassette_adapter.requests) == 3
+
+
+def test_client_cache_ttl_none(replay_session, cassette_adapter, tmpdir):
+    for cache in (MemoryCache(), SQLiteCache(str(tmpdir.join('cache.sqlite')))):
+        del cassette_adapter.requests[:]
+
+        # A time-to-live of None keeps the response fresh indefinitely.
+        with hubblepy.Client(session=replay_session, cache=cache, cache_ttl={'images': None}) as client:
+            hubblepy.images(4229, client=client)
+            hubblepy.images(4229, client=client)
+
+        assert len(cassette_adapter.requests) == 1
+        assert cache.get(cassette_adapter.requests[0].url).expires is None
+        assert cache.get(cassette_adapter.requests[0].url).is_fresh(now=float('inf'))
+
+
+def test_client_cache_revalidation(replay_session, cassette_adapter):
+    cache = MemoryCache()
+
+    with hubblepy.Client(session=replay_session, cache=cache) as client:
+        p1 = hubblepy.images(4229, client=client)
+
+        key = 'http://hubblesite.org/api/v3/image/4229'
+        cache.get(key).expires = 0
+
+        p2 = hubblepy.images(4229, client=client)
+
+    assert p1 == p2
+    assert len(cassette_adapter.requests) == 2
+    assert cassette_adapter.requests[1].headers['If-None-Match'] == 'W/"ca34ca5e1f2393a861a408603a52740e"'
+    assert cache.get(key).is_fresh()
+
+
+def test_client_stale_while_revalidate(replay_session, cassette_adapter):
+    cache = MemoryCache()
+
+    with hubblepy.Client(session=replay_session, cache=cache, stale_while_revalidate=True) as client:
+        hubblepy.glossary_term('asteroid', client=client)
+
+        key = 'http://hubblesite.org/api/v3/glossary/asteroid'
+        cache.get(key).expires = 0
+
+        p1 = hubblepy.glossary_term('asteroid', client=client)
+
+        for _ in range(100):
+            if cache.get(key).is_fresh():
+                break
+            time.sleep(0.01)
+
+    assert isinstance(p1, dict)
+    assert len(cassette_adapter.requests) == 2
+    assert cache.get(key).is_fresh()
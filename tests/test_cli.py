@@ -0,0 +1,101 @@
+import glob
+import json
+import os
+
+import pytest
+
+from hubblepy import cli
+from hubblepy.cli import main
+from hubblepy.testing import StubServer
+
+
+def read_ndjson(directory, kind):
+    records = []
+
+    for path in sorted(glob.glob(os.path.join(directory, kind, '*.ndjson'))):
+        with open(path) as f:
+            records.extend(json.loads(line) for line in f)
+
+    return records
+
+
+def test_snapshot_resumes(tmpdir):
+    directory = str(tmpdir)
+    args = ['snapshot', directory, '--processes', '2', '--workers', '4', '--shard-size', '10', '--feeds', 'esa_feed',
+            '--quiet']
+
+    # Without retries, some shards fail; they are retried by the next run.
+    with StubServer(pages=2, error_rate=0.02, seed=3) as server:
+        assert main(args + ['--proxy', server.url, '--retry', '0']) == 1
+
+    with open(os.path.join(directory, 'checkpoint.json')) as f:
+        done = json.load(f)
+
+    assert 'listing/news' in done
+
+    with StubServer(pages=2) as server:
+        assert main(args + ['--proxy', server.url]) == 0
+
+    # Only what was missing was requested again.
+    assert 'http://hubblesite.org/api/v3/news?page=1' not in server.counts
+    assert server.requests < 2 + 1 + 2 + 2 + 2 + 3 * 37
+
+    news = read_ndjson(directory, 'news')
+    releases = read_ndjson(directory, 'news_release')
+    images = read_ndjson(directory, 'images')
+
+    assert len(news) == 37
+    assert sorted(r['news_id'] for r in releases) == sorted(item['news_id'] for item in news)
+    assert sorted(i['id'] for i in images) == sorted(i['id'] for i in read_ndjson(directory, 'image_collections'))
+    assert all('image_files' in image for image in images)
+    assert len(read_ndjson(directory, 'videos')) == 37
+    assert len(read_ndjson(directory, 'glossary')) == 37
+    assert set(post['feed'] for post in read_ndjson(directory, 'rss')) == {'esa_feed'}
+    assert not glob.glob(os.path.join(directory, '*', '*.tmp'))
+
+
+def test_snapshot_parquet(tmpdir):
+    pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+
+    directory = str(tmpdir)
+
+    with StubServer(pages=1) as server:
+        assert main(['snapshot', directory, '--format', 'parquet', '--processes', '1', '--feeds', '--quiet',
+                     '--proxy', server.url]) == 0
+
+    assert pyarrow.parquet.read_table(os.path.join(directory, 'images', 'records', 'part-1000.parquet')).num_rows == 12
+    assert os.path.exists(os.path.join(directory, 'images', 'image_files', 'part-1000.parquet'))
+
+
+def test_snapshot_rate_limit(tmpdir, monkeypatch):
+    limits = []
+    make_client, make_executor = cli._client, cli.ProcessPoolExecutor
+
+    def client(options):
+        limits.append(('listings', options['rate_limit']))
+
+        return make_client(options)
+
+    def executor(max_workers, initializer, initargs):
+        limits.append((max_workers, initargs[0]['rate_limit']))
+
+        return make_executor(max_workers=max_workers, initializer=initializer, initargs=initargs)
+
+    monkeypatch.setattr(cli, '_client', client)
+    monkeypatch.setattr(cli, 'ProcessPoolExecutor', executor)
+
+    with StubServer(pages=1) as server:
+        assert main(['snapshot', str(tmpdir), '--processes', '8', '--shard-size', '1000', '--feeds', '--quiet',
+                     '--rate-limit', '600', '--proxy', server.url]) == 0
+
+    # The listings get the whole limit, and the shards (news_release, images, videos) split it over three processes.
+    assert limits == [('listings', 600), (3, 200)]
+
+
+def test_snapshot_default_feeds(tmpdir):
+    with StubServer(pages=1) as server:
+        assert main(['snapshot', str(tmpdir), '--processes', '1', '--quiet', '--proxy', server.url]) == 0
+
+    # Every feed served by the stub is exported by default.
+    assert set(post['feed'] for post in read_ndjson(str(tmpdir), 'rss')) == {'esa_feed', 'jwst_feed', 'hubble_feed'}
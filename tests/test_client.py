@@ -0,0 +1,90 @@
+import types
+
+import pytest
+import vcr
+
+import hubblepy
+from hubblepy.client import Client, get_default_client, set_default_client
+from hubblepy.exceptions import BatchError
+from hubblepy.testing import StubServer
+
+
+def test_client_pool_settings():
+    client = Client(pool_connections=2, pool_maxsize=4, pool_block=True, headers={'X-Test': '1'})
+    adapter = client.session.get_adapter('http://hubblesite.org/api/v3/news')
+
+    assert adapter._pool_connections == 2
+    assert adapter._pool_maxsize == 4
+    assert adapter._pool_block is True
+    assert client.session.headers['X-Test'] == '1'
+    assert client.session.headers['Connection'] == 'keep-alive'
+
+    client.close()
+
+
+def test_default_client():
+    original = get_default_client()
+
+    assert isinstance(original, Client)
+    assert get_default_client() is original
+
+    client = Client()
+    set_default_client(client)
+
+    assert get_default_client() is client
+
+    set_default_client(None)
+
+    assert get_default_client() is not client
+
+    set_default_client(original)
+
+
+@vcr.use_cassette('tests/cassettes/test_images.yml')
+def test_client_requests():
+    sent = []
+
+    class RecordingClient(Client):
+        def get(self, url, params=None, endpoint=None):
+            sent.append((url, endpoint))
+            return super(RecordingClient, self).get(url, params=params, endpoint=endpoint)
+
+    with RecordingClient() as client:
+        p1 = hubblepy.images(4229, client=client)
+        p2 = hubblepy.images([4229, 4230], client=client)
+
+    assert isinstance(p1, dict)
+    assert isinstance(p2, list)
+    assert sent == [('http://hubblesite.org/api/v3/image/4229', 'images'),
+                    ('http://hubblesite.org/api/v3/image/4229', 'images'),
+                    ('http://hubblesite.org/api/v3/image/4230', 'images')]
+
+
+def test_client_concurrent_batch(replay_session):
+    with Client(max_workers=3, session=replay_session) as client:
+        p1 = hubblepy.news([1, 2, 3], client=client)
+
+    assert isinstance(p1, list)
+    assert [p[0]['news_id'] for p in p1] == ['2018-39', '2018-10', '2017-23']
+
+
+def test_client_concurrent_batch_errors(replay_session):
+    with Client(max_workers=2, session=replay_session) as client:
+        with pytest.raises(BatchError) as e:
+            hubblepy.images([4229, 1], client=client)
+
+    assert list(e.value.errors) == [1]
+    assert isinstance(e.value.results[0], dict)
+    assert e.value.results[1] is None
+
+
+def test_client_without_prefetch():
+    with StubServer(pages=2) as server, server.client(prefetch=False) as client:
+        terms = hubblepy.glossary(page='all', client=client)
+
+        assert isinstance(terms, types.GeneratorType)
+        assert isinstance(next(terms), dict)
+
+        # The next page is only requested once the items of the first one are consumed.
+        assert '/api/v3/glossary?page=2' not in server.counts
+        assert len(list(terms)) == 36
@@ -0,0 +1,57 @@
+import time
+
+import hubblepy
+from hubblepy.crawl import crawl
+from hubblepy.ratelimit import Retry
+from hubblepy.testing import StubServer
+
+
+def test_crawl():
+    with StubServer(pages=2, latency=0.02) as server:
+        with server.client(pool_maxsize=16) as client:
+            ids = [item['news_id'] for item in hubblepy.news(1, client=client)[:6]]
+            requests = server.requests
+
+            start = time.monotonic()
+            graph = crawl(ids + ['last'], max_workers=16, client=client)
+            elapsed = time.monotonic() - start
+
+    image_ids = set(i for release in graph.releases.values() for i in release['release_images'])
+    video_ids = set(i for release in graph.releases.values() for i in release['release_videos'])
+
+    assert sorted(graph.releases) == sorted(ids)
+    assert graph.aliases == {'last': ids[0]}
+    assert set(graph.images) == image_ids and set(graph.videos) == video_ids
+    assert graph.errors == {}
+    assert graph.requests == server.requests - requests == 7 + len(image_ids) + len(video_ids)
+
+    # The requests are pipelined rather than sent one after the other.
+    assert elapsed < graph.requests * 0.02 / 2
+
+    release = graph.releases[ids[0]]
+
+    assert [image['id'] for image in graph.images_of('last')] == release['release_images']
+    assert graph.releases_of_image(release['release_images'][0])[0] == ids[0]
+
+    expanded = graph.expand(ids[0])
+
+    assert expanded['news_id'] == ids[0]
+    assert expanded['release_images'] == graph.images_of(ids[0])
+    assert release['release_images'][0] in graph.releases[ids[0]]['release_images']
+
+
+def test_crawl_records_and_retries():
+    with StubServer(error_rate=0.3, seed=2) as server:
+        with server.client(retry=Retry(total=10, backoff=0.001)) as client:
+            ids = [item['news_id'] for item in hubblepy.news(1, client=client)[:5]]
+            graph = crawl(ids, videos=False, return_type='record', client=client)
+
+    assert server.errors > 0
+    assert graph.errors == {}
+    assert graph.videos == {}
+    assert len(graph.releases) + len(graph.images) == graph.requests
+
+    for news_id, release in graph.releases.items():
+        assert release.news_id == news_id
+        assert graph.images_of(news_id) == [graph.images[i] for i in release.release_images if i in graph.images]
+        assert graph.expand(news_id)['release_videos'] == []
@@ -0,0 +1,47 @@
+import pytest
+
+import hubblepy
+from hubblepy.decoders import Decoder, available
+from hubblepy.records import Image
+
+
+def test_decoder_choice():
+    assert available()[-1] == 'json'
+    assert Decoder().name == available()[0]
+    assert Decoder('json').name == 'json'
+
+    with pytest.raises(ValueError):
+        Decoder('yaml')
+
+
+@pytest.mark.parametrize('name', available())
+def test_decoders_agree(replay_session, name):
+    reference = hubblepy.Client(session=replay_session, decoder='json')
+    client = hubblepy.Client(session=replay_session, decoder=name)
+
+    assert hubblepy.images([4229, 4230], client=client) == hubblepy.images([4229, 4230], client=reference)
+    assert list(hubblepy.glossary(page='all', client=client)) == list(hubblepy.glossary(page='all',
+                                                                                        client=reference))
+
+    records = hubblepy.images([4229, 4230], return_type='record', client=client)
+    assert records == hubblepy.images([4229, 4230], return_type='record', client=reference)
+    assert isinstance(records[0], Image)
+    assert records[0].id == 4229
+
+
+def test_msgspec_schema_decoding(replay_session):
+    pytest.importorskip('msgspec')
+    client = hubblepy.Client(session=replay_session, decoder='msgspec')
+
+    assert client.decoder.schema
+    terms = list(hubblepy.glossary(page='all', return_type='record', client=client))
+
+    assert len(terms) == 47
+    assert terms[0].extra is None
+
+    # Fields unknown to the record classes are kept, as with the other decoders.
+    body = b'[{"name": "asteroid", "definition": "A small rocky body.", "added": "2018"}]'
+    term = client.decoder.records(body, 'glossary')[0]
+
+    assert term.extra == {'added': '2018'}
+    assert term.to_dict() == Decoder('json').records(body, 'glossary')[0].to_dict()
@@ -0,0 +1,141 @@
+import io
+import os
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+import hubblepy
+from hubblepy.download import asset_files, download, download_file
+from hubblepy.exceptions import BatchError, DownloadError
+
+
+files = {
+    'https://media.stsci.edu/uploads/image_file/image_attachment/1/a.png': os.urandom(10000),
+    'https://media.stsci.edu/uploads/image_file/image_attachment/2/b.tif': os.urandom(25000),
+    'https://media.stsci.edu/uploads/video_file/video_attachment/3/c.mp4': os.urandom(5000)
+}
+
+image = {'id': 1, 'name': 'Image', 'image_files': [{'file_url': url, 'file_size': len(files[url]), 'width': 10,
+                                                    'height': 10} for url in sorted(files)[:2]]}
+video = {'id': 2, 'name': 'Video', 'video_files': [{'file_url': sorted(files)[2], 'file_size': 5000,
+                                                    'format': 'MPEG-4 (H.264)'}]}
+
+
+class AssetAdapter(BaseAdapter):
+    r"""
+    Transport adapter serving the files above, with support for Range requests.
+
+    """
+    def __init__(self, honour_range=True):
+        super(AssetAdapter, self).__init__()
+
+        self.honour_range = honour_range
+        self.ranges = []
+
+    def send(self, request, **kwargs):
+        content = files[request.url]
+        r = requests.Response()
+        r.url = request.url
+        r.status_code = 200
+
+        range_header = request.headers.get('Range')
+        self.ranges.append(range_header)
+
+        if range_header and self.honour_range:
+            start = int(range_header[len('bytes='):-1])
+
+            if start >= len(content):
+                r.status_code = 416
+                content = b''
+            else:
+                r.status_code = 206
+                content = content[start:]
+
+        r.headers = CaseInsensitiveDict({'Content-Length': str(len(content))})
+        r.raw = io.BytesIO(content)
+
+        return r
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def asset_client():
+    adapter = AssetAdapter()
+    client = hubblepy.Client()
+    client.session.mount('https://media.stsci.edu/', adapter)
+    client.adapter = adapter
+
+    return client
+
+
+def test_asset_files():
+    assert len(asset_files(image)) == 2
+    assert len(asset_files([image, video])) == 3
+    assert asset_files(image['image_files'][0]) == [image['image_files'][0]]
+
+
+def test_download(tmpdir, asset_client):
+    paths = download([image, video], str(tmpdir.join('assets')), client=asset_client, chunk_size=1000)
+
+    assert [os.path.basename(p) for p in paths] == ['a.png', 'b.tif', 'c.mp4']
+
+    for path, url in zip(paths, sorted(files)):
+        with open(path, 'rb') as f:
+            assert f.read() == files[url]
+
+    download([image, video], str(tmpdir.join('assets')), client=asset_client)
+
+    assert len(asset_client.adapter.ranges) == 3
+
+
+def test_download_resume(tmpdir, asset_client):
+    url = sorted(files)[1]
+    path = str(tmpdir.join('b.tif'))
+
+    with open(path + '.part', 'wb') as f:
+        f.write(files[url][:12345])
+
+    download_file(image['image_files'][1], path, client=asset_client)
+
+    with open(path, 'rb') as f:
+        assert f.read() == files[url]
+
+    assert asset_client.adapter.ranges == ['bytes=12345-']
+    assert not os.path.exists(path + '.part')
+
+
+def test_download_resume_ignored_range(tmpdir, asset_client):
+    asset_client.adapter.honour_range = False
+    url = sorted(files)[1]
+    path = str(tmpdir.join('b.tif'))
+
+    with open(path + '.part', 'wb') as f:
+        f.write(files[url][:12345])
+
+    download_file(image['image_files'][1], path, client=asset_client)
+
+    with open(path, 'rb') as f:
+        assert f.read() == files[url]
+
+
+def test_download_size_mismatch(tmpdir, asset_client):
+    entry = dict(video['video_files'][0], file_size=4000)
+
+    with pytest.raises(DownloadError):
+        download_file(entry, str(tmpdir.join('c.mp4')), client=asset_client)
+
+    with pytest.raises(BatchError) as e:
+        download([image['image_files'][0], entry], str(tmpdir), client=asset_client)
+
+    assert list(e.value.errors) == [entry['file_url']]
+    assert e.value.results[0].endswith('a.png')
+
+
+def test_download_module():
+    # The module is not shadowed by the function of the same name.
+    assert hubblepy.download.asset_files is asset_files
+    assert hubblepy.download.download is download
@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+
+import pytest
+
+import hubblepy
+from hubblepy.export import iter_columns, to_arrow, to_columns, to_pandas
+
+
+def fetch(session):
+    client = hubblepy.Client(session=session)
+
+    return hubblepy.news_release(['2016-24', 'first'], client=client), \
+        hubblepy.images([4229, 4230], client=client)
+
+
+def test_to_columns(replay_session):
+    releases, images = fetch(replay_session)
+    tables = to_columns(releases)
+
+    assert tables['records']['news_id'] == ['2016-24', '1990-04']
+    assert tables['records']['publication'][0] == datetime(2016, 6, 30, 14, tzinfo=timezone.utc)
+    assert 'release_images' not in tables['records']
+    assert set(tables['release_images']['news_id']) == {'2016-24', '1990-04'}
+
+    tables = to_columns(images, ids=[4229, 4230])
+    records, files = tables['records'], tables['image_files']
+
+    assert records['id'] == [4229, 4230]
+    assert records['description'][1] is None
+    assert len(files['id']) == len(images[0]['image_files']) + len(images[1]['image_files'])
+    assert files['file_url'][0] == images[0]['image_files'][0]['file_url']
+    assert len({len(column) for column in files.values()}) == 1
+
+
+def test_iter_columns_batches(replay_session):
+    client = hubblepy.Client(session=replay_session)
+    batches = list(iter_columns(hubblepy.glossary(page='all', client=client), batch_size=20))
+
+    assert [len(b['records']['name']) for b in batches] == [20, 20, 7]
+
+
+def test_to_arrow(replay_session):
+    pyarrow = pytest.importorskip('pyarrow')
+    releases, images = fetch(replay_session)
+
+    tables = to_arrow(releases, batch_size=1)
+
+    assert tables['records'].num_rows == 2
+    assert tables['records'].schema.field('publication').type == pyarrow.timestamp('us', tz='UTC')
+    assert to_arrow(images, ids=[4229, 4230])['image_files'].num_rows == \
+        len(images[0]['image_files']) + len(images[1]['image_files'])
+
+
+def test_to_pandas(replay_session):
+    pytest.importorskip('pandas')
+    releases, _ = fetch(replay_session)
+
+    frame = to_pandas(releases)['records']
+
+    assert list(frame['news_id']) == ['2016-24', '1990-04']
+    assert str(frame['publication'].dtype) == 'datetime64[ns, UTC]'
+
+
+def test_to_columns_records(replay_session):
+    client = hubblepy.Client(session=replay_session)
+    release = hubblepy.news_release('2016-24', return_type='record', client=client)
+    tables = to_columns(release)
+
+    assert tables == to_columns(hubblepy.news_release('2016-24', client=client))
+    assert tables['records']['abstract'][0] == release.abstract
+
+    pages = [hubblepy.glossary(page=1, return_type='record', client=client)]
+    assert to_columns(pages)['records']['name'] == [term.name for term in pages[0]]
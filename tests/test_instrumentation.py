@@ -0,0 +1,87 @@
+import pytest
+
+import hubblepy
+from hubblepy.instrumentation import Histogram, Instrumentation, OpenTelemetryExporter, PrometheusExporter
+from hubblepy.memo import Memo
+
+
+def test_histogram():
+    histogram = Histogram((1, 2, 4))
+
+    for value in (0.5, 1.5, 1.5, 3, 10):
+        histogram.observe(value)
+
+    assert histogram.counts == [1, 2, 1, 1]
+    assert histogram.count == 5
+    assert histogram.mean == pytest.approx(3.3)
+    assert histogram.quantile(0.5) == pytest.approx(1.75)
+    assert histogram.quantile(1) == 4
+    assert Histogram((1,)).quantile(0.5) is None
+
+
+def test_client_instrumentation(replay_session, cassette_adapter):
+    instrumentation = Instrumentation()
+    calls = []
+
+    instrumentation.on_request(lambda endpoint, url, params: calls.append(('request', endpoint)))
+
+    @instrumentation.on_response
+    def response_hook(endpoint, url, params, response, seconds, error):
+        calls.append(('response', endpoint, response.status_code, error))
+
+    with hubblepy.Client(session=replay_session, memo=Memo(), instrumentation=instrumentation) as client:
+        hubblepy.glossary(client=client)
+        hubblepy.glossary(client=client)
+        hubblepy.news(1, client=client)
+
+    assert calls == [('request', 'glossary'), ('response', 'glossary', 200, None),
+                     ('request', 'news'), ('response', 'news', 200, None)]
+
+    assert instrumentation.counter('requests') == 2
+    assert instrumentation.counter('errors') == 0
+    assert instrumentation.counter('memo_hits', 'glossary') == 1
+    assert instrumentation.hit_rate('memo', 'glossary') == 0.5
+    assert instrumentation.hit_rate('cache') is None
+    assert instrumentation.histogram('request_seconds', 'glossary').count == 1
+    assert instrumentation.histogram('response_bytes').count == 2
+    assert instrumentation.histogram('response_bytes', 'news').sum > 0
+    assert instrumentation.histogram('decode_seconds').count == 2
+
+    text = PrometheusExporter(instrumentation).render()
+
+    assert '# TYPE hubblepy_request_seconds histogram' in text
+    assert 'hubblepy_request_seconds_bucket{endpoint="news",le="+Inf"} 1' in text
+    assert 'hubblepy_requests_total{endpoint="glossary"} 1' in text
+    assert 'hubblepy_memo_hits_total{endpoint="glossary"} 1' in text
+    assert 'hubblepy_retries_total' not in text
+
+    instrumentation.reset()
+
+    assert instrumentation.counter('requests') == 0
+
+
+def test_opentelemetry_exporter():
+    class Instrument(object):
+        def __init__(self, name):
+            self.name = name
+            self.values = []
+
+        def record(self, value, attributes=None):
+            self.values.append((value, attributes))
+
+        add = record
+
+    class Meter(object):
+        def create_histogram(self, name, unit=None, description=None):
+            return Instrument(name)
+
+        create_counter = create_histogram
+
+    exporter = OpenTelemetryExporter(meter=Meter())
+    instrumentation = Instrumentation(exporters=[exporter])
+    instrumentation.count('retries', 'images')
+    instrumentation.observe('request_seconds', 'images', 0.25)
+
+    assert exporter.instruments['retries'].name == 'hubblepy.retries'
+    assert exporter.instruments['retries'].values == [(1, {'hubblepy.endpoint': 'images'})]
+    assert exporter.instruments['request_seconds'].values == [(0.25, {'hubblepy.endpoint': 'images'})]
@@ -0,0 +1,130 @@
+import pytest
+
+import hubblepy
+from hubblepy.crawl import _ids
+from hubblepy.download import asset_files
+from hubblepy.memo import Memo, freeze, missing, sizeof
+from hubblepy.thumbnails import thumbnail_urls
+
+
+def test_memo_hits_and_misses():
+    memo = Memo()
+
+    assert memo.get('a') is missing
+
+    memo.set('a', [{'name': 'Asteroid'}])
+
+    assert memo.get('a') == [{'name': 'Asteroid'}]
+    assert memo.stats()['hits'] == 1
+    assert memo.stats()['misses'] == 1
+    assert memo.stats()['entries'] == 1
+
+
+def test_memo_eviction():
+    value = ['x' * 1000]
+    memo = Memo(max_bytes=sizeof(value) * 2)
+
+    memo.set('a', value)
+    memo.set('b', value)
+    memo.get('a')
+    memo.set('c', value)
+
+    assert memo.get('b') is missing
+    assert memo.get('a') is not missing
+    assert memo.evictions == 1
+    assert memo.bytes <= memo.max_bytes
+
+
+def test_memo_ttl():
+    memo = Memo(ttl=0)
+    memo.set('a', 'text')
+
+    assert memo.get('a') is missing
+
+
+def test_memo_views():
+    memo = Memo(view='copy')
+    res = memo.set('a', [{'name': 'Asteroid'}])
+    res[0]['name'] = 'Planet'
+
+    assert memo.get('a')[0]['name'] == 'Asteroid'
+
+    memo = Memo(view='readonly')
+    memo.set('a', [{'name': 'Asteroid'}])
+
+    with pytest.raises(TypeError):
+        memo.get('a')[0]['name'] = 'Planet'
+
+    assert memo.get('a') is memo.get('a')
+
+    with pytest.raises(ValueError):
+        Memo(view='na')
+
+
+def test_freeze():
+    frozen = freeze({'image_files': [{'width': 612}]})
+
+    assert isinstance(frozen['image_files'], tuple)
+
+    with pytest.raises(TypeError):
+        frozen['image_files'][0]['width'] = 0
+
+
+def test_memo_record_views(replay_session):
+    with hubblepy.Client(session=replay_session, memo=Memo()) as client:
+        image = hubblepy.images(4229, return_type='record', client=client)
+        image.name = 'CORRUPTED'
+        image.image_files[0].width = 0
+
+        image = hubblepy.images(4229, return_type='record', client=client)
+
+    assert image.name != 'CORRUPTED'
+    assert image.image_files[0].width != 0
+
+    with hubblepy.Client(session=replay_session, memo=Memo(view='readonly')) as client:
+        hubblepy.images(4229, return_type='record', client=client)
+        frozen = hubblepy.images(4229, return_type='record', client=client)
+
+    assert frozen == image
+    assert frozen.description == image.description
+
+    with pytest.raises(AttributeError):
+        frozen.name = 'CORRUPTED'
+    with pytest.raises(AttributeError):
+        frozen.image_files[0].width = 0
+    with pytest.raises(TypeError):
+        frozen.image_files[0] = None
+
+
+def test_client_memo(replay_session, cassette_adapter):
+    with hubblepy.Client(session=replay_session, memo=Memo()) as client:
+        p1 = hubblepy.glossary(client=client)
+        p2 = hubblepy.glossary(client=client)
+        p3 = hubblepy.glossary(return_type='text', client=client)
+        p4 = hubblepy.news(1, client=client)
+        p5 = hubblepy.news(1, client=client)
+
+    assert p1 == p2
+    assert p1 is not p2
+    assert isinstance(p3, str)
+    assert p4 == p5
+    assert len(cassette_adapter.requests) == 3
+    assert client.memo.hits == 2
+    assert client.memo.misses == 3
+
+
+def test_readonly_views_in_helpers(replay_session):
+    with hubblepy.Client(session=replay_session, memo=Memo(view='readonly')) as client:
+        image = hubblepy.images(4229, client=client)
+        frozen = hubblepy.images(4229, client=client)
+        release = hubblepy.news_release('2016-24', client=client)
+        frozen_release = hubblepy.news_release('2016-24', client=client)
+
+    assert not isinstance(frozen, dict)
+
+    # Memoised results are handled as the decoded ones are.
+    assert asset_files(frozen) == asset_files(image)
+    assert thumbnail_urls(frozen) == thumbnail_urls(image)
+    assert _ids(frozen_release, 'release_images') == _ids(release, 'release_images')
+    assert hubblepy.to_columns([frozen_release]) == hubblepy.to_columns([release])
+    assert hubblepy.to_columns((frozen,), ids=[4229]) == hubblepy.to_columns([image], ids=[4229])
@@ -0,0 +1,161 @@
+import json
+import sys
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+import hubblepy
+from hubblepy.mirror import Mirror
+
+
+news = [{'news_id': '2018-{:02d}'.format(i), 'name': 'Release {}'.format(i)} for i in range(30, 0, -1)]
+releases = {n['news_id']: dict(n, publication='2018-{:02d}-01T00:00:00.000-04:00'.format(i % 12 + 1),
+                               mission='hubble' if i % 2 else 'webb', abstract='Abstract {}'.format(i))
+            for i, n in enumerate(news)}
+images = {i: {'name': 'Image {}'.format(i), 'news_name': 'a', 'collection': 'news',
+              'mission': 'hubble' if i % 3 else 'webb', 'image_files': []} for i in range(4200, 4230)}
+glossary = [{'name': name, 'definition': 'Definition of {}'.format(name)}
+            for name in ('Asteroid', 'Black Hole', 'Extrasolar planet (Exoplanet)')]
+posts = [{'title': 'Post {}'.format(i), 'link': 'http://esa/{}'.format(i),
+          'pub_date': '2018-{:02d}-01T10:00:00.000-04:00'.format(i)} for i in range(12, 0, -1)]
+
+
+class CatalogueAdapter(BaseAdapter):
+    r"""
+    Transport adapter serving a small synthetic catalogue.
+
+    """
+    def __init__(self):
+        super(CatalogueAdapter, self).__init__()
+
+        self.urls = []
+
+    def send(self, request, **kwargs):
+        self.urls.append(request.url)
+
+        url = urlparse(request.url)
+        query = parse_qs(url.query)
+        page = int(query.get('page', ['1'])[0])
+        route = url.path[len('/api/v3/'):].split('/')
+
+        if route[0] == 'news':
+            body = news[(page - 1) * 25:page * 25]
+        elif route[0] == 'news_release':
+            body = releases[route[1]]
+        elif route[0] == 'images':
+            body = [{'id': i, 'name': images[i]['name'], 'news_name': 'a'} for i in sorted(images, reverse=True)]
+            body = body[(page - 1) * 25:page * 25]
+        elif route[0] == 'image':
+            body = images[int(route[1])]
+        elif route[0] == 'glossary':
+            body = glossary if page == 1 else []
+        else:
+            body = posts if page == 1 else []
+
+        r = requests.Response()
+        r.url = request.url
+        r.status_code = 200
+        r.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        r.encoding = 'utf-8'
+        r._content = json.dumps(body).encode('utf-8')
+
+        return r
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def adapter():
+    return CatalogueAdapter()
+
+
+@pytest.fixture
+def mirror(adapter):
+    session = requests.Session()
+    session.mount('http://hubblesite.org/', adapter)
+
+    mirror = Mirror(':memory:')
+    mirror.pull(client=hubblepy.Client(session=session, prefetch=False), image_collections=['news'],
+                feeds=['esa_feed'])
+
+    return mirror
+
+
+def test_mirror_pull(mirror):
+    assert len(mirror) == 30 + 30 + 3 + 12
+    assert mirror.news_release('2018-30') == releases['2018-30']
+    assert mirror.news_release('2018-99') is None
+    assert mirror.news_release('last')['publication'] == '2018-12-01T00:00:00.000-04:00'
+    assert mirror.image(4229) == images[4229]
+
+    webb = mirror.images(collection='news', mission='webb')
+    assert [r['id'] for r in webb] == [i for i in sorted(images) if i % 3 == 0]
+
+    assert mirror.glossary_term('black-hole') == {'definition': 'Definition of Black Hole'}
+    assert mirror.glossary_term('Extrasolar planet (Exoplanet)') is not None
+    assert [p['title'] for p in mirror.feed_posts('esa_feed', since='2018-10-01')] == ['Post 12', 'Post 11',
+                                                                                      'Post 10']
+
+
+def test_client_reads_from_mirror(mirror, adapter):
+    adapter.urls = []
+    client = hubblepy.Client(session=requests.Session(), mirror=mirror)
+    client.session.mount('http://hubblesite.org/', adapter)
+
+    assert hubblepy.news(page=2, client=client) == news[25:]
+    assert len(list(hubblepy.news(page='all', client=client))) == 30
+    assert hubblepy.news_release('2018-12', client=client) == releases['2018-12']
+    assert hubblepy.images([4200, 4201], client=client) == [images[4200], images[4201]]
+    assert hubblepy.glossary_term('asteroid', client=client) == {'definition': 'Definition of Asteroid'}
+    assert hubblepy.rss('esa_feed', page=1, sort='asc', client=client) == posts[::-1]
+    assert hubblepy.rss_posts('esa_feed', posts[0]['pub_date'], client=client) == posts[0]
+    assert adapter.urls == []
+
+    hubblepy.video_collections(1, 'news', client=client)
+    assert adapter.urls == ['http://hubblesite.org/api/v3/videos/news?page=1']
+
+
+def test_pull_requires_network_client(mirror):
+    with pytest.raises(ValueError):
+        mirror.pull(client=hubblepy.Client(mirror=mirror))
+
+
+def test_mirror_non_numeric_page(mirror):
+    assert mirror.response('http://hubblesite.org/api/v3/news', {'page': 'abc'}) is None
+    assert mirror.response('http://hubblesite.org/api/v3/news?page=0') is None
+    assert mirror.response('http://hubblesite.org/api/v3/news', {'page': 2}) is not None
+
+
+def test_pull_removes_unlisted_records(adapter, monkeypatch):
+    session = requests.Session()
+    session.mount('http://hubblesite.org/', adapter)
+    client = hubblepy.Client(session=session, prefetch=False)
+
+    mirror = Mirror(':memory:')
+    mirror.pull(client=client, image_collections=['news', 'spacecraft'], feeds=['esa_feed'])
+
+    removed = news[0]['news_id']
+    monkeypatch.delitem(images, 4229)
+    monkeypatch.delitem(images, 4228)
+
+    for name in ('news', 'glossary', 'posts'):
+        monkeypatch.setattr(sys.modules[__name__], name, globals()[name][1:])
+
+    mirror.pull(client=client, image_collections=['news'], feeds=['esa_feed'])
+
+    # The spacecraft listing, which was not pulled again, still holds the images.
+    assert mirror.image(4229) == {'name': 'Image 4229', 'news_name': 'a', 'collection': 'news', 'mission': 'hubble',
+                                  'image_files': []}
+
+    mirror.pull(client=client, news=False, glossary=False, image_collections=['spacecraft'])
+
+    assert mirror.image(4229) is None
+    assert mirror.image(4228) is None
+    assert mirror.news_release(removed) is None
+    assert mirror.glossary_term('Asteroid') is None
+    assert len(mirror.feed_posts('esa_feed')) == 11
+    assert len(mirror) == 29 + 28 + 2 + 11
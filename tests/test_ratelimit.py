@@ -0,0 +1,143 @@
+import asyncio
+import threading
+import time
+from email.utils import formatdate
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+import hubblepy
+from hubblepy.ratelimit import Retry, TokenBucket, retry_after
+
+
+class FlakyAdapter(BaseAdapter):
+    r"""
+    Transport adapter answering with the given statuses in turn, then 200. None raises a connection error.
+
+    """
+    def __init__(self, statuses, headers=None):
+        super(FlakyAdapter, self).__init__()
+
+        self.statuses = list(statuses)
+        self.headers = headers or {}
+        self.sent = 0
+
+    def send(self, request, **kwargs):
+        self.sent += 1
+        status = self.statuses.pop(0) if self.statuses else 200
+
+        if status is None:
+            raise requests.ConnectionError('connection reset', request=request)
+
+        r = requests.Response()
+        r.url = request.url
+        r.request = request
+        r.status_code = status
+        r.headers = CaseInsensitiveDict(self.headers if status != 200 else {})
+        r._content = b'[]'
+
+        return r
+
+    def close(self):
+        pass
+
+
+def flaky_client(adapter, **kwargs):
+    session = requests.Session()
+    session.mount('http://hubblesite.org/', adapter)
+
+    return hubblepy.Client(session=session, **kwargs)
+
+
+def test_token_bucket_paces_threads():
+    bucket = TokenBucket(rate=100, burst=5)
+    start = time.monotonic()
+
+    threads = [threading.Thread(target=bucket.acquire) for _ in range(25)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    # 5 requests go at once and the other 20 are spaced 10 ms apart.
+    assert 0.17 < time.monotonic() - start < 0.5
+
+
+def test_token_bucket_async():
+    bucket = TokenBucket(rate=100, burst=1)
+
+    async def main():
+        await asyncio.gather(*[bucket.acquire_async() for _ in range(11)])
+
+    start = time.monotonic()
+    asyncio.new_event_loop().run_until_complete(main())
+
+    assert 0.09 < time.monotonic() - start < 0.4
+
+
+def test_token_bucket_adapts():
+    bucket = TokenBucket(rate=8, max_rate=10, increase=1)
+
+    bucket.observe(429, 0.05)
+    assert bucket.rate == 4
+    assert bucket.throttled == 1
+    assert 0.04 < bucket.reserve() <= 0.05
+
+    for _ in range(10):
+        bucket.observe(200)
+    assert bucket.rate == 10
+
+    bucket.observe(503)
+    assert bucket.rate == 10
+
+
+def test_retry_after():
+    assert retry_after({'Retry-After': '3'}) == 3
+    assert retry_after({}) is None
+    assert retry_after({'Retry-After': 'soon'}) is None
+    assert 8 < retry_after({'Retry-After': formatdate(time.time() + 10, usegmt=True)}) <= 10
+
+
+def test_retry_delay():
+    retry = Retry(backoff=0.5, max_backoff=3)
+
+    assert all(0 <= retry.delay(1) <= 1 for _ in range(100))
+    assert all(retry.delay(10) <= 3 for _ in range(100))
+    assert retry.delay(0, retry_after=2) == 2
+    assert retry.delay(0, retry_after=20) == 3
+
+
+def test_client_retries():
+    adapter = FlakyAdapter([503, None, 429], headers={'Retry-After': '0'})
+    client = flaky_client(adapter, retry=Retry(total=3, backoff=0.01), rate_limit=TokenBucket(rate=1000))
+
+    assert hubblepy.news(1, client=client) == []
+    assert adapter.sent == 4
+    assert client.rate_limit.throttled == 1
+
+
+def test_client_gives_up():
+    adapter = FlakyAdapter([500, 500, 500])
+    client = flaky_client(adapter, retry=2)
+    client.retry.backoff = 0.01
+
+    with pytest.raises(requests.HTTPError):
+        client.get('http://hubblesite.org/api/v3/news').raise_for_status()
+
+    assert adapter.sent == 3
+
+    adapter = FlakyAdapter([None, None])
+    client = flaky_client(adapter, retry=Retry(total=1, backoff=0.01))
+
+    with pytest.raises(requests.ConnectionError):
+        client.get('http://hubblesite.org/api/v3/news')
+
+
+def test_client_without_retry():
+    adapter = FlakyAdapter([503])
+    client = flaky_client(adapter)
+
+    assert client.get('http://hubblesite.org/api/v3/news').status_code == 503
+    assert adapter.sent == 1
@@ -0,0 +1,138 @@
+import copy
+import pickle
+
+import pytest
+
+import hubblepy
+from hubblepy.download import asset_files
+from hubblepy.export import to_columns
+from hubblepy.memo import Memo, sizeof
+from hubblepy.records import FeedPost, GlossaryTerm, Image, ImageFile, NewsItem, NewsRelease, Video, VideoFile, _flatten
+from hubblepy.search import SearchIndex
+from hubblepy.selection import select_file, select_files
+from hubblepy.testing import StubServer
+
+
+@pytest.fixture
+def client(replay_session):
+    return hubblepy.Client(session=replay_session)
+
+
+def test_record_types(client):
+    image = hubblepy.images(4229, return_type='record', client=client)
+
+    assert isinstance(image, Image)
+    assert image.id == 4229
+    assert isinstance(image.image_files[0], ImageFile)
+    assert image.image_files[0].width == 878
+    assert image.to_dict() == dict(hubblepy.images(4229, client=client), id=4229)
+    assert image['mission'] == 'hubble'
+    assert not hasattr(image, '__dict__')
+
+    release = hubblepy.news_release('2016-24', return_type='record', client=client)
+    assert isinstance(release, NewsRelease)
+    assert release.abstract.startswith("Astronomers are using NASA's Hubble")
+    assert isinstance(release._abstract, bytes)
+
+    videos = hubblepy.videos([55, 58], return_type='record', client=client)
+    assert [v.id for v in videos] == [55, 58]
+    assert isinstance(videos[1].video_files[0], VideoFile)
+
+    assert isinstance(hubblepy.news(1, return_type='record', client=client)[0], NewsItem)
+    assert isinstance(hubblepy.rss('esa_feed', return_type='record', client=client)[0], FeedPost)
+
+    term = hubblepy.glossary_term('asteroid', return_type='record', client=client)
+    assert isinstance(term, GlossaryTerm)
+    assert term.name == 'asteroid'
+
+
+def test_record_pages(client):
+    terms = list(hubblepy.glossary(page='all', return_type='record', client=client))
+
+    assert len(terms) == 47
+    assert all(isinstance(t, GlossaryTerm) for t in terms)
+
+    with StubServer(pages=2) as server, server.client() as stub_client:
+        collection = list(hubblepy.video_collections(page='all', collection_name='science', return_type='record',
+                                                     client=stub_client))
+
+    assert len(collection) == 37
+    assert isinstance(collection[0], Video)
+
+
+def test_record_interning(client):
+    a, b = hubblepy.images([4229, 4230], return_type='record', client=client)
+
+    assert a.collection is b.collection
+    assert a.mission is b.mission
+
+
+def test_record_copy_and_memo(client):
+    image = hubblepy.images(4229, return_type='record', client=client)
+
+    assert pickle.loads(pickle.dumps(image)) == image
+    assert copy.deepcopy(image) == image
+    assert len(image._description) < sizeof(image) < sizeof(image.to_dict())
+
+    memo_client = hubblepy.Client(session=client.session, memo=Memo())
+    first = hubblepy.images(4229, return_type='record', client=memo_client)
+
+    assert hubblepy.images(4229, return_type='record', client=memo_client) == first
+    assert memo_client.memo.hits == 1
+
+
+def test_record_extra_fields():
+    item = NewsItem.from_json({'news_id': '2018-39', 'name': 'Release', 'url': 'http://x', 'new_field': 1})
+
+    assert item.extra == {'new_field': 1}
+    assert item['new_field'] == 1
+    assert item.to_dict()['new_field'] == 1
+
+    with pytest.raises(KeyError):
+        item['missing']
+
+
+def test_record_mapping(client):
+    image = hubblepy.images(4229, return_type='record', client=client)
+    item = NewsItem.from_json({'news_id': '2018-39', 'name': 'Release'})
+
+    assert 'image_files' in image
+    assert dict(image) == dict(image.items())
+    assert list(image.keys()) == list(image.to_dict())
+    assert 'url' not in item
+    assert item.get('url', 'none') == 'none'
+    assert len(item) == 2
+
+    with pytest.raises(KeyError):
+        item['url']
+
+
+def test_records_in_helpers(client):
+    images = hubblepy.images([4229, 4230], client=client)
+    records = hubblepy.images([4229, 4230], return_type='record', client=client)
+
+    assert [dict(f) for f in asset_files(records[0])] == asset_files(images[0])
+    assert asset_files(records[0].image_files[0]) == [records[0].image_files[0]]
+    assert dict(select_file(records[0], max_width=1000)) == select_file(images[0], max_width=1000)
+    assert [f['file_url'] for f in select_files(records, formats=['png'])] == \
+        [f['file_url'] for f in select_files(images, formats=['png'])]
+
+    tables = to_columns(records)
+    assert tables['records']['id'] == [4229, 4230]
+    assert len(tables['image_files']['id']) == len(records[0].image_files) + len(records[1].image_files)
+
+    index = SearchIndex()
+    index.add_images(records)
+    index.add_news_releases(hubblepy.news_release('2016-24', return_type='record', client=client))
+    index.add_glossary(hubblepy.glossary(page='all', return_type='record', client=client))
+
+    assert len(index) == 2 + 1 + 47
+    assert index.search('jupiter auroras')[0]['key'] == '2016-24'
+
+
+def test_flatten_records(client):
+    image = hubblepy.images(4229, return_type='record', client=client)
+    terms = hubblepy.glossary(page=1, return_type='record', client=client)
+
+    assert list(_flatten(image)) == [image]
+    assert list(_flatten([terms, terms[:2]])) == terms + terms[:2]
@@ -0,0 +1,79 @@
+import time
+
+import hubblepy
+from hubblepy.search import SearchIndex, tokenize
+
+
+def build_index(session):
+    client = hubblepy.Client(session=session)
+    index = SearchIndex()
+
+    index.add_glossary(hubblepy.glossary(page='all', client=client))
+    index.add_news_releases(hubblepy.news_release(['2016-24', 'first'], client=client))
+    index.add_images(hubblepy.images([4229, 4230], client=client), ids=[4229, 4230])
+    index.add_videos(hubblepy.videos([55, 58], client=client), ids=[55, 58])
+
+    return index
+
+
+def test_tokenize():
+    assert tokenize('The <b>Black</b> Hole of NGC-4258') == ['black', 'hole', 'ngc', '4258']
+
+
+def test_search(replay_session):
+    index = build_index(replay_session)
+
+    assert len(index) == 47 + 2 + 2 + 2
+
+    results = index.search('jupiter auroras')
+    assert results[0]['key'] == '2016-24'
+    assert results[0]['kind'] == 'news_release'
+    assert [r['score'] for r in results] == sorted((r['score'] for r in results), reverse=True)
+
+    assert index.search('black hole', kind='glossary')[0]['key'] == 'Black Hole'
+    assert {r['key'] for r in index.search('galax*', limit=None, kind='glossary')} >= \
+        {'Galaxy', 'Galaxy Cluster', 'Dwarf Galaxy', 'Elliptical Galaxy'}
+    assert index.search('xyzzy') == []
+
+
+def test_search_replace_and_remove():
+    index = SearchIndex()
+    index.add('glossary', 'Comet', 'Comet', 'An icy body.')
+    index.add('glossary', 'Comet', 'Comet', 'A dusty body.')
+
+    assert index.search('icy') == []
+    assert index.search('dusty')[0]['key'] == 'Comet'
+
+    index.remove('glossary', 'Comet')
+
+    assert len(index) == 0
+    assert index.search('dust*') == []
+
+
+def test_search_persistence(replay_session, tmpdir):
+    index = build_index(replay_session)
+    path = str(tmpdir.join('hubble.index'))
+    index.save(path)
+
+    start = time.time()
+    loaded = SearchIndex.load(path)
+
+    assert time.time() - start < 1
+    assert loaded.search('nebula*') == index.search('nebula*')
+    assert ('images', 4229) in loaded
+
+
+def test_search_records(replay_session):
+    client = hubblepy.Client(session=replay_session)
+    index = SearchIndex()
+
+    index.add_glossary(hubblepy.glossary(page='all', return_type='record', client=client))
+    index.add_news_releases(hubblepy.news_release(['2016-24', 'first'], return_type='record', client=client))
+    index.add_images(hubblepy.images([4229, 4230], return_type='record', client=client))
+    index.add_videos(hubblepy.videos([55, 58], return_type='record', client=client), ids=[55, 58])
+
+    expected = build_index(replay_session)
+
+    assert len(index) == len(expected)
+    assert index.search('jupiter auroras') == expected.search('jupiter auroras')
+    assert index.search('galax*', limit=None) == expected.search('galax*', limit=None)
@@ -0,0 +1,60 @@
+import pytest
+
+import hubblepy
+from hubblepy.selection import file_format, select_assets, select_file, select_files
+
+
+image = {'image_files': [
+    {'file_size': 4987706, 'file_url': 'https://media.stsci.edu/29291/STScI-H-spacecraft24-title.pdf', 'height': 792,
+     'width': 612},
+    {'file_size': 1256136, 'file_url': 'https://media.stsci.edu/29290/STScI-H-spacecraft24-title-2400x3000.jpg',
+     'height': 3000, 'width': 2400},
+    {'file_size': 2051306, 'file_url': 'https://media.stsci.edu/29288/STScI-H-spacecraft24-3072x2040.jpg',
+     'height': 2040, 'width': 3072},
+    {'file_size': 18842624, 'file_url': 'https://media.stsci.edu/29289/STScI-H-spacecraft24-3072x2040.tif',
+     'height': 2040, 'width': 3072}]}
+
+
+def test_file_format():
+    assert [file_format(f) for f in image['image_files']] == ['pdf', 'jpg', 'jpg', 'tif']
+    assert file_format({'file_url': 'https://media.stsci.edu/a/B.JPEG'}) == 'jpg'
+
+
+def test_select_file():
+    files = image['image_files']
+
+    assert select_file(image) is files[1]
+    assert select_file(image, formats='tif') is files[3]
+    assert select_file(image, formats=['tif', 'jpg'], max_bytes=5000000) is files[1]
+    assert select_file(image, formats=['tif', 'jpg'], max_height=2500, max_bytes=5000000) is files[2]
+    assert select_file(image, max_width=2500, formats=['TIFF', 'jpg']) is files[1]
+    assert select_file(image, max_height=1000) is files[0]
+    assert select_file(image, max_width=100) is None
+    assert select_file(files, formats=['png']) is None
+
+
+def test_select_file_unknown_size():
+    files = [{'file_url': 'https://media.stsci.edu/1/credits.png', 'file_size': 268725},
+             {'file_url': 'https://media.stsci.edu/2/movie-640x360.mp4', 'file_size': 2908461, 'width': 640,
+              'height': 360}]
+
+    assert select_file(files, max_width=1920) is files[1]
+    assert select_file(files, formats=['png', 'mp4']) is files[0]
+
+
+def test_select_files():
+    assert select_files([image, {'image_files': []}], formats='jpg') == [image['image_files'][1], None]
+
+
+def test_select_assets(replay_session):
+    with hubblepy.Client(session=replay_session, max_workers=2) as client:
+        p1 = select_assets([4229, 4230], max_width=2000, formats=['png', 'jpg'], client=client)
+        p2 = select_assets(55, 'videos', formats=['mov', 'mpg'], max_bytes=50 * 1000 * 1000, client=client)
+
+    assert len(p1) == 2
+    assert all(f['width'] <= 2000 for f in p1)
+    assert len(p2) == 1
+    assert p2[0]['file_url'].endswith('reborn_320x240.mpg')
+
+    with pytest.raises(ValueError):
+        select_assets(55, 'news')
@@ -0,0 +1,122 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+import hubblepy
+from hubblepy.singleflight import AsyncSingleFlight, SingleFlight
+
+
+class CountingAdapter(BaseAdapter):
+    r"""
+    Transport adapter answering every request after a short delay and counting the requests sent.
+
+    """
+    def __init__(self, delay=0.2):
+        super(CountingAdapter, self).__init__()
+
+        self.delay = delay
+        self.sent = 0
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.sent += 1
+
+        time.sleep(self.delay)
+
+        r = requests.Response()
+        r.url = request.url
+        r.request = request
+        r.status_code = 200
+        r.headers = CaseInsensitiveDict()
+        r._content = b'{"news_id": "2016-24", "name": "Hubble", "keystone_image_2x": null}'
+
+        return r
+
+    def close(self):
+        pass
+
+
+def test_single_flight_threads():
+    adapter = CountingAdapter()
+    session = requests.Session()
+    session.mount('http://hubblesite.org/', adapter)
+
+    client = hubblepy.Client(session=session, single_flight=True, max_workers=8, prefetch=False)
+    releases = hubblepy.news_release(['2016-24'] * 8, client=client)
+
+    assert adapter.sent == 1
+    assert client.single_flight.shared == 7
+    assert all(release == releases[0] for release in releases)
+    assert len(set(id(release) for release in releases)) == 8
+
+    hubblepy.news_release('2016-24', client=client)
+
+    assert adapter.sent == 2
+
+    client.close()
+
+
+def test_single_flight_errors():
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def fail():
+        started.set()
+        time.sleep(0.1)
+        raise ValueError('boom')
+
+    def call():
+        try:
+            flight.do('key', fail)
+        except ValueError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    threads[0].start()
+    started.wait()
+
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(errors) == 3
+    assert flight.shared == 2
+    assert flight.do('key', lambda: 'again') == 'again'
+
+
+def test_single_flight_async():
+    httpx = pytest.importorskip('httpx')
+    from hubblepy import aio
+
+    sent = []
+
+    async def handler(request):
+        sent.append(request.url)
+        await asyncio.sleep(0.1)
+        return httpx.Response(200, json={'name': 'Hubble'})
+
+    async def main():
+        async with aio.AsyncClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                                   single_flight=AsyncSingleFlight()) as client:
+            results = await asyncio.gather(*[aio.images(4229, client=client) for _ in range(5)])
+
+            return results, client.single_flight.shared
+
+    loop = asyncio.new_event_loop()
+
+    try:
+        results, shared = loop.run_until_complete(main())
+    finally:
+        loop.close()
+
+    assert len(sent) == 1
+    assert shared == 4
+    assert results[0] == results[4] and results[0] is not results[4]
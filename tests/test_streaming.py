@@ -0,0 +1,70 @@
+import io
+import json
+
+import pytest
+
+import hubblepy
+from hubblepy.instrumentation import Instrumentation
+from hubblepy.streaming import ItemParser, Stream, iter_items
+from hubblepy.testing import StubServer
+
+
+data = [{'name': 'A [nested] "quoted" {name}', 'tags': ['a', {'b': [1, 2]}], 'path': 'C:\\\\'},
+        3.5, 'text, with a comma', None, [], {'unicode': '\u00e9toile \U0001f52d'}]
+
+
+def test_item_parser():
+    body = json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    for decoder in hubblepy.decoders.available():
+        for size in (1, 2, 3, 7, len(body)):
+            chunks = [body[i:i + size] for i in range(0, len(body), size)]
+
+            assert list(iter_items(chunks, decoder)) == data
+
+    # Items are returned as soon as they are complete.
+    parser = ItemParser()
+
+    assert parser.feed(b' [{"name": "a"}, {"name"') == [{'name': 'a'}]
+    assert parser.feed(b': "b"}') == []
+    assert parser.feed(b']') == [{'name': 'b'}]
+    assert parser.done
+
+    assert list(iter_items([b'[', b' ]'])) == []
+
+    with pytest.raises(ValueError):
+        list(iter_items([b'{"error": "not found"}']))
+    with pytest.raises(ValueError):
+        list(iter_items([b'[{"name": "a"}, {"na']))
+
+
+def test_stream():
+    with StubServer(pages=2, payload_size=20000) as server:
+        with server.client(instrumentation=Instrumentation()) as client:
+            content = hubblepy.news(1, return_type='content', client=client)
+
+            with hubblepy.news(1, return_type='stream', client=client) as stream:
+                assert isinstance(stream, Stream) and stream.status_code == 200
+                assert b''.join(stream.iter_chunks(1024)) == content
+
+            f = io.BytesIO()
+            assert hubblepy.news(1, return_type='stream', client=client).write_to(f, 4096) == len(content)
+            assert f.getvalue() == content
+
+            assert hubblepy.news(1, return_type='stream', client=client).view() == content
+            assert list(hubblepy.glossary(1, return_type='stream', client=client).items()) == \
+                hubblepy.glossary(1, client=client)
+
+            # Walking every page parses the items of each page as they arrive.
+            assert list(hubblepy.image_collections('all', 'news', return_type='stream', client=client)) == \
+                list(hubblepy.image_collections('all', 'news', client=client))
+
+            # The size of streamed bodies is taken from their Content-Length rather than by reading them.
+            assert client.instrumentation.histogram('response_bytes', 'news').count == 4
+
+    # Buffered responses, as answered by a mirror or a cache, are served from their content.
+    stream = Stream(hubblepy.cache.CacheEntry('http://hubblesite.org/api/v3/news?page=1', 200, {}, b'[1, 2]',
+                                              60).to_response())
+
+    assert stream.buffered and list(stream.items()) == [1, 2]
+    assert bytes(stream.view()) == b'[1, 2]'
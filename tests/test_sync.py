@@ -0,0 +1,106 @@
+import json
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+import hubblepy
+from hubblepy.sync import SyncState, sync_news, sync_rss
+
+
+class FeedAdapter(BaseAdapter):
+    r"""
+    Transport adapter serving a growing list of news releases and RSS posts, newest first.
+
+    """
+    def __init__(self):
+        super(FeedAdapter, self).__init__()
+
+        self.news = []
+        self.posts = []
+        self.urls = []
+
+    def publish(self, n):
+        for _ in range(n):
+            i = len(self.news)
+            self.news.insert(0, {'news_id': '2018-{:02d}'.format(i), 'name': 'Release {}'.format(i)})
+            self.posts.insert(0, {'title': 'Post {}'.format(i), 'link': 'http://esa/{}'.format(i),
+                                  'pub_date': '2018-01-{:02d}T10:00:00.000-04:00'.format(i // 10 + 1)})
+
+    def send(self, request, **kwargs):
+        self.urls.append(request.url)
+
+        url = urlparse(request.url)
+        query = parse_qs(url.query)
+        page = int(query.get('page', ['1'])[0])
+
+        if url.path == '/api/v3/news':
+            body = self.news[(page - 1) * 25:page * 25]
+        elif url.path.startswith('/api/v3/news_release/'):
+            news_id = url.path.rsplit('/', 1)[1]
+            body = dict(next(n for n in self.news if n['news_id'] == news_id),
+                        publication='2018-01-01T00:00:00.000-04:00')
+        else:
+            body = self.posts[(page - 1) * 25:page * 25]
+
+        r = requests.Response()
+        r.url = request.url
+        r.status_code = 200
+        r.headers = CaseInsensitiveDict({'Content-Type': 'application/json'})
+        r.encoding = 'utf-8'
+        r._content = json.dumps(body).encode('utf-8')
+
+        return r
+
+    def close(self):
+        pass
+
+
+def feed_client(adapter):
+    session = requests.Session()
+    session.mount('http://hubblesite.org/', adapter)
+
+    return hubblepy.Client(session=session, prefetch=False)
+
+
+def test_sync_news(tmpdir):
+    adapter = FeedAdapter()
+    adapter.publish(60)
+    client = feed_client(adapter)
+    path = str(tmpdir.join('sync.json'))
+
+    releases = sync_news(path, client=client, max_pages=1)
+
+    assert [r['news_id'] for r in releases] == [n['news_id'] for n in adapter.news[:25]]
+    assert SyncState(path).get('news')['news_id'] == '2018-59'
+
+    adapter.publish(3)
+    adapter.urls = []
+
+    releases = sync_news(path, client=client)
+
+    assert [r['news_id'] for r in releases] == ['2018-62', '2018-61', '2018-60']
+    assert adapter.urls == ['http://hubblesite.org/api/v3/news?page=1'] + \
+        ['http://hubblesite.org/api/v3/news_release/2018-6{}'.format(i) for i in (2, 1, 0)]
+    assert SyncState(path).get('news')['news_id'] == '2018-62'
+
+    assert sync_news(path, client=client) == []
+
+
+def test_sync_rss():
+    adapter = FeedAdapter()
+    adapter.publish(30)
+    client = feed_client(adapter)
+    state = SyncState()
+
+    assert len(sync_rss('esa_feed', state, client=client)) == 30
+    assert state.get('rss/esa_feed')['pub_date'] == '2018-01-03T10:00:00.000-04:00'
+
+    adapter.publish(2)
+    adapter.urls = []
+
+    posts = sync_rss('esa_feed', state, client=client)
+
+    assert [p['title'] for p in posts] == ['Post 31', 'Post 30']
+    assert adapter.urls == ['http://hubblesite.org/api/v3/external_feed/esa_feed?page=1&sort=-pub_date']
@@ -0,0 +1,79 @@
+import asyncio
+import time
+
+import pytest
+
+import hubblepy
+from hubblepy.cache import MemoryCache
+from hubblepy.ratelimit import Retry
+from hubblepy.testing import StubServer
+
+
+def test_stub_server_routes():
+    with StubServer(pages=3, payload_size=100) as server:
+        with server.client(max_workers=4) as client:
+            news = list(hubblepy.news(page='all', client=client))
+            release = hubblepy.news_release(news[0]['news_id'], client=client)
+            images = hubblepy.images(release['release_images'], client=client)
+            videos = list(hubblepy.video_collections('all', 'science', client=client))
+            term = hubblepy.glossary(1, client=client)[0]
+            posts = hubblepy.rss('esa_feed', client=client)
+            post = hubblepy.rss_posts('esa_feed', posts[0]['pub_date'], return_type='record', client=client)
+
+            assert hubblepy.news_release('last', client=client) == release
+            assert hubblepy.glossary_term(term['name'], client=client)['definition'] == term['definition']
+            assert hubblepy.rss('esa_feed', sort='asc', client=client)[0]['pub_date'] < posts[0]['pub_date']
+            assert hubblepy.images(999999, client=client)['id'] == 999999
+            assert hubblepy.image_collections(collection_name='unknown', client=client) == {'error': 'not found'}
+
+    assert len(news) == len(videos) == 2 * 25 + 12
+    assert server.requests == 3 + 1 + len(images) + 3 + 1 + 1 + 1 + 4 + 1
+    assert [image['id'] for image in images] == release['release_images']
+    assert len(images[0]['description']) >= 100
+    assert post.pub_date == posts[0]['pub_date']
+
+    # The data only depends on the seed.
+    with StubServer(pages=3, payload_size=100) as server:
+        assert list(hubblepy.news(page='all', client=server.client())) == news
+
+
+def test_stub_server_errors_and_cache():
+    with StubServer(error_rate=0.5, seed=1) as server:
+        with server.client(retry=Retry(total=10, backoff=0.001), cache=MemoryCache(), cache_ttl=0.001,
+                           instrumentation=True) as client:
+            images = hubblepy.images(list(range(1000, 1020)), client=client)
+
+            assert all(image['id'] == i for image, i in zip(images, range(1000, 1020)))
+            assert server.errors > 0
+            assert server.requests == 20 + server.errors
+
+            # Stale cached responses are revalidated with their ETag and answered with 304.
+            time.sleep(0.01)
+
+            assert hubblepy.images(1000, client=client) == images[0]
+            assert client.instrumentation.counter('cache_hits') == 1
+
+        errors = server.errors
+
+    # Whether the n-th request of a URL fails is deterministic.
+    with StubServer(error_rate=0.5, seed=1) as server:
+        with server.client(retry=Retry(total=10, backoff=0.001), max_workers=8) as client:
+            hubblepy.images(list(range(1000, 1020)), client=client)
+
+    assert server.errors == errors
+
+
+def test_stub_server_async():
+    pytest.importorskip('httpx')
+    from hubblepy import aio
+
+    async def main(server):
+        async with server.async_client(max_concurrency=5) as client:
+            return await aio.videos(list(range(1000, 1010)), client=client)
+
+    with StubServer(latency=(0, 0.01)) as server:
+        videos = asyncio.run(main(server))
+
+    assert len(videos) == 10
+    assert server.requests == 10
+    assert all(len(video['video_files']) == 3 for video in videos)
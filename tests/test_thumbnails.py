@@ -0,0 +1,145 @@
+import io
+import os
+import threading
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+import hubblepy
+from hubblepy.exceptions import BatchError
+from hubblepy.records import from_json
+from hubblepy.testing import StubServer
+from hubblepy.thumbnails import ThumbnailCache, thumbnail_urls
+
+
+media = 'https://media.stsci.edu/uploads/'
+
+
+class MediaAdapter(BaseAdapter):
+    r"""
+    Transport adapter serving image files whose content is their path, ignoring a 'copy-' prefix of the file name so
+    that several URLs have the same content. Files named 'missing.png' are not found.
+
+    """
+    def __init__(self):
+        super(MediaAdapter, self).__init__()
+
+        self.requests = []
+        self.lock = threading.Lock()
+
+    def send(self, request, **kwargs):
+        with self.lock:
+            self.requests.append(request.url)
+
+        name = request.url.rsplit('/', 1)[-1]
+
+        r = requests.Response()
+        r.url = request.url
+        r.request = request
+        r.status_code = 404 if name == 'missing.png' else 200
+        r.headers = CaseInsensitiveDict()
+        r.raw = io.BytesIO(request.url[len(media):].replace('copy-', '').encode('utf-8') * 100)
+
+        return r
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def media_client():
+    adapter = MediaAdapter()
+    session = requests.Session()
+    session.mount('https://media.stsci.edu/', adapter)
+
+    client = hubblepy.Client(session=session)
+    client.adapter = adapter
+
+    return client
+
+
+releases = [
+    {'news_id': '2016-24', 'thumbnail': media + 'story/1/thumb.png', 'thumbnail_2x': media + 'story/1/thumb2x.png',
+     'keystone_image_2x': media + 'story/1/keystone.jpg', 'release_images': [1, 2]},
+    {'news_id': '2016-25', 'thumbnail': media + 'story/2/thumb.png',
+     'keystone_image_2x': media + 'story/1/copy-keystone.jpg', 'keystone_image_1x': None},
+]
+
+
+def test_thumbnail_urls():
+    posts = [{'title': 'a', 'image': media + 'feed/a.jpg', 'image_square': media + 'feed/a-sq.jpg',
+              'link': 'http://www.spacetelescope.org/news/heic1816/'}]
+
+    assert thumbnail_urls(releases) == [media + 'story/1/thumb.png', media + 'story/1/thumb2x.png',
+                                        media + 'story/1/keystone.jpg', media + 'story/2/thumb.png',
+                                        media + 'story/1/copy-keystone.jpg']
+    assert thumbnail_urls(from_json(posts, 'rss')) == [media + 'feed/a.jpg', media + 'feed/a-sq.jpg']
+    assert thumbnail_urls(releases[0], fields=('thumbnail',)) == [media + 'story/1/thumb.png']
+
+    # Lists of pages and records are flattened.
+    pages = [from_json(posts, 'rss'), releases[1:]]
+    assert thumbnail_urls(pages) == [media + 'feed/a.jpg', media + 'feed/a-sq.jpg', media + 'story/2/thumb.png',
+                                     media + 'story/1/copy-keystone.jpg']
+
+
+def test_thumbnail_urls_pages():
+    with StubServer(pages=2) as server, server.client() as client:
+        pages = hubblepy.video_collections(page=[1, 2], collection_name='science', client=client)
+        records = hubblepy.video_collections(page=[1, 2], collection_name='science', return_type='record',
+                                             client=client)
+
+    assert len(thumbnail_urls(pages)) == 37
+    assert thumbnail_urls(records) == thumbnail_urls(pages) == thumbnail_urls(pages[0]) + thumbnail_urls(pages[1])
+
+
+def test_thumbnail_cache(tmpdir, media_client):
+    directory = str(tmpdir)
+
+    with ThumbnailCache(directory, client=media_client) as cache:
+        paths = cache.prefetch(releases + releases, max_workers=4)
+
+        assert len(paths) == 5
+        assert len(media_client.adapter.requests) == 5
+        assert cache.downloads == 5 and cache.duplicates == 1 and len(cache) == 4
+        assert paths[media + 'story/1/keystone.jpg'] == paths[media + 'story/1/copy-keystone.jpg']
+        assert paths[media + 'story/1/thumb.png'].endswith('.png')
+
+        with open(paths[media + 'story/2/thumb.png'], 'rb') as f:
+            assert f.read() == b'story/2/thumb.png' * 100
+
+        assert cache.size == sum(os.path.getsize(p) for p in set(paths.values()))
+        assert cache.urls() == paths
+
+        # Cached URLs are not downloaded again, by this cache or another opening the same directory.
+        cache.prefetch(releases)
+        assert cache.fetch(media + 'story/1/thumb.png') == paths[media + 'story/1/thumb.png']
+
+    with ThumbnailCache(directory, client=media_client) as cache:
+        assert cache.path(media + 'story/1/thumb2x.png') == paths[media + 'story/1/thumb2x.png']
+        assert len(media_client.adapter.requests) == 5
+
+        with pytest.raises(BatchError) as e:
+            cache.prefetch({'thumbnail': media + 'missing.png', 'image': media + 'story/1/thumb.png'})
+
+        assert e.value.results == [None, paths[media + 'story/1/thumb.png']]
+        assert media + 'missing.png' not in cache
+        assert os.listdir(os.path.join(directory, 'tmp')) == []
+
+
+def test_thumbnail_cache_eviction(tmpdir, media_client):
+    with ThumbnailCache(str(tmpdir), max_bytes=4000, client=media_client) as cache:
+        first = cache.prefetch(releases[0])
+
+        # The files are about 2 KB; the files of a batch are kept even when they exceed the budget together.
+        assert len(cache) == 3 and cache.evictions == 0
+
+        cache.path(media + 'story/1/keystone.jpg')
+        cache.fetch(media + 'story/2/thumb.png')
+
+        assert cache.size <= 4000
+        assert cache.evictions == 2
+        assert media + 'story/1/keystone.jpg' in cache
+        assert media + 'story/1/thumb.png' not in cache
+        assert not os.path.exists(first[media + 'story/1/thumb.png'])
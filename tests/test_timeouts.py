@@ -0,0 +1,167 @@
+import asyncio
+import threading
+import time
+
+import pytest
+import requests
+from requests.adapters import BaseAdapter
+from requests.structures import CaseInsensitiveDict
+
+import hubblepy
+from hubblepy.exceptions import BatchError, DeadlineExceeded
+from hubblepy.timeouts import Hedge, deadline, remaining, request_timeout
+
+
+class SlowAdapter(BaseAdapter):
+    r"""
+    Transport adapter answering after the given delays in turn (then 0), recording the timeout of each request.
+
+    """
+    def __init__(self, delays=()):
+        super(SlowAdapter, self).__init__()
+
+        self.delays = list(delays)
+        self.timeouts = []
+        self.lock = threading.Lock()
+
+    def send(self, request, timeout=None, **kwargs):
+        with self.lock:
+            self.timeouts.append(timeout)
+            delay = self.delays.pop(0) if self.delays else 0
+
+        if timeout is not None and delay > (timeout[1] if isinstance(timeout, tuple) else timeout):
+            time.sleep(timeout[1] if isinstance(timeout, tuple) else timeout)
+            raise requests.ReadTimeout('read timed out', request=request)
+
+        time.sleep(delay)
+
+        r = requests.Response()
+        r.url = request.url
+        r.request = request
+        r.status_code = 200
+        r.headers = CaseInsensitiveDict()
+        r._content = '{{"name": "{}"}}'.format(request.url).encode('utf-8')
+
+        return r
+
+    def close(self):
+        pass
+
+
+def slow_client(adapter, **kwargs):
+    session = requests.Session()
+    session.mount('http://hubblesite.org/', adapter)
+
+    return hubblepy.Client(session=session, **kwargs)
+
+
+def test_request_timeout():
+    assert request_timeout((5, 30)) == (5, 30)
+    assert remaining() is None
+
+    with deadline(2):
+        connect, read = request_timeout((5, 30))
+        assert 1.9 < connect <= 2 and 1.9 < read <= 2
+
+        with deadline(10):
+            assert remaining() <= 2
+
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            request_timeout(1)
+
+
+def test_client_timeouts():
+    adapter = SlowAdapter()
+    client = slow_client(adapter)
+
+    hubblepy.images(4229, client=client)
+    assert adapter.timeouts == [(5, 30)]
+
+    with deadline(1):
+        hubblepy.images([4229, 4230], client=slow_client(adapter, max_workers=2))
+
+    assert all(t[0] <= 1 and t[1] <= 1 for t in adapter.timeouts[1:])
+
+
+def test_deadline_exceeded():
+    client = slow_client(SlowAdapter([0, 0.5]))
+
+    with deadline(0.2):
+        with pytest.raises(DeadlineExceeded):
+            hubblepy.images([4229, 4230], client=client)
+
+    client = slow_client(SlowAdapter([0, 0.5, 0]), max_workers=1)
+
+    with deadline(0.2):
+        with pytest.raises(BatchError) as e:
+            hubblepy.images([4229, 4230, 4231], client=client)
+
+    assert e.value.results[0] is not None
+    assert all(isinstance(error, DeadlineExceeded) for error in e.value.errors.values())
+
+
+def test_hedge_delay():
+    hedge = Hedge(percentile=90, min_samples=10, endpoints=('images',))
+
+    for i in range(1, 11):
+        hedge.record('images', i / 100.0)
+
+    assert hedge.delay('images') == 0.09
+    assert hedge.delay('videos') is None
+    assert Hedge().delay('images') is None
+
+
+def test_hedged_request():
+    hedge = Hedge(percentile=50, min_samples=3)
+
+    for _ in range(3):
+        hedge.record('images', 0.01)
+
+    adapter = SlowAdapter([0.3])
+    client = slow_client(adapter, hedge=hedge)
+
+    start = time.monotonic()
+    assert hubblepy.images(4229, client=client)['name'].endswith('4229')
+
+    assert time.monotonic() - start < 0.2
+    assert hedge.hedged == 1
+    assert len(adapter.timeouts) == 2
+
+    client.close()
+
+
+def test_async_hedge_and_deadline():
+    httpx = pytest.importorskip('httpx')
+    from hubblepy import aio
+
+    delays = [1, 0, 1]
+
+    async def handler(request):
+        await asyncio.sleep(delays.pop(0) if delays else 0)
+        return httpx.Response(200, json={'name': str(request.url)})
+
+    hedge = Hedge(percentile=50, min_samples=3)
+
+    for _ in range(3):
+        hedge.record('images', 0.01)
+
+    async def main():
+        async with aio.AsyncClient(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+                                   hedge=hedge) as client:
+            image = await aio.images(4229, client=client)
+
+            with deadline(0.1):
+                with pytest.raises(DeadlineExceeded):
+                    await aio.news_release('2016-24', client=client)
+
+            return image
+
+    loop = asyncio.new_event_loop()
+
+    try:
+        assert loop.run_until_complete(main())['name'].endswith('4229')
+    finally:
+        loop.close()
+
+    assert hedge.hedged == 1
@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+import requests
+
+import hubblepy
+from hubblepy.testing import StubServer
+
+pytest.importorskip('httpx')
+pytest.importorskip('h2')
+
+from hubblepy import aio  # noqa: E402
+from hubblepy.testing import HTTP2StubServer  # noqa: E402
+from hubblepy.transport import HTTP2Adapter  # noqa: E402
+
+
+ids = list(range(4000, 4064))
+
+
+def test_multiplexing():
+    with StubServer(pages=2) as server, server.client(max_workers=16, pool_maxsize=16) as client:
+        expected = hubblepy.images(ids, client=client)
+        news = list(hubblepy.news(page='all', client=client))
+
+    with HTTP2StubServer(pages=2) as server, server.client(max_workers=16, pool_maxsize=16) as client:
+        assert hubblepy.images(ids, client=client) == expected
+        assert list(hubblepy.news(page='all', client=client)) == news
+
+        # Every concurrent request was a stream of one connection.
+        assert server.connections == 1
+        assert client.http2.protocols == {'HTTP/2': len(ids) + 2}
+        assert not client.http2.fallbacks
+
+        with hubblepy.news(1, return_type='stream', client=client) as stream:
+            assert list(stream.items()) == hubblepy.news(1, client=client)
+
+
+def test_client_http2():
+    with HTTP2StubServer(pages=2) as server:
+        with hubblepy.Client(http2=True, max_workers=8) as client:
+            # The requests of the API functions (to http://hubblesite.org) are sent to the stub.
+            client.http2.connect_to = server.adapter().connect_to
+
+            assert len(hubblepy.images(ids[:16], client=client)) == 16
+            assert client.http2.prior_knowledge
+            assert client.http2.protocols == {'HTTP/2': 16}
+            assert server.connections == 1
+
+
+def test_async_client():
+    async def main(server):
+        async with server.async_client(max_concurrency=16) as client:
+            return await aio.images(ids, client=client)
+
+    with StubServer(pages=2) as server, server.client(max_workers=16, pool_maxsize=16) as client:
+        expected = hubblepy.images(ids, client=client)
+
+    with HTTP2StubServer(pages=2) as server:
+        assert asyncio.run(main(server)) == expected
+
+    # The concurrent requests were streams of one connection.
+    assert server.connections == 1
+    assert server.requests == len(ids)
+
+
+def test_fallback():
+    with StubServer(pages=2) as server:
+        expected = hubblepy.images(ids[:8], client=server.client())
+        host, port = server.url.rsplit('//', 1)[1].rsplit(':', 1)
+        adapter = HTTP2Adapter(prior_knowledge=True, connect_to=(host, int(port)))
+
+        with hubblepy.Client(http2=adapter, max_workers=4) as client:
+            assert hubblepy.images(ids[:8], client=client) == expected
+
+    # The server only speaks HTTP/1.1, so the host is sent HTTP/1.1 requests from then on.
+    assert adapter.fallbacks == {'http://hubblesite.org'}
+    assert adapter.protocols == {'HTTP/1.1': 8}
+
+
+def test_errors():
+    adapter = HTTP2Adapter(connect_to=('127.0.0.1', 1))
+
+    with hubblepy.Client(http2=adapter) as client:
+        with pytest.raises(requests.ConnectionError):
+            client.get('https://hubblesite.org/api/v3/news')